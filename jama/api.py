@@ -4,7 +4,13 @@
 
 import functools
 import logging
-from suds.client import Client
+from suds import WebFault
+from suds.client import Client, SoapClient
+from suds.bindings.binding import envns
+from suds.plugin import PluginContainer
+from suds.sax.parser import Parser
+from suds.sax.stats import registry
+from suds.transport import Reply, Request, TransportError
 
 from jama.version import VERSION
 from jama.util import load_config, REQUIRED_KEYS
@@ -33,10 +39,40 @@ class Connection(object):
         self.auth.password = password
 
 
+class StreamSoapClient(SoapClient):
+    """A SoapClient which sends the request with ``Transport.stream`` and
+    returns the transport reply before its message has been read, so that
+    it can be parsed while it is received. The ``retxml`` option and the
+    reply plugins are not used, as the reply is never held as a whole.
+    """
+
+    def send(self, soapenv):
+        binding = self.method.binding.input
+        self.last_sent(soapenv)
+        plugins = PluginContainer(self.options.plugins)
+        plugins.message.marshalled(envelope=soapenv.root())
+        if self.options.prettyxml:
+            soapenv = soapenv.str()
+        else:
+            soapenv = soapenv.plain()
+        soapenv = soapenv.encode('utf-8')
+        plugins.message.sending(envelope=soapenv)
+        request = Request(self.location(), soapenv)
+        request.headers = self.headers()
+        try:
+            return self.options.transport.stream(request)
+        except TransportError as e:
+            if e.httpcode in (202, 204):
+                return None
+            logger.error(self.last_sent())
+            return self.failed(binding, e)
+
+
 class API(object):
 
     VERSION = 'v3'  #: Supported jama soap version
     TIMEOUT = 20    #: Timeout in seconds
+    REPLY_DEPTH = 4 #: Depth of the returned elements (Envelope/Body/Response/...)
 
     def __init__(self, username, password, url, **kwargs):
 
@@ -50,9 +86,73 @@ class API(object):
             >>> api = API()
             >>> api('getItem', 1234)
 
+        The parse metrics of the reply are recorded under *func_name*
+        (see ``suds.sax.stats.registry``).
         """
         func = getattr(self.conn.client.service, func_name)
-        return func(self.conn.auth, *args, **kwargs)
+        with registry.track(func_name):
+            return func(self.conn.auth, *args, **kwargs)
+
+    def stream(self, func_name, *args, **kwargs):
+        """
+        Call a Jama function which returns a list and yield each returned
+        element (eg. each relationship of a ``get*Relationships`` call) as
+        soon as it has been received, instead of reading the whole reply
+        first.
+
+            >>> for relationship in api.stream('getDownstreamRelationships', 1234):
+            ...     pass # use relationship.toItem
+
+        The elements are unmarshalled against the returned type, so they
+        are the same objects as the items of the list returned by
+        ``api(func_name, ...)``. Faults are raised whatever the ``faults``
+        option, and multiref (rpc/encoded) replies are not supported.
+        """
+        method = getattr(self.conn.client.service, func_name)
+        rtypes = method.method.binding.input.returned_types(method.method)
+        if len(rtypes) != 1 or not rtypes[0].unbounded():
+            raise TypeError('{} does not return a list'.format(func_name))
+
+        client = StreamSoapClient(method.client, method.method)
+        with registry.track(func_name):
+            reply = client.invoke((self.conn.auth,) + args, kwargs)
+        if reply is None:
+            return iter(())
+        if not isinstance(reply, Reply):
+            raise Exception(reply)
+
+        return registry.tracked(
+            func_name, self._unmarshal(method.method, rtypes[0], reply.message))
+
+    def _unmarshal(self, method, rtype, fp):
+        """
+        Parse the reply *fp* while it is read and unmarshal each element of
+        the SOAP Body response against *rtype*, skipping the others (eg.
+        SOAP Header entries). A SOAP Fault is raised once it has been read.
+        """
+        binding = method.binding.input
+        resolved = rtype.resolve(nobuiltin=True)
+        unmarshaller = binding.unmarshaller()
+        fault = None
+        try:
+            nodes = Parser().iterparse(file=fp, depth=self.REPLY_DEPTH)
+            for node in nodes:
+                parent = node.parent
+                body = parent.parent
+                if not body.match('Body', envns):
+                    continue
+                if not body.parent.match('Envelope', envns):
+                    continue
+                if parent.match('Fault', envns):
+                    # put back the fault entries taken from the tree
+                    fault = parent
+                    fault.append(node)
+                    continue
+                yield unmarshaller.process(node, resolved)
+        finally:
+            fp.close()
+        if fault is not None:
+            raise WebFault(binding.unmarshaller(False).process(fault), fault)
 
     def create_leaf_generator(self, jama_leaf, interesting_fields):
         """
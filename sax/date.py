@@ -29,6 +29,80 @@ import re
 log = getLogger(__name__)
 
 
+class Cache:
+    """
+    A bounded cache of the most recently used values.  When full, the
+    least recently used value is dropped.
+    @ivar size: The maximum number of cached values.
+    @type size: int
+    @ivar links: The (circular) list links by key as: [prev, next, key, value].
+    @type links: dict
+    @ivar root: The root of the list, the I{next} link is the least
+        recently used.
+    @type root: list
+    """
+
+    def __init__(self, size=1000):
+        """
+        @param size: The maximum number of cached values.
+        @type size: int
+        """
+        self.size = size
+        self.links = {}
+        self.root = []
+        self.root[:] = [self.root, self.root, None, None]
+
+    def get(self, key):
+        """
+        Get a cached value.
+        @param key: A key.
+        @type key: I{any}
+        @return: The cached value or I{None} when not-found.
+        @rtype: I{any}
+        """
+        link = self.links.get(key)
+        if link is None:
+            return None
+        prev, next = link[0], link[1]
+        prev[1] = next
+        next[0] = prev
+        root = self.root
+        last = root[0]
+        last[1] = root[0] = link
+        link[0] = last
+        link[1] = root
+        return link[3]
+
+    def put(self, key, value):
+        """
+        Cache a value.
+        @param key: A key.
+        @type key: I{any}
+        @param value: The value.
+        @type value: I{any}
+        """
+        if key in self.links:
+            self.links[key][3] = value
+            return
+        root = self.root
+        if len(self.links) >= self.size:
+            oldest = root[1]
+            root[1] = oldest[1]
+            oldest[1][0] = root
+            del self.links[oldest[2]]
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = link
+        self.links[key] = link
+
+    def clear(self):
+        """
+        Drop all of the cached values.
+        """
+        self.links.clear()
+        self.root[:] = [self.root, self.root, None, None]
+
+
 class Date:
     """
     An XML date object.
@@ -39,7 +113,16 @@ class Date:
         - YYYY-MM-DD-06:00
     @ivar date: The object value.
     @type date: B{datetime}.I{date}
+    @cvar pattern: The regex pattern to match the date.
+    @type pattern: re.Pattern
+    @cvar cache: The recently parsed dates by string.
+    @type cache: L{Cache}
     """
+
+    pattern = re.compile('([0-9]{4})-([0-9]{2})-([0-9]{2})$')
+
+    cache = Cache()
+
     def __init__(self, date):
         """
         @param date: The value of the object.
@@ -93,6 +176,17 @@ class Date:
         @return: A date object.
         @rtype: I{date}
         """
+        date = Date.cache.get(s)
+        if date is not None:
+            return date
+        m = self.pattern.match(s[:10])
+        if m is not None:
+            try:
+                date = dt.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+                Date.cache.put(s, date)
+                return date
+            except ValueError:
+                pass
         try:
             year, month, day = s[:10].split('-', 2)
             year = int(year)
@@ -124,7 +218,20 @@ class Time:
     @type tz: L{Timezone}
     @ivar date: The object value.
     @type date: B{datetime}.I{time}
+    @cvar pattern: The regex pattern to match the time.
+    @type pattern: re.Pattern
+    @cvar cache: The recently parsed times by string as: (I{time}, I{offset}).
+    @type cache: L{Cache}
+    @cvar day: The (arbitrary) day used to adjust times.
+    @type day: B{datetime}.I{date}
     """
+
+    pattern = re.compile(
+        '([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.([0-9]+))?([zZ]|[\-\+][0-9]{2}:[0-9]{2})?$')
+
+    cache = Cache()
+
+    day = dt.date(2000, 1, 1)
     
     def __init__(self, time, adjusted=True):
         """
@@ -182,9 +289,8 @@ class Time:
         Adjust for TZ offset.
         """
         if hasattr(self, 'offset'):
-            today = dt.date.today()
             delta = self.tz.adjustment(self.offset)
-            d = dt.datetime.combine(today, self.time)
+            d = dt.datetime.combine(self.day, self.time)
             d = ( d + delta )
             self.time = d.time()
         
@@ -203,6 +309,50 @@ class Time:
         @return: A time object.
         @rtype: B{datetime}.I{time}
         """
+        cached = Time.cache.get(s)
+        if cached is None:
+            time = self.__fastparse(s)
+            if time is None:
+                time = self.__slowparse(s)
+            cached = (time, getattr(self, 'offset', None))
+            Time.cache.put(s, cached)
+            return time
+        time, offset = cached
+        if offset is not None:
+            self.offset = offset
+        return time
+
+    def __fastparse(self, s):
+        """
+        Parse the string time matched by L{pattern}.
+        @param s: A time string.
+        @type s: str
+        @return: A time object or I{None} when not matched.
+        @rtype: B{datetime}.I{time}
+        """
+        m = self.pattern.match(s)
+        if m is None:
+            return None
+        hour, minute, second, ms, tz = m.groups()
+        try:
+            if ms is None:
+                time = dt.time(int(hour), int(minute), int(second))
+            else:
+                time = dt.time(int(hour), int(minute), int(second), int(ms[:6]))
+        except ValueError:
+            return None
+        if tz is not None:
+            self.offset = self.__offset(tz)
+        return time
+
+    def __slowparse(self, s):
+        """
+        Parse the string time.
+        @param s: A time string.
+        @type s: str
+        @return: A time object.
+        @rtype: B{datetime}.I{time}
+        """
         try:
             offset = None
             part = Timezone.split(s)
@@ -275,7 +425,13 @@ class DateTime(Date,Time):
         - YYYY-MM-DDB{T}HH:MI:SS.ms(+|-)06:00
     @ivar datetime: The object value.
     @type datetime: B{datetime}.I{datedate}
+    @cvar cache: The recently parsed datetimes by string as:
+        (I{date}, I{time}, I{offset}).
+    @type cache: L{Cache}
     """
+
+    cache = Cache()
+
     def __init__(self, date):
         """
         @param date: The value of the object.
@@ -289,9 +445,18 @@ class DateTime(Date,Time):
                 dt.datetime.combine(self.date, self.time)
             return
         if isinstance(date, basestring):
-            part = date.split('T')
-            Date.__init__(self, part[0])
-            Time.__init__(self, part[1], 0)
+            cached = DateTime.cache.get(date)
+            if cached is None:
+                part = date.split('T')
+                Date.__init__(self, part[0])
+                Time.__init__(self, part[1], 0)
+                offset = getattr(self, 'offset', None)
+                DateTime.cache.put(date, (self.date, self.time, offset))
+            else:
+                self.date, self.time, offset = cached
+                self.tz = Timezone()
+                if offset is not None:
+                    self.offset = offset
             self.datetime = \
                 dt.datetime.combine(self.date, self.time)
             self.__adjust()
@@ -342,12 +507,16 @@ class Timezone:
     @type local: int
     @cvar patten: The regex patten to match TZ.
     @type patten: re.Pattern
+    @cvar deltas: The adjustments by offset delta (hours).
+    @type deltas: {int:B{datetime}.I{timedelta}}
     """
     
     pattern = re.compile('([zZ])|([\-\+][0-9]{2}:[0-9]{2})')
     
     LOCAL = ( 0-time.timezone/60/60 )
 
+    deltas = {}
+
     def __init__(self, offset=None):
         if offset is None:
             offset = self.LOCAL
@@ -375,4 +544,9 @@ class Timezone:
         @rtype: B{datetime}.I{timedelta}
         """
         delta = ( self.local - offset )
-        return dt.timedelta(hours=delta)
+        try:
+            return self.deltas[delta]
+        except KeyError:
+            adjustment = dt.timedelta(hours=delta)
+            self.deltas[delta] = adjustment
+            return adjustment
@@ -21,7 +21,7 @@ Provides XML I{document} classes.
 from logging import getLogger
 from suds import *
 from suds.sax import *
-from suds.sax.element import Element
+from suds.sax.element import Element, Buffer
 
 log = getLogger(__name__)
 
@@ -36,23 +36,27 @@ class Document(Element):
             self.append(root)
         
     def root(self):
-        if len(self.children):
-            return self.children[0]
+        if len(self):
+            return self[0]
         else:
             return None
         
     def str(self):
-        s = []
-        s.append(self.DECL)
-        s.append('\n')
-        s.append(self.root().str())
-        return ''.join(s)
+        buffer = Buffer()
+        self.write(buffer, pretty=True)
+        return buffer.getvalue()
     
     def plain(self):
-        s = []
-        s.append(self.DECL)
-        s.append(self.root().plain())
-        return ''.join(s)
+        buffer = Buffer()
+        self.write(buffer)
+        return buffer.getvalue()
+
+    def write(self, out, pretty=False, encoding=None):
+        out.write(self.DECL)
+        if pretty:
+            out.write('\n')
+        self.root().write(out, pretty, encoding)
+        return self
 
     def __str__(self):
         return unicode(self).encode('utf-8')
@@ -29,6 +29,14 @@ class Encoder:
     @type decodings: [(str,str)]
     @cvar special: A list of special characters
     @type special: [char]
+    @cvar encoder: The (single pass) encoding pattern.
+    @type encoder: I{re.RegexObject}
+    @cvar encoded: The encoding of each special character.
+    @type encoded: {char:str}
+    @cvar decoder: The (single pass) decoding pattern.
+    @type decoder: I{re.RegexObject}
+    @cvar decoded: The decoding of each special character encoding.
+    @type decoded: {str:char}
     """
     
     encodings = \
@@ -37,6 +45,14 @@ class Encoder:
         (( '&lt;', '<' ),( '&gt;', '>' ),( '&quot;', '"' ),( '&apos;', "'" ),( '&amp;', '&' ))
     special = \
         ('&', '<', '>', '"', "'")
+    encoder = \
+        re.compile('&(?!(?:amp|lt|gt|quot|apos);)|[<>"\']')
+    encoded = \
+        dict([(x[1], x[0]) for x in decodings])
+    decoder = \
+        re.compile('&(?:amp|lt|gt|quot|apos);')
+    decoded = \
+        dict(decodings)
     
     def needsEncoding(self, s):
         """
@@ -61,8 +77,7 @@ class Encoder:
         @rtype: str
         """
         if isinstance(s, basestring) and self.needsEncoding(s):
-            for x in self.encodings:
-                s = re.sub(x[0], x[1], s)
+            s = self.encoder.sub(self.__encoded, s)
         return s
     
     def decode(self, s):
@@ -74,6 +89,11 @@ class Encoder:
         @rtype: str
         """
         if isinstance(s, basestring) and '&' in s:
-            for x in self.decodings:
-                s = s.replace(x[0], x[1])
+            s = self.decoder.sub(self.__decoded, s)
         return s
+
+    def __encoded(self, match):
+        return self.encoded[match.group()]
+
+    def __decoded(self, match):
+        return self.decoded[match.group()]
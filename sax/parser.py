@@ -1,139 +1,697 @@
-# This program is free software; you can redistribute it and/or modify
-# it under the terms of the (LGPL) GNU Lesser General Public License as
-# published by the Free Software Foundation; either version 3 of the 
-# License, or (at your option) any later version.
-#
-# This program is distributed in the hope that it will be useful,
-# but WITHOUT ANY WARRANTY; without even the implied warranty of
-# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
-# GNU Library Lesser General Public License for more details at
-# ( http://www.gnu.org/licenses/lgpl.html ).
-#
-# You should have received a copy of the GNU Lesser General Public License
-# along with this program; if not, write to the Free Software
-# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
-# written by: Jeff Ortel ( jortel@redhat.com )
-
-"""
-The sax module contains a collection of classes that provide a
-(D)ocument (O)bject (M)odel representation of an XML document.
-The goal is to provide an easy, intuative interface for managing XML
-documents.  Although, the term, DOM, is used above, this model is
-B{far} better.
-
-XML namespaces in suds are represented using a (2) element tuple
-containing the prefix and the URI.  Eg: I{('tns', 'http://myns')}
-
-"""
-
-from logging import getLogger
-import suds.metrics
-from suds import *
-from suds.sax import *
-from suds.sax.document import Document
-from suds.sax.element import Element
-from suds.sax.text import Text
-from suds.sax.attribute import Attribute
-from xml.sax import make_parser, InputSource, ContentHandler
-from xml.sax.handler import feature_external_ges
-from cStringIO import StringIO
-
-log = getLogger(__name__)
-
-
-class Handler(ContentHandler):
-    """ sax hanlder """
-    
-    def __init__(self):
-        self.nodes = [Document()]
- 
-    def startElement(self, name, attrs):
-        top = self.top()
-        node = Element(unicode(name), parent=top)
-        for a in attrs.getNames():
-            n = unicode(a)
-            v = unicode(attrs.getValue(a))
-            attribute = Attribute(n,v)
-            if self.mapPrefix(node, attribute):
-                continue
-            node.append(attribute)
-        node.charbuffer = []
-        top.append(node)
-        self.push(node)
-        
-    def mapPrefix(self, node, attribute):
-        skip = False
-        if attribute.name == 'xmlns':
-            if len(attribute.value):
-                node.expns = unicode(attribute.value)
-            skip = True
-        elif attribute.prefix == 'xmlns':
-            prefix = attribute.name
-            node.nsprefixes[prefix] = unicode(attribute.value)
-            skip = True
-        return skip
- 
-    def endElement(self, name):
-        name = unicode(name)
-        current = self.top()
-        if len(current.charbuffer):
-            current.text = Text(u''.join(current.charbuffer))
-        del current.charbuffer
-        if len(current):
-            current.trim()
-        currentqname = current.qname()
-        if name == currentqname:
-            self.pop()
-        else:
-            raise Exception('malformed document')
- 
-    def characters(self, content):
-        text = unicode(content)
-        node = self.top()
-        node.charbuffer.append(text)
-
-    def push(self, node):
-        self.nodes.append(node)
-        return node
-
-    def pop(self):
-        return self.nodes.pop()
- 
-    def top(self):
-        return self.nodes[len(self.nodes)-1]
-
-
-class Parser:
-    """ SAX Parser """
-    
-    @classmethod
-    def saxparser(cls):
-        p = make_parser()
-        p.setFeature(feature_external_ges, 0)
-        h = Handler()
-        p.setContentHandler(h)
-        return (p, h)
-        
-    def parse(self, file=None, string=None):
-        """
-        SAX parse XML text.
-        @param file: Parse a python I{file-like} object.
-        @type file: I{file-like} object.
-        @param string: Parse string XML.
-        @type string: str
-        """
-        timer = metrics.Timer()
-        timer.start()
-        sax, handler = self.saxparser()
-        if file is not None:
-            sax.parse(file)
-            timer.stop()
-            metrics.log.debug('sax (%s) duration: %s', file, timer)
-            return handler.nodes[0]
-        if string is not None:
-            source = InputSource(None)
-            source.setByteStream(StringIO(string))
-            sax.parse(source)
-            timer.stop()
-            metrics.log.debug('%s\nsax duration: %s', string, timer)
-            return handler.nodes[0]
\ No newline at end of file
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the (LGPL) GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the 
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Library Lesser General Public License for more details at
+# ( http://www.gnu.org/licenses/lgpl.html ).
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+# written by: Jeff Ortel ( jortel@redhat.com )
+
+"""
+The sax module contains a collection of classes that provide a
+(D)ocument (O)bject (M)odel representation of an XML document.
+The goal is to provide an easy, intuative interface for managing XML
+documents.  Although, the term, DOM, is used above, this model is
+B{far} better.
+
+XML namespaces in suds are represented using a (2) element tuple
+containing the prefix and the URI.  Eg: I{('tns', 'http://myns')}
+
+"""
+
+import gc
+import re
+import time
+from logging import getLogger
+import suds.metrics
+from suds import *
+from suds.sax import *
+from suds.sax.document import Document
+from suds.sax.element import Element
+from suds.sax.text import Text
+from suds.sax.attribute import Attribute
+from suds.sax.stats import registry
+from xml.sax import make_parser, InputSource, ContentHandler
+from xml.sax.handler import feature_external_ges
+from xml.parsers import expat
+from cStringIO import StringIO
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+log = getLogger(__name__)
+
+
+class Handler(ContentHandler):
+    """ sax hanlder """
+    
+    def __init__(self):
+        self.nodes = [Document()]
+        self.buffers = [[]]
+        self.elements = 0
+        self.maxdepth = 0
+ 
+    def startElement(self, name, attrs):
+        top = self.top()
+        node = Element(unicode(name), parent=top)
+        for a in attrs.getNames():
+            n = unicode(a)
+            v = unicode(attrs.getValue(a))
+            attribute = Attribute(n,v)
+            if self.mapPrefix(node, attribute):
+                continue
+            node.append(attribute)
+        top.append(node)
+        self.push(node)
+        
+    def mapPrefix(self, node, attribute):
+        skip = False
+        if attribute.name == 'xmlns':
+            if len(attribute.value):
+                node.expns = unicode(attribute.value)
+            skip = True
+        elif attribute.prefix == 'xmlns':
+            prefix = attribute.name
+            node.nsprefixes[prefix] = unicode(attribute.value)
+            skip = True
+        return skip
+ 
+    def endElement(self, name):
+        name = unicode(name)
+        current = self.top()
+        buffer = self.buffers[-1]
+        if len(buffer):
+            current.text = Text(u''.join(buffer))
+        if len(current):
+            current.trim()
+        currentqname = current.qname()
+        if name == currentqname:
+            self.pop()
+        else:
+            raise Exception('malformed document')
+ 
+    def characters(self, content):
+        text = unicode(content)
+        self.buffers[-1].append(text)
+
+    def push(self, node):
+        self.nodes.append(node)
+        self.buffers.append([])
+        self.elements += 1
+        if len(self.nodes) > self.maxdepth:
+            self.maxdepth = len(self.nodes)
+        return node
+
+    def pop(self):
+        self.buffers.pop()
+        return self.nodes.pop()
+ 
+    def top(self):
+        return self.nodes[len(self.nodes)-1]
+
+
+class ExpatHandler:
+    """
+    A handler driven directly by I{pyexpat} callbacks.  It builds the
+    same L{Document} tree as L{Handler} without the I{xml.sax} layer.
+    Tag and attribute names are interned and the I{xmlns} declarations
+    are mapped while the element is started.
+    @ivar nodes: The stack of open nodes.
+    @type nodes: [L{Element},..]
+    @ivar buffers: The character buffers of the open nodes.
+    @type buffers: [[unicode,..],..]
+    @ivar names: The interned (qualified) names.
+    @type names: {unicode:unicode}
+    @ivar elements: The number of started elements.
+    @type elements: int
+    @ivar maxdepth: The maximum length of the node stack (the depth
+        of the document plus one).
+    @type maxdepth: int
+    """
+
+    def __init__(self):
+        self.nodes = [Document()]
+        self.buffers = [[]]
+        self.names = {}
+        self.elements = 0
+        self.maxdepth = 0
+
+    def intern(self, name):
+        """
+        Intern the specified name.
+        @param name: A tag or attribute name.
+        @type name: unicode
+        @return: The interned name.
+        @rtype: unicode
+        """
+        return self.names.setdefault(name, name)
+
+    def startElement(self, name, attrs):
+        top = self.nodes[-1]
+        node = Element(self.intern(name), parent=top)
+        intern = self.intern
+        for i in xrange(0, len(attrs), 2):
+            n = attrs[i]
+            v = attrs[i+1]
+            if n == 'xmlns':
+                if len(v):
+                    node.expns = v
+                continue
+            if n.startswith('xmlns:'):
+                node.nsprefixes[intern(n[6:])] = v
+                continue
+            attribute = Attribute(intern(n), v)
+            attribute.parent = node
+            node.attributes.append(attribute)
+        top.children.append(node)
+        self.nodes.append(node)
+        self.buffers.append([])
+        self.elements += 1
+        if len(self.nodes) > self.maxdepth:
+            self.maxdepth = len(self.nodes)
+
+    def endElement(self, name):
+        current = self.nodes.pop()
+        buffer = self.buffers.pop()
+        if buffer:
+            current.text = Text(u''.join(buffer))
+        if len(current):
+            current.trim()
+
+    def characters(self, content):
+        self.buffers[-1].append(content)
+
+
+class LxmlBuilder:
+    """
+    Builds the document from the events of the I{lxml} iterparse().
+    The I{lxml} children of each closed element are deleted once its
+    text has been collected so the I{lxml} tree never grows beyond the
+    open branch.
+    @ivar nodes: The stack of open nodes.  The document is at the bottom.
+    @type nodes: [L{Element},..]
+    @ivar names: Qualified names by (I{prefix}, I{tag}).
+    @type names: {(str, str):unicode}
+    @ivar declared: The namespace declarations of the next element.
+    @type declared: [(I{prefix}, I{URI}),..]
+    @ivar elements: The number of started elements.
+    @type elements: int
+    @ivar maxdepth: The maximum length of the node stack (the depth
+        of the document plus one).
+    @type maxdepth: int
+    @ivar entities: The internal entities declared by the document,
+        which are expanded here because I{lxml} is not allowed to
+        resolve entities (external entities are skipped, as they are
+        by the other backends).
+    @type entities: {str:unicode}
+    @ivar prefixes: The first prefix declared for each namespace.
+    @type prefixes: {str:str}
+    @ivar shared: The namespaces declared with more than one prefix.
+        I{lxml} only reports the namespace of an attribute so the
+        prefix of an attribute in one of these namespaces is taken
+        from the serialized element.
+    @type shared: set
+    """
+
+    events = ('start', 'end', 'start-ns')
+
+    predefined = {
+        'lt' : u'<',
+        'gt' : u'>',
+        'amp' : u'&',
+        'apos' : u"'",
+        'quot' : u'"',
+    }
+
+    reference = re.compile(r'&([^&;#\s]+);')
+
+    attributename = re.compile(r'\s([^\s=]+)="')
+
+    def __init__(self):
+        self.nodes = [Document()]
+        self.names = {}
+        self.declared = []
+        self.elements = 0
+        self.maxdepth = 0
+        self.entities = None
+        self.prefixes = {}
+        self.shared = set()
+
+    def build(self, events):
+        """
+        Build the document.
+        @param events: The I{lxml} iterparse() events.
+        @type events: I{iterable}
+        @return: The document.
+        @rtype: L{Document}
+        """
+        for event, item in events:
+            if event == 'start':
+                self.start(item)
+                continue
+            if event == 'end':
+                self.end(item)
+                continue
+            self.declared.append(item)
+        return self.nodes[0]
+
+    def qname(self, prefix, tag):
+        """
+        Get the qualified name for a (clark notation) I{lxml} tag.
+        @param prefix: The prefix of the tag.
+        @type prefix: str
+        @param tag: The tag as {I{URI}}I{name}.
+        @type tag: str
+        @return: The interned (I{prefix}:)I{name}.
+        @rtype: unicode
+        """
+        key = (prefix, tag)
+        try:
+            return self.names[key]
+        except KeyError:
+            name = tag.rsplit('}', 1)[-1]
+            if prefix:
+                name = ':'.join((prefix, name))
+            name = unicode(name)
+            self.names[key] = name
+            return name
+
+    def start(self, item):
+        top = self.nodes[-1]
+        node = Element(self.qname(item.prefix, item.tag), parent=top)
+        if len(self.declared):
+            for prefix, uri in self.declared:
+                if len(prefix):
+                    node.nsprefixes[unicode(prefix)] = unicode(uri)
+                    if self.prefixes.setdefault(uri, prefix) != prefix:
+                        self.shared.add(uri)
+                    continue
+                if len(uri):
+                    node.expns = unicode(uri)
+            self.declared = []
+        sourcenames = None
+        for i, (n, v) in enumerate(item.items()):
+            if n[0] == '{':
+                uri = n[1:].split('}', 1)[0]
+                if uri in self.shared:
+                    if sourcenames is None:
+                        sourcenames = self.sourcenames(item)
+                    n = self.qname(None, sourcenames[i])
+                else:
+                    n = self.qname(node.findPrefix(uri), n)
+            else:
+                n = self.qname(None, n)
+            attribute = Attribute(n, unicode(v))
+            attribute.parent = node
+            node.attributes.append(attribute)
+        top.children.append(node)
+        self.nodes.append(node)
+        self.elements += 1
+        if len(self.nodes) > self.maxdepth:
+            self.maxdepth = len(self.nodes)
+
+    def sourcenames(self, item):
+        """
+        Get the names of the attributes of an I{lxml} element as written
+        in the source, which I{lxml} keeps when serializing.  Attribute
+        values are serialized with (>) escaped so the start tag ends at
+        the first (>).
+        @param item: An I{lxml} element.
+        @type item: I{lxml} element
+        @return: The (prefix:)name of each attribute, in order.
+        @rtype: [unicode,..]
+        """
+        xml = etree.tostring(item, encoding=unicode)
+        names = self.attributename.findall(xml, 0, xml.index('>'))
+        return [n for n in names if n != 'xmlns' and n[:6] != 'xmlns:']
+
+    def end(self, item):
+        current = self.nodes.pop()
+        text = item.text
+        if len(item):
+            buffer = []
+            if text:
+                buffer.append(text)
+            for child in item:
+                if child.tag is etree.Entity:
+                    buffer.append(self.entity(item, child.name))
+                if child.tail:
+                    buffer.append(child.tail)
+            text = u''.join(buffer)
+            del item[:]
+        if text:
+            current.text = Text(text)
+        if len(current):
+            current.trim()
+
+    def entity(self, item, name, expanding=()):
+        """
+        Get the replacement text of an (unresolved) entity reference.
+        @param item: An I{lxml} element of the document.
+        @type item: I{lxml} element
+        @param name: The name of the entity.
+        @type name: str
+        @param expanding: The names of the entities being expanded.
+        @type expanding: (str,..)
+        @return: The replacement text of an internal entity, or an
+            empty string for external and undeclared entities.
+        @rtype: unicode
+        """
+        if self.entities is None:
+            self.entities = {}
+            dtd = item.getroottree().docinfo.internalDTD
+            if dtd is not None:
+                for e in dtd.iterentities():
+                    if e.content is not None and e.system_url is None:
+                        self.entities[e.name] = unicode(e.content)
+        if name in self.predefined:
+            return self.predefined[name]
+        if name in expanding or name not in self.entities:
+            return u''
+        expanding += (name,)
+        return self.reference.sub(
+            lambda m: self.entity(item, m.group(1), expanding),
+            self.entities[name])
+
+
+class StreamHandler(ExpatHandler):
+    """
+    An L{ExpatHandler} that selects elements as they are closed.  A
+    selected element is removed from its parent's children so that only
+    the open branch of the document is retained.  It keeps its I{parent}
+    so that inherited prefix mappings can still be resolved.
+    @ivar name: The (optional) name of the selected elements.
+    @type name: basestring
+    @ivar ns: The (optional) namespace of the selected elements.
+    @type ns: (I{prefix}, I{name})
+    @ivar depth: The (optional) depth of the selected elements where
+        the root element has a depth of (1).
+    @type depth: int
+    @ivar ready: The selected elements that have not been consumed.
+    @type ready: [L{Element},..]
+    """
+
+    def __init__(self, name=None, ns=None, depth=None):
+        ExpatHandler.__init__(self)
+        self.name = name
+        self.ns = ns
+        self.depth = depth
+        self.ready = []
+
+    def endElement(self, name):
+        depth = len(self.nodes)-1
+        current = self.nodes[-1]
+        ExpatHandler.endElement(self, name)
+        if self.depth is not None and depth != self.depth:
+            return
+        if not current.match(self.name, self.ns):
+            return
+        siblings = current.parent.children
+        if siblings[-1] is current:
+            siblings.pop()
+        self.ready.append(current)
+
+
+class Parser:
+    """
+    SAX Parser
+    @cvar backend: The parser backend (I{expat}|I{lxml}|I{sax}).
+        The I{lxml} backend falls back to I{expat} when lxml is not
+        installed.
+    @type backend: str
+    @cvar logstring: Log the parsed (string) XML text along with the
+        (debug) parse duration.  Otherwise, only its size is logged.
+    @type logstring: boolean
+    @see: L{stats.registry} for the metrics collected by operation.
+    """
+
+    backend = 'expat'
+    logstring = False
+    
+    @classmethod
+    def saxparser(cls):
+        p = make_parser()
+        p.setFeature(feature_external_ges, 0)
+        h = Handler()
+        p.setContentHandler(h)
+        return (p, h)
+
+    @classmethod
+    def expatparser(cls, handler=None):
+        p = expat.ParserCreate()
+        p.buffer_text = True
+        p.ordered_attributes = True
+        if handler is None:
+            h = ExpatHandler()
+        else:
+            h = handler
+        p.StartElementHandler = h.startElement
+        p.EndElementHandler = h.endElement
+        p.CharacterDataHandler = h.characters
+        return (p, h)
+        
+    def parse(self, file=None, string=None):
+        """
+        SAX parse XML text.
+        @param file: Parse a python I{file-like} object.
+        @type file: I{file-like} object.
+        @param string: Parse string XML.
+        @type string: str
+        """
+        if self.backend == 'lxml' and etree is not None:
+            return self.__lxml(file, string)
+        if self.backend in ('expat', 'lxml'):
+            return self.__expat(file, string)
+        timer = metrics.Timer()
+        timer.start()
+        sax, handler = self.saxparser()
+        if file is not None:
+            sax.parse(file)
+            timer.stop()
+            self.__parsed('sax', file, None, handler, timer)
+            return handler.nodes[0]
+        if string is not None:
+            source = InputSource(None)
+            source.setByteStream(StringIO(string))
+            sax.parse(source)
+            timer.stop()
+            self.__parsed('sax', None, string, handler, timer)
+            return handler.nodes[0]
+
+    def __expat(self, file, string):
+        """
+        Parse XML text using the I{pyexpat} backend.  The cyclic garbage
+        collector is paused while the tree is built because every object
+        allocated during the parse is still reachable when it completes.
+        @param file: Parse a python I{file-like} object (or a path).
+        @type file: I{file-like} object.
+        @param string: Parse string XML.
+        @type string: str
+        """
+        timer = metrics.Timer()
+        timer.start()
+        p, handler = self.expatparser()
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            if file is not None:
+                if isinstance(file, basestring):
+                    fp = open(file, 'rb')
+                    try:
+                        p.ParseFile(fp)
+                    finally:
+                        fp.close()
+                else:
+                    p.ParseFile(file)
+                timer.stop()
+                self.__parsed(
+                    'expat', file, None, handler, timer, p.CurrentByteIndex)
+                return handler.nodes[0]
+            if string is not None:
+                p.Parse(string, True)
+                timer.stop()
+                self.__parsed('expat', None, string, handler, timer)
+                return handler.nodes[0]
+        finally:
+            if collecting:
+                gc.enable()
+
+    @classmethod
+    def lxmloptions(cls, builder):
+        """
+        Get the I{lxml} iterparse() options.  Entities are not resolved
+        and neither the network nor the external DTD is accessed, so a
+        document cannot pull in local files or remote resources.
+        @param builder: The document builder.
+        @type builder: L{LxmlBuilder}
+        @return: The iterparse() keyword arguments.
+        @rtype: dict
+        """
+        return dict(
+            events=builder.events,
+            resolve_entities=False,
+            no_network=True,
+            load_dtd=False)
+
+    def __lxml(self, file, string):
+        """
+        Parse XML text using the I{lxml} backend.
+        @param file: Parse a python I{file-like} object (or a path).
+        @type file: I{file-like} object.
+        @param string: Parse string XML.
+        @type string: str
+        """
+        timer = metrics.Timer()
+        timer.start()
+        builder = LxmlBuilder()
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            if file is not None:
+                events = etree.iterparse(file, **self.lxmloptions(builder))
+                document = builder.build(events)
+                timer.stop()
+                self.__parsed('lxml', file, None, builder, timer)
+                return document
+            if string is not None:
+                events = etree.iterparse(
+                    StringIO(string), **self.lxmloptions(builder))
+                document = builder.build(events)
+                timer.stop()
+                self.__parsed('lxml', None, string, builder, timer)
+                return document
+        finally:
+            if collecting:
+                gc.enable()
+
+    def __parsed(self, backend, file, string, handler, timer, size=None):
+        """
+        Log the parse duration and record the parse metrics of the
+        current operation.
+        @param backend: The parser backend.
+        @type backend: str
+        @param file: The parsed file (or path).
+        @type file: I{file-like} object.
+        @param string: The parsed string.
+        @type string: str
+        @param handler: The handler (or builder) that built the document.
+        @type handler: L{ExpatHandler}
+        @param timer: The (stopped) parse timer.
+        @type timer: L{metrics.Timer}
+        @param size: The size of the parsed file when known.
+        @type size: int
+        """
+        if string is not None:
+            size = len(string)
+            if self.logstring:
+                metrics.log.debug(
+                    '%s\n%s duration: %s', string, backend, timer)
+            else:
+                metrics.log.debug(
+                    '%s (%d bytes) duration: %s', backend, size, timer)
+        else:
+            metrics.log.debug('%s (%s) duration: %s', backend, file, timer)
+        if size is None or size < 0:
+            size = 0
+        registry.parsed(
+            size,
+            handler.elements,
+            max(handler.maxdepth-1, 0),
+            timer.duration())
+
+    def iterparse(self, file=None, string=None, name=None, ns=None,
+            depth=None, size=65536):
+        """
+        Incrementally parse XML text and yield the elements selected by
+        (optional) name, namespace and/or depth as each one is closed.
+        Yielded elements are removed from the tree so only the branch
+        that is still open is kept in memory.  Selected elements should
+        not be nested.  The recorded parse time does not include the
+        time spent consuming the yielded elements.
+        @param file: Parse a python I{file-like} object (or a path).
+        @type file: I{file-like} object.
+        @param string: Parse string XML.
+        @type string: str
+        @param name: The name of the selected elements.
+        @type name: basestring
+        @param ns: The namespace of the selected elements.
+        @type ns: (I{prefix}, I{name})
+        @param depth: The depth of the selected elements where the
+            root element has a depth of (1).
+        @type depth: int
+        @param size: The number of bytes fed to the parser at a time.
+        @type size: int
+        @return: A generator of the selected elements.
+        @rtype: generator
+        """
+        if file is None and string is None:
+            return
+        timer = metrics.Timer()
+        timer.start()
+        handler = StreamHandler(name, ns, depth)
+        p, handler = self.expatparser(handler)
+        elapsed = 0.0
+        parsed = 0
+        try:
+            if file is not None:
+                if isinstance(file, basestring):
+                    fp = open(file, 'rb')
+                else:
+                    fp = file
+                try:
+                    chunk = fp.read(size)
+                    while chunk:
+                        started = time.time()
+                        p.Parse(chunk, False)
+                        elapsed += time.time()-started
+                        parsed += len(chunk)
+                        for node in self.__ready(handler):
+                            yield node
+                        chunk = fp.read(size)
+                finally:
+                    if fp is not file:
+                        fp.close()
+            if string is not None:
+                for i in xrange(0, len(string), size):
+                    chunk = string[i:i+size]
+                    started = time.time()
+                    p.Parse(chunk, False)
+                    elapsed += time.time()-started
+                    parsed += len(chunk)
+                    for node in self.__ready(handler):
+                        yield node
+            started = time.time()
+            p.Parse('', True)
+            elapsed += time.time()-started
+            for node in self.__ready(handler):
+                yield node
+        finally:
+            timer.stop()
+            metrics.log.debug(
+                'expat (streamed, %d bytes) duration: %s', parsed, timer)
+            registry.parsed(
+                parsed,
+                handler.elements,
+                max(handler.maxdepth-1, 0),
+                elapsed)
+
+    def __ready(self, handler):
+        """
+        Take the selected elements that are ready to be consumed.
+        @param handler: A stream handler.
+        @type handler: L{StreamHandler}
+        @return: The selected elements.
+        @rtype: [L{Element},..]
+        """
+        ready = handler.ready
+        handler.ready = []
+        return ready
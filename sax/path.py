@@ -0,0 +1,193 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the (LGPL) GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Library Lesser General Public License for more details at
+# ( http://www.gnu.org/licenses/lgpl.html ).
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+# written by: Jeff Ortel ( jortel@redhat.com )
+
+"""
+Provides compiled (element) I{path} query classes.
+"""
+
+from logging import getLogger
+from suds import *
+from suds.sax import splitPrefix
+
+log = getLogger(__name__)
+
+#
+# compiled paths: path -> L{Path}.
+#
+paths = {}
+
+#
+# the maximum number of cached compiled paths.
+#
+pathlimit = 1000
+
+
+class Path:
+    """
+    A compiled path query: a (/) separated list of steps that is parsed
+    once and can be evaluated against any number of elements.  Each step
+    is an element name with an optional prefix.  The name may be (*) to
+    match any element and the step is matched against all descendants
+    instead of the children when it follows (//).
+    Eg: I{Body/*}, I{Envelope//ns1:WsRelationship}, I{//tns:*}
+    The prefixes are resolved in the context of the node being searched.
+    @ivar path: The path.
+    @type path: basestring
+    @ivar steps: The parsed steps.
+    @type steps: [(I{descendant}, I{prefix}, I{name}),..]
+    """
+
+    @classmethod
+    def compile(cls, path):
+        """
+        Get the compiled query for the specified path.  Compiled queries
+        are cached by path.
+        @param path: A (/) separated list of element names.
+        @type path: basestring
+        @return: The compiled query.
+        @rtype: L{Path}
+        """
+        try:
+            return paths[path]
+        except KeyError:
+            compiled = cls(path)
+            if len(paths) < pathlimit:
+                paths[path] = compiled
+            return compiled
+
+    def __init__(self, path):
+        """
+        @param path: A (/) separated list of element names.
+        @type path: basestring
+        """
+        self.path = path
+        self.steps = []
+        descendant = False
+        for i, part in enumerate(path.split('/')):
+            if not len(part):
+                if i > 0:
+                    descendant = True
+                continue
+            prefix, name = splitPrefix(part)
+            if name == '*':
+                name = None
+            self.steps.append((descendant, prefix, name))
+            descendant = False
+
+    def first(self, node):
+        """
+        Get the node at the end of the path.  Each step selects the
+        I{first} matching node.
+        @param node: The element to be searched.
+        @type node: L{Element}
+        @return: The node at the end of the path or I{None} when not-found.
+        @rtype: L{Element}
+        """
+        result = None
+        for step in self.steps:
+            result = self.__first(node, step)
+            if result is None:
+                break
+            node = result
+        return result
+
+    def children(self, node):
+        """
+        Get the nodes matched by the last step in the node at the end
+        of the path minus the last step, where each of those steps
+        selects the I{first} matching node.
+        @param node: The element to be searched.
+        @type node: L{Element}
+        @return: The matched nodes.
+        @rtype: [L{Element},..]
+        """
+        if not len(self.steps):
+            return []
+        for step in self.steps[:-1]:
+            node = self.__first(node, step)
+            if node is None:
+                return []
+        return self.__all(node, self.steps[-1])
+
+    def select(self, node):
+        """
+        Get all of the nodes matched by the path (in document order).
+        @param node: The element to be searched.
+        @type node: L{Element}
+        @return: The matched nodes.
+        @rtype: [L{Element},..]
+        """
+        if not len(self.steps):
+            return []
+        result = [node]
+        for step in self.steps:
+            matched = []
+            for n in result:
+                matched += self.__all(n, step)
+            if step[0]:
+                matched = self.__unique(matched)
+            result = matched
+        return result
+
+    def __first(self, node, step):
+        descendant, prefix, name = step
+        ns = self.__namespace(node, prefix)
+        if not descendant:
+            if name is None and ns is None:
+                return node[0]
+            return node.getChild(name, ns)
+        for n in self.__descendants(node):
+            if n.match(name, ns):
+                return n
+        return None
+
+    def __all(self, node, step):
+        descendant, prefix, name = step
+        ns = self.__namespace(node, prefix)
+        if not descendant:
+            if name is None and ns is None:
+                return list(node)
+            return node.getChildren(name, ns)
+        return [n for n in self.__descendants(node) if n.match(name, ns)]
+
+    def __namespace(self, node, prefix):
+        if prefix is None:
+            return None
+        else:
+            return node.resolvePrefix(prefix)
+
+    def __descendants(self, node):
+        stack = list(node)
+        stack.reverse()
+        while len(stack):
+            n = stack.pop()
+            yield n
+            children = list(n)
+            children.reverse()
+            stack += children
+
+    def __unique(self, nodes):
+        result = []
+        found = set()
+        for n in nodes:
+            if id(n) in found:
+                continue
+            found.add(id(n))
+            result.append(n)
+        return result
+
+    def __repr__(self):
+        return 'Path (%s)' % self.path
@@ -0,0 +1,329 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the (LGPL) GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Library Lesser General Public License for more details at
+# ( http://www.gnu.org/licenses/lgpl.html ).
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+# written by: Jeff Ortel ( jortel@redhat.com )
+
+"""
+Provides classes for collecting I{parse} metrics by (SOAP) operation.
+Eg:
+    >>> from suds.sax.stats import registry
+    >>> with registry.track('getItem'):
+    ...     api('getItem', 1234)
+    >>> for metrics in registry.operations():
+    ...     print metrics
+    >>> registry.dump(open('metrics.json', 'w'), indent=2)
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from logging import getLogger
+from suds import *
+
+log = getLogger(__name__)
+
+
+class Metrics:
+    """
+    The (cumulative) parse metrics of an operation.
+    @ivar operation: The operation name.
+    @type operation: str
+    @ivar documents: The number of parsed documents.
+    @type documents: int
+    @ivar bytes: The total size of the parsed documents.
+    @type bytes: int
+    @ivar elements: The total number of parsed elements.
+    @type elements: int
+    @ivar depth: The maximum depth of the parsed documents where the
+        root element has a depth of (1).
+    @type depth: int
+    @ivar parsetime: The total parse time (seconds).
+    @type parsetime: float
+    @ivar unmarshals: The number of unmarshalled nodes.
+    @type unmarshals: int
+    @ivar unmarshaltime: The total unmarshal time (seconds).
+    @type unmarshaltime: float
+    """
+
+    def __init__(self, operation):
+        """
+        @param operation: The operation name.
+        @type operation: str
+        """
+        self.operation = operation
+        self.documents = 0
+        self.bytes = 0
+        self.elements = 0
+        self.depth = 0
+        self.parsetime = 0.0
+        self.unmarshals = 0
+        self.unmarshaltime = 0.0
+
+    def parsed(self, bytes, elements, depth, seconds):
+        """
+        Add a parsed document.
+        @param bytes: The size of the document.
+        @type bytes: int
+        @param elements: The number of elements in the document.
+        @type elements: int
+        @param depth: The depth of the document.
+        @type depth: int
+        @param seconds: The parse time.
+        @type seconds: float
+        """
+        self.documents += 1
+        self.bytes += bytes
+        self.elements += elements
+        if depth > self.depth:
+            self.depth = depth
+        self.parsetime += seconds
+
+    def unmarshalled(self, seconds):
+        """
+        Add an unmarshalled node.
+        @param seconds: The unmarshal time.
+        @type seconds: float
+        """
+        self.unmarshals += 1
+        self.unmarshaltime += seconds
+
+    def time(self):
+        """
+        Get the total (parse + unmarshal) time.
+        @return: The total time (seconds).
+        @rtype: float
+        """
+        return self.parsetime + self.unmarshaltime
+
+    def dict(self):
+        """
+        Get a dictionary representation of the metrics.
+        @return: The metrics.
+        @rtype: dict
+        """
+        return dict(
+            operation=self.operation,
+            documents=self.documents,
+            bytes=self.bytes,
+            elements=self.elements,
+            depth=self.depth,
+            parsetime=self.parsetime,
+            unmarshals=self.unmarshals,
+            unmarshaltime=self.unmarshaltime,
+            time=self.time())
+
+    def __str__(self):
+        return \
+            '%s: documents=%d bytes=%d elements=%d depth=%d ' \
+            'parse=%.3f (s) unmarshal=%.3f (s)' % \
+            (self.operation,
+             self.documents,
+             self.bytes,
+             self.elements,
+             self.depth,
+             self.parsetime,
+             self.unmarshaltime)
+
+    def __repr__(self):
+        return 'Metrics (%s)' % self.operation
+
+
+class Registry:
+    """
+    An in-process registry of the parse metrics by operation.  The
+    current operation is tracked per thread; documents parsed (and nodes
+    unmarshalled) while no operation is tracked are recorded under the
+    L{default} operation.
+    @cvar default: The name used when no operation is tracked.
+    @type default: str
+    @ivar enabled: Whether metrics are recorded.
+    @type enabled: boolean
+    @ivar metrics: The metrics by operation.
+    @type metrics: {str:L{Metrics}}
+    """
+
+    default = '<none>'
+
+    def __init__(self):
+        self.enabled = True
+        self.metrics = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def operation(self):
+        """
+        Get the operation tracked by the current thread.
+        @return: The operation name.
+        @rtype: str
+        """
+        stack = getattr(self.local, 'stack', None)
+        if stack:
+            return stack[-1]
+        return self.default
+
+    def push(self, operation):
+        """
+        Start tracking an operation in the current thread.
+        @param operation: The operation name.
+        @type operation: str
+        """
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = []
+            self.local.stack = stack
+        stack.append(operation)
+
+    def pop(self):
+        """
+        Stop tracking the current operation in the current thread.
+        @return: The operation name.
+        @rtype: str
+        """
+        return self.local.stack.pop()
+
+    @contextmanager
+    def track(self, operation):
+        """
+        Track an operation for the duration of a I{with} block.
+        @param operation: The operation name.
+        @type operation: str
+        """
+        self.push(operation)
+        try:
+            yield self
+        finally:
+            self.pop()
+
+    def tracked(self, operation, iterable):
+        """
+        Track an operation only while the items of a (lazy) iterable are
+        being produced.  Work done by the consumer between items is not
+        attributed to the operation.
+        @param operation: The operation name.
+        @type operation: str
+        @param iterable: An iterable, eg: a generator.
+        @type iterable: I{iterable}
+        @return: A generator of the items.
+        @rtype: generator
+        """
+        iterator = iter(iterable)
+        while True:
+            self.push(operation)
+            try:
+                item = iterator.next()
+            finally:
+                self.pop()
+            yield item
+
+    def parsed(self, bytes, elements, depth, seconds):
+        """
+        Record a parsed document for the current operation.
+        @param bytes: The size of the document.
+        @type bytes: int
+        @param elements: The number of elements in the document.
+        @type elements: int
+        @param depth: The depth of the document.
+        @type depth: int
+        @param seconds: The parse time.
+        @type seconds: float
+        """
+        if not self.enabled:
+            return
+        self.lock.acquire()
+        try:
+            self.__metrics().parsed(bytes, elements, depth, seconds)
+        finally:
+            self.lock.release()
+
+    def unmarshalled(self, seconds):
+        """
+        Record an unmarshalled node for the current operation.
+        @param seconds: The unmarshal time.
+        @type seconds: float
+        """
+        if not self.enabled:
+            return
+        self.lock.acquire()
+        try:
+            self.__metrics().unmarshalled(seconds)
+        finally:
+            self.lock.release()
+
+    def get(self, operation):
+        """
+        Get the metrics of an operation.
+        @param operation: The operation name.
+        @type operation: str
+        @return: The metrics or I{None} when not-found.
+        @rtype: L{Metrics}
+        """
+        return self.metrics.get(operation)
+
+    def operations(self):
+        """
+        Get the metrics of all operations, costliest (total time) first.
+        @return: The metrics.
+        @rtype: [L{Metrics},..]
+        """
+        result = self.metrics.values()
+        result.sort(key=lambda m: m.time(), reverse=True)
+        return result
+
+    def clear(self):
+        """
+        Clear all metrics.
+        """
+        self.lock.acquire()
+        try:
+            self.metrics = {}
+        finally:
+            self.lock.release()
+
+    def dumps(self, indent=None):
+        """
+        Get the metrics of all operations as JSON.
+        @param indent: The (optional) JSON indent.
+        @type indent: int
+        @return: A JSON list, costliest operation first.
+        @rtype: str
+        """
+        return json.dumps([m.dict() for m in self.operations()], indent=indent)
+
+    def dump(self, fp, indent=None):
+        """
+        Write the metrics of all operations as JSON.
+        @param fp: A python I{file-like} object.
+        @type fp: I{file-like} object.
+        @param indent: The (optional) JSON indent.
+        @type indent: int
+        """
+        fp.write(self.dumps(indent))
+
+    def __metrics(self):
+        operation = self.operation()
+        try:
+            return self.metrics[operation]
+        except KeyError:
+            metrics = Metrics(operation)
+            self.metrics[operation] = metrics
+            return metrics
+
+    def __str__(self):
+        return '\n'.join([str(m) for m in self.operations()])
+
+
+#
+# The (process wide) metrics registry.
+#
+registry = Registry()
@@ -0,0 +1,40 @@
+"""
+Jama item data shared by the tests.
+"""
+import datetime
+import random
+
+
+def make_items(count, seed):
+    """
+    Generates random Jama item data.
+    """
+    r = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'delta']
+    items = []
+    for i in xrange(count):
+        def relationships():
+            return [
+                {'global_id': 'G',
+                 'project_id': 'P-{}'.format(r.randrange(count)),
+                 'type': r.choice(['Verifies', 'Derived']),
+                 'project': 'p',
+                 'name': 'n'}
+                for _ in xrange(r.randint(0, 3))]
+
+        items.append({
+            'project_id': 'P-{}'.format(i),
+            'object_type': r.choice(['REQ', 'TEST']),
+            'title': r.choice(words),
+            'object_created': datetime.datetime(2016, 1, 1) +
+            datetime.timedelta(seconds=r.randrange(10 ** 8)),
+            'object_modified': datetime.datetime(2017, 1, 1) +
+            datetime.timedelta(seconds=r.randrange(10 ** 8)),
+            'location': r.sample(words, r.randint(0, 3)),
+            'tags': r.sample(words, r.randint(0, 2)),
+            'fields': {'status': r.choice(words)},
+            'upstream': relationships(),
+            'downstream': relationships(),
+            'report_path': 'report.xml'})
+
+    return items
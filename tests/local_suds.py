@@ -0,0 +1,39 @@
+"""
+Makes the suds packages of this repository (sax, transport, ...) take the
+place of those of the installed suds, so the tests exercise this code.
+"""
+import imp
+import os
+import sys
+
+# directory holding the suds packages of this repository
+ROOT = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def install():
+    """
+    Imports the installed suds with this repository ahead of it on the
+    package search path, before suds imports any of its packages.
+
+    :return: the suds package
+    :rtype: module
+    """
+    suds = sys.modules.get('suds')
+    if suds is None:
+        path = imp.find_module('suds')[1]
+        suds = imp.new_module('suds')
+        suds.__file__ = os.path.join(path, '__init__.py')
+        suds.__path__ = [ROOT, path]
+        sys.modules['suds'] = suds
+        try:
+            execfile(suds.__file__, suds.__dict__)
+        except Exception:
+            del sys.modules['suds']
+            raise
+
+    elif ROOT not in suds.__path__:
+        raise ImportError(
+            'suds was imported before the packages of {}'.format(ROOT))
+
+    return suds
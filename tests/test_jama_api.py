@@ -0,0 +1,286 @@
+"""
+Tests of streaming the replies of the Jama SOAP API.
+"""
+import datetime
+import mimetools
+import sys
+import unittest
+import urllib
+from StringIO import StringIO
+
+import local_suds
+local_suds.install()
+
+sys.path.insert(0, local_suds.ROOT)
+
+from suds import WebFault
+from suds.sudsobject import Object
+from suds.transport import Reply, Transport, TransportError
+from suds.transport.https import HttpAuthenticated
+
+from jama.api import API
+
+try:
+    import findout_downstream_links
+except ImportError:
+    findout_downstream_links = None
+
+
+# url of the service description
+WSDL_URL = 'http://jama.example.com/ws/v3/soap/ContourSoapService?wsdl'
+
+# service description of the tested operation, modelled on that of Jama
+WSDL = '''<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+  xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+  xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+  xmlns:impl="http://v3.ws.contour.jamasoftware.com"
+  xmlns:tns1="http://types.ws.contour.jamasoftware.com"
+  targetNamespace="http://v3.ws.contour.jamasoftware.com">
+ <types>
+  <xsd:schema targetNamespace="http://types.ws.contour.jamasoftware.com"
+    elementFormDefault="qualified">
+   <xsd:complexType name="wsAuth"><xsd:sequence>
+    <xsd:element name="password" type="xsd:string" nillable="true"/>
+    <xsd:element name="user" type="xsd:string" nillable="true"/>
+   </xsd:sequence></xsd:complexType>
+   <xsd:complexType name="WsItem"><xsd:sequence>
+    <xsd:element name="createdDate" type="xsd:dateTime" nillable="true"/>
+    <xsd:element name="description" type="xsd:string" nillable="true"/>
+    <xsd:element name="globalId" type="xsd:string" nillable="true"/>
+    <xsd:element name="id" type="xsd:long" nillable="true"/>
+    <xsd:element name="name" type="xsd:string" nillable="true"/>
+   </xsd:sequence></xsd:complexType>
+   <xsd:complexType name="WsRelationship"><xsd:sequence>
+    <xsd:element name="id" type="xsd:long" nillable="true"/>
+    <xsd:element name="relationshipTypeId" type="xsd:long" nillable="true"/>
+    <xsd:element name="toItem" type="tns1:WsItem" nillable="true"/>
+   </xsd:sequence></xsd:complexType>
+  </xsd:schema>
+  <xsd:schema targetNamespace="http://v3.ws.contour.jamasoftware.com"
+    elementFormDefault="qualified">
+   <xsd:import namespace="http://types.ws.contour.jamasoftware.com"/>
+   <xsd:element name="getDownstreamRelationships"><xsd:complexType>
+    <xsd:sequence>
+     <xsd:element name="token" type="tns1:wsAuth"/>
+     <xsd:element name="itemId" type="xsd:long"/>
+    </xsd:sequence>
+   </xsd:complexType></xsd:element>
+   <xsd:element name="getDownstreamRelationshipsResponse"><xsd:complexType>
+    <xsd:sequence>
+     <xsd:element name="getDownstreamRelationshipsReturn"
+       type="tns1:WsRelationship" minOccurs="0" maxOccurs="unbounded"/>
+    </xsd:sequence>
+   </xsd:complexType></xsd:element>
+  </xsd:schema>
+ </types>
+ <message name="getDownstreamRelationshipsRequest">
+  <part name="parameters" element="impl:getDownstreamRelationships"/>
+ </message>
+ <message name="getDownstreamRelationshipsResponse">
+  <part name="parameters" element="impl:getDownstreamRelationshipsResponse"/>
+ </message>
+ <portType name="ContourSoapService">
+  <operation name="getDownstreamRelationships">
+   <input message="impl:getDownstreamRelationshipsRequest"/>
+   <output message="impl:getDownstreamRelationshipsResponse"/>
+  </operation>
+ </portType>
+ <binding name="ContourSoapServiceSoapBinding" type="impl:ContourSoapService">
+  <soap:binding style="document"
+    transport="http://schemas.xmlsoap.org/soap/http"/>
+  <operation name="getDownstreamRelationships">
+   <soap:operation soapAction=""/>
+   <input><soap:body use="literal"/></input>
+   <output><soap:body use="literal"/></output>
+  </operation>
+ </binding>
+ <service name="ContourSoapServiceService">
+  <port name="ContourSoapService" binding="impl:ContourSoapServiceSoapBinding">
+   <soap:address
+     location="http://jama.example.com/ws/v3/soap/ContourSoapService"/>
+  </port>
+ </service>
+</definitions>
+'''
+
+# start of the replies
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soapenv:Envelope'
+    ' xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">')
+
+# SOAP Header of the replies which have one
+HEADER = (
+    '<soapenv:Header><h:session xmlns:h="urn:session">'
+    '<h:id>1</h:id><h:user><h:name>me</h:name></h:user>'
+    '</h:session></soapenv:Header>')
+
+# a returned relationship
+RELATIONSHIP = (
+    '<getDownstreamRelationshipsReturn>'
+    '<ns1:id xmlns:ns1="http://types.ws.contour.jamasoftware.com">{0}</ns1:id>'
+    '<relationshipTypeId>22</relationshipTypeId>'
+    '<toItem>'
+    '<createdDate>2017-03-04T10:11:12.000-05:00</createdDate>'
+    '<description xsi:nil="true"/>'
+    '<globalId>SYS-REQ-{0}</globalId>'
+    '<id>{1}</id>'
+    '<name>Item &amp; name {0} caf\xc3\xa9</name>'
+    '</toItem></getDownstreamRelationshipsReturn>')
+
+# reply of a SOAP Fault
+FAULT = (
+    ENVELOPE + '<soapenv:Body><soapenv:Fault>'
+    '<faultcode>soapenv:Server</faultcode>'
+    '<faultstring>No item with ID 1234</faultstring>'
+    '</soapenv:Fault></soapenv:Body></soapenv:Envelope>')
+
+
+def make_reply(count, header=False):
+    """
+    Generates the reply of a getDownstreamRelationships call.
+    """
+    parts = [
+        ENVELOPE, HEADER if header else '', '<soapenv:Body>'
+        '<getDownstreamRelationshipsResponse'
+        ' xmlns="http://v3.ws.contour.jamasoftware.com">']
+    parts.extend(RELATIONSHIP.format(i, 1000 + i) for i in xrange(count))
+    parts.append(
+        '</getDownstreamRelationshipsResponse>'
+        '</soapenv:Body></soapenv:Envelope>')
+    return ''.join(parts)
+
+
+def dump(value):
+    """
+    Converts a suds object to nested tuples of its values with their types.
+    """
+    if isinstance(value, Object):
+        return (value.__class__.__name__,
+                [(k, dump(v)) for k, v in value])
+
+    if isinstance(value, list):
+        return [dump(v) for v in value]
+
+    return (type(value), value)
+
+
+class ReplyTransport(Transport):
+    """
+    Transport which serves the service description and a fixed reply.
+    """
+    def __init__(self, reply):
+        Transport.__init__(self)
+        self.reply = reply
+
+    def open(self, request):
+        return StringIO(WSDL)
+
+    def send(self, request):
+        return Reply(200, {}, self.reply)
+
+
+class HttpReplyTransport(HttpAuthenticated):
+    """
+    HTTP transport which serves the service description and a fixed reply
+    instead of opening connections.
+    """
+    def __init__(self, reply):
+        HttpAuthenticated.__init__(self, username='me', password='secret')
+        self.file = StringIO(reply)
+
+    def u2open(self, u2request):
+        url = u2request.get_full_url()
+        fp = StringIO(WSDL) if url == WSDL_URL else self.file
+        return urllib.addinfourl(fp, mimetools.Message(StringIO('')), url)
+
+
+class ReturnedAPI(object):
+    """
+    API which streams the elements of the list returned by the client.
+    """
+    def __init__(self, api):
+        self.api = api
+
+    def stream(self, func_name, *args, **kwargs):
+        return iter(self.api(func_name, *args, **kwargs))
+
+
+class StreamTest(unittest.TestCase):
+
+    def make_api(self, transport):
+        return API('me', 'secret', WSDL_URL, transport=transport, cache=None)
+
+    def call(self, reply):
+        """
+        Returns the streamed and the returned relationships of a reply.
+        """
+        api = self.make_api(ReplyTransport(reply))
+        streamed = list(api.stream('getDownstreamRelationships', 1234))
+        return streamed, api('getDownstreamRelationships', 1234)
+
+    def test_typed(self):
+        streamed, returned = self.call(make_reply(3))
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(dump(streamed), dump(returned))
+        item = streamed[2].toItem
+        self.assertEqual(item.id, 1002L)
+        self.assertEqual(item.name, u'Item & name 2 caf\xe9')
+        self.assertEqual(item.description, None)
+        self.assertTrue(isinstance(item.createdDate, datetime.datetime))
+
+    def test_header(self):
+        streamed, returned = self.call(make_reply(2, header=True))
+        self.assertEqual(
+            [r.toItem.globalId for r in streamed], ['SYS-REQ-0', 'SYS-REQ-1'])
+        self.assertEqual(dump(streamed), dump(returned))
+
+    def test_empty(self):
+        streamed, returned = self.call(make_reply(0))
+        self.assertEqual(streamed, [])
+
+    def test_incremental(self):
+        reply = make_reply(2000)
+        transport = HttpReplyTransport(reply)
+        api = self.make_api(transport)
+        relationships = api.stream('getDownstreamRelationships', 1234)
+        self.assertEqual(relationships.next().toItem.globalId, 'SYS-REQ-0')
+        self.assertTrue(transport.file.tell() < len(reply))
+        self.assertEqual(len(list(relationships)), 1999)
+        self.assertTrue(transport.file.closed)
+
+    def test_fault(self):
+        api = self.make_api(ReplyTransport(FAULT))
+        relationships = api.stream('getDownstreamRelationships', 1234)
+        with self.assertRaises(WebFault) as raised:
+            list(relationships)
+        self.assertEqual(
+            raised.exception.fault.faultstring, 'No item with ID 1234')
+
+    def test_http_fault(self):
+        transport = ReplyTransport(None)
+        transport.send = lambda request: self.fail_request(FAULT)
+        api = self.make_api(transport)
+        with self.assertRaises(WebFault):
+            api.stream('getDownstreamRelationships', 1234)
+
+    def fail_request(self, reply):
+        raise TransportError('Internal Server Error', 500, StringIO(reply))
+
+    @unittest.skipIf(
+        findout_downstream_links is None,
+        'the dependencies of findout_downstream_links are not installed')
+    def test_downstream_data(self):
+        api = self.make_api(ReplyTransport(make_reply(3)))
+        findout_downstream_links.jamasoap = api
+        streamed = findout_downstream_links.getDownSteramData(1234)
+        findout_downstream_links.jamasoap = ReturnedAPI(api)
+        returned = findout_downstream_links.getDownSteramData(1234)
+        self.assertEqual(len(streamed[0]), 3)
+        self.assertEqual(streamed, returned)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests of the cache of item data parsed from Jama trace data reports.
+"""
+import cPickle
+import datetime
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from dateutil import tz
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+import jama_cache
+from jama_fixtures import make_items
+
+
+class Planted(object):
+    """Object which records whether it was unpickled"""
+    loaded = False
+
+    def __reduce__(self):
+        return setattr, (Planted, 'loaded', True)
+
+
+class JamaReportCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.report = os.path.join(self.dir, 'report.xml')
+        with open(self.report, 'w') as f:
+            f.write('report')
+
+        self.cache = jama_cache.JamaReportCache(
+            os.path.join(self.dir, 'cache'), block_size=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def roundtrip(self, items):
+        self.assertEqual(list(self.cache.put(self.report, iter(items))), items)
+        cached = self.cache.get(self.report)
+        try:
+            self.assertEqual(len(cached), len(items))
+            self.assertEqual(list(cached), items)
+            self.assertEqual(cached[-1], items[-1])
+            return cached[0]
+
+        finally:
+            cached.close()
+
+    def test_naive_dates(self):
+        item = self.roundtrip(make_items(100, 1))
+        self.assertIsNone(item['object_created'].tzinfo)
+
+    def test_aware_dates(self):
+        items = make_items(100, 1)
+        for i, item in enumerate(items):
+            item['object_created'] = item['object_created'].replace(
+                tzinfo=tz.tzoffset(None, 3600 * (i % 5 - 2)))
+            item['object_modified'] = item['object_modified'].replace(
+                tzinfo=tz.tzutc())
+
+        item = self.roundtrip(items)
+        self.assertEqual(
+            item['object_created'].utcoffset(), datetime.timedelta(hours=-2))
+
+    def test_no_pickle(self):
+        path = self.cache._path(self.cache.key(self.report))
+        os.makedirs(os.path.dirname(path))
+        data = cPickle.dumps([Planted()], cPickle.HIGHEST_PROTOCOL)
+        with open(path, 'wb') as f:
+            f.write(jama_cache.CACHE_HEADER.pack(
+                jama_cache.CACHE_MAGIC, jama_cache.CACHE_HEADER.size +
+                len(data) + 1))
+            f.write('p' + data)
+            f.write(marshal.dumps(
+                [(jama_cache.CACHE_HEADER.size, len(data) + 1, 1)]))
+
+        cached = self.cache.get(self.report)
+        try:
+            self.assertRaises(ValueError, list, cached)
+
+        finally:
+            cached.close()
+
+        self.assertFalse(Planted.loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests of finding what changed between snapshots of Jama items.
+"""
+import copy
+import datetime
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+import jama_delta
+from jama_fixtures import make_items
+
+
+class DiffItemsTest(unittest.TestCase):
+
+    def setUp(self):
+        r = random.Random(1)
+        self.old = make_items(500, 2)
+        self.new = copy.deepcopy(self.old)
+        r.shuffle(self.new)
+        for item in r.sample(self.new, 20):
+            item['fields']['status'] = 'changed'
+
+        for item in r.sample(self.new, 10):
+            item['upstream'].reverse()
+
+        self.removed = set(i['project_id'] for i in self.new[:5])
+        self.new = self.new[5:]
+        self.new.append(dict(self.old[0], project_id='Q-1'))
+        self.expected = dict.fromkeys(self.removed, jama_delta.REMOVED)
+        self.expected['Q-1'] = jama_delta.ADDED
+        old = {i['project_id']: i for i in self.old}
+        for item in self.new:
+            if item['project_id'] in old and (
+                    item['fields'] != old[item['project_id']]['fields']):
+                self.expected[item['project_id']] = jama_delta.MODIFIED
+
+    def diff(self, **kwargs):
+        changes = list(jama_delta.diff_items(
+            iter(self.old), iter(self.new), **kwargs))
+        self.assertEqual(
+            [c['project_id'] for c in changes],
+            sorted(c['project_id'] for c in changes))
+        return {c['project_id']: c['change'] for c in changes}
+
+    def test_single_run(self):
+        self.assertEqual(self.diff(), self.expected)
+
+    def test_several_runs(self):
+        self.assertEqual(self.diff(run_size=50), self.expected)
+
+    def test_several_runs_wrapped_files(self):
+        # temporary files are wrapped on Windows
+        temporary_file = tempfile.TemporaryFile
+        tempfile.TemporaryFile = tempfile.NamedTemporaryFile
+        try:
+            self.assertEqual(self.diff(run_size=50), self.expected)
+
+        finally:
+            tempfile.TemporaryFile = temporary_file
+
+    def test_timezone_aware_dates(self):
+        for items in (self.old, self.new):
+            for item in items:
+                for key in ('object_created', 'object_modified'):
+                    item[key] = item[key].replace(tzinfo=UTC)
+
+        self.assertEqual(self.diff(run_size=50), self.expected)
+
+
+def relationship(project_id, kind):
+    """
+    Creates a relationship of Jama item data.
+    """
+    return {'global_id': 'G', 'project_id': project_id, 'type': kind,
+            'project': 'p', 'name': 'n'}
+
+
+class ModificationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.old = make_items(1, 1)[0]
+        self.old['upstream'] = [
+            relationship('P-1', 'Verifies'), relationship('P-2', 'Derived')]
+        self.old['downstream'] = [
+            relationship('P-3', 'Verifies'), relationship('P-4', 'Verifies')]
+        self.new = copy.deepcopy(self.old)
+
+    def diff(self):
+        changes = list(jama_delta.diff_items([self.old], [self.new]))
+        self.assertEqual(len(changes), 1)
+        change = changes[0]
+        self.assertEqual(change['change'], jama_delta.MODIFIED)
+        self.assertEqual(change['project_id'], 'P-0')
+        self.assertEqual(change['old'], self.old)
+        self.assertEqual(change['new'], self.new)
+        return change
+
+    def test_attributes(self):
+        self.new['title'] = 'changed'
+        self.new['tags'] = self.old['tags'] + ['added']
+        change = self.diff()
+        self.assertEqual(change['attributes'], {
+            'title': (self.old['title'], 'changed'),
+            'tags': (self.old['tags'], self.new['tags'])})
+        self.assertEqual(change['fields'], {})
+        self.assertEqual(change['links'], {})
+
+    def test_fields(self):
+        self.new['fields'] = {'owner': 'me'}
+        change = self.diff()
+        self.assertEqual(change['attributes'], {})
+        self.assertEqual(change['fields'], {
+            'status': (self.old['fields']['status'], None),
+            'owner': (None, 'me')})
+        self.assertEqual(change['links'], {})
+
+    def test_links(self):
+        self.new['upstream'] = [
+            relationship('P-2', 'Derived'), relationship('P-1', 'Derived'),
+            relationship('P-5', 'Verifies')]
+        self.new['downstream'].reverse()
+        change = self.diff()
+        self.assertEqual(change['attributes'], {})
+        self.assertEqual(change['fields'], {})
+        self.assertEqual(change['links'], {'upstream': {
+            jama_delta.ADDED: [('P-1', 'Derived'), ('P-5', 'Verifies')],
+            jama_delta.REMOVED: [('P-1', 'Verifies')]}})
+
+
+class _UTC(datetime.tzinfo):
+
+    def utcoffset(self, date):
+        return datetime.timedelta(0)
+
+    def dst(self, date):
+        return datetime.timedelta(0)
+
+    def tzname(self, date):
+        return 'UTC'
+
+
+UTC = _UTC()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Tests of parsing Jama trace data reports (HTML).
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+import jama_html
+
+
+# backends compared with each other
+BACKENDS = ['html'] + (['lxml'] if jama_html.etree is not None else [])
+
+# values every item must have
+ITEM_HEAD = (
+    '<h2 class="object-title">Title &amp; <b>more</b></h2>'
+    '<span class="object-type">REQ</span><br>'
+    '<span class="project-id"> P-{} </span>'
+    '<p>Created <span class="object-start">2016-01-02T03:04:05</span> '
+    'Modified <span class="object-update">2017-01-02T03:04:05</span></p>')
+
+# item bodies parsed by every backend, with the values expected from them
+ITEMS = {
+    'complete': (
+        '<table class="info-table">'
+        '<tr class="info-table-field-row">'
+        '<td class="info-table-field-label">status</td>'
+        '<td class="info-table-field"><p>open</p></td></tr>'
+        '<tr><td><span class="location-node">A</span> / '
+        '<span class="location-node">B</span></td></tr></table>'
+        '<div><a class="tag">t1</a><a class="tag">t2</a></div>'
+        '<table><tr class="upstream-relationship">'
+        '<td class="upstream-relationship-project-id">P-2</td>'
+        '<td class="upstream-relationship-type">Verifies</td></tr></table>',
+        {'fields': {'status': 'open'}, 'location': ['A', 'B'],
+         'tags': ['t1', 't2'],
+         'upstream': [{'project_id': 'P-2', 'type': 'Verifies'}]}),
+    'unclosed list items': (
+        '<ul><li class="location-node">A<li class="location-node">B</ul>',
+        {'location': ['A', 'B']}),
+    'unclosed paragraphs': (
+        '<p class="tag">t1<p class="tag">t2'
+        '<table><tr class="info-table-field-row">'
+        '<td class="info-table-field-label">status</td>'
+        '<td class="info-table-field">open</td></tr></table>',
+        {'tags': ['t1', 't2'], 'fields': {'status': 'open'}}),
+    'unclosed cells': (
+        '<table>'
+        '<tr class="info-table-field-row">'
+        '<td class="info-table-field-label">status'
+        '<td class="info-table-field">open'
+        '<tr class="info-table-field-row">'
+        '<td class="info-table-field-label">owner'
+        '<td class="info-table-field">me'
+        '<tr class="downstream-relationship">'
+        '<td class="downstream-relationship-project-id">P-3'
+        '<td class="downstream-relationship-type">Derived'
+        '</table><span class="tag">t1</span>',
+        {'fields': {'status': 'open', 'owner': 'me'},
+         'downstream': [{'project_id': 'P-3', 'type': 'Derived'}],
+         'tags': ['t1']}),
+    'misplaced end tags': (
+        '<div><p class="tag">t1</div></p><span class="tag">t2</span>'
+        '<ul><li class="location-node"><b>A</li></b>'
+        '<li class="location-node">B</ul>',
+        {'tags': ['t1', 't2'], 'location': ['A', 'B']}),
+}
+
+# tags of the generated documents
+TAGS = [
+    'li', 'p', 'td', 'tr', 'th', 'table', 'ul', 'ol', 'div', 'span', 'a', 'b',
+    'i', 'tbody', 'thead', 'dl', 'dt', 'dd', 'h1', 'h2', 'option', 'br', 'hr',
+    'font', 'pre', 'caption', 'col', 'form']
+
+
+class EventTarget(object):
+    """
+    Records the parser events of a document, with adjacent text merged.
+    """
+    def __init__(self):
+        self.events = []
+
+    def start(self, tag, attrib):
+        self.events.append(('start', tag))
+
+    def end(self, tag):
+        self.events.append(('end', tag))
+
+    def data(self, text):
+        if len(self.events) > 0 and self.events[-1][0] == 'data':
+            text = self.events.pop()[1] + text
+
+        self.events.append(('data', text))
+
+    def comment(self, text):
+        self.events.append(('comment', text))
+
+    def close(self):
+        return self.events
+
+
+def make_document(r):
+    """
+    Generates a random HTML document of unbalanced tags.
+    """
+    parts = []
+    for _ in xrange(r.randint(1, 25)):
+        x = r.random()
+        tag = r.choice(TAGS)
+        if x < 0.45:
+            parts.append('<{}>'.format(tag))
+
+        elif x < 0.5:
+            parts.append('<{}/>'.format(tag))
+
+        elif x < 0.8:
+            parts.append('</{}>'.format(tag))
+
+        else:
+            parts.append(r.choice(['x', ' ']))
+
+    return '<html><body>{}</body></html>'.format(''.join(parts))
+
+
+class ParseReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.etree = jama_html.etree
+
+    def tearDown(self):
+        jama_html.etree = self.etree
+        shutil.rmtree(self.temp_dir)
+
+    def parse(self, backend, bodies):
+        path = os.path.join(self.temp_dir, 'report.html')
+        with open(path, 'w') as f:
+            f.write('<!DOCTYPE html><html><head><title>r</title></head><body>')
+            for i, body in enumerate(bodies):
+                f.write('<!-- jama object start --><div class="object">')
+                f.write(ITEM_HEAD.format(i))
+                f.write(body)
+                f.write('</div><!-- jama object end -->\n')
+
+            f.write('</body></html>')
+
+        jama_html.etree = self.etree if backend == 'lxml' else None
+        return jama_html.parse_report(path)
+
+    def test_items(self):
+        names = sorted(ITEMS)
+        bodies = [ITEMS[name][0] for name in names]
+        for backend in BACKENDS:
+            items = self.parse(backend, bodies)
+            self.assertEqual(len(items), len(names))
+            for i, (name, item) in enumerate(zip(names, items)):
+                self.assertEqual(item['project_id'], 'P-{}'.format(i))
+                self.assertEqual(item['title'], 'Title & more')
+                self.assertEqual(item['object_type'], 'REQ')
+                self.assertEqual(item['object_created'], '2016-01-02T03:04:05')
+                for key, expected in ITEMS[name][1].iteritems():
+                    actual = item[key]
+                    if key in ('upstream', 'downstream'):
+                        actual = [
+                            {k: r[k] for k in expected[0]} for r in actual]
+
+                    self.assertEqual(
+                        actual, expected,
+                        '{} {}: {}'.format(backend, name, key))
+
+    @unittest.skipIf(jama_html.etree is None, 'lxml is not installed')
+    def test_backends(self):
+        bodies = [ITEMS[name][0] for name in sorted(ITEMS)]
+        self.assertEqual(
+            self.parse('html', bodies), self.parse('lxml', bodies))
+
+    @unittest.skipIf(jama_html.etree is None, 'lxml is not installed')
+    def test_events(self):
+        r = random.Random(1)
+        for _ in xrange(500):
+            document = make_document(r)
+            target = EventTarget()
+            parser = jama_html.etree.HTMLParser(target=target)
+            parser.feed(document)
+            expected = parser.close()
+
+            target = EventTarget()
+            parser = jama_html._ReportParser(target)
+            parser.feed(document.decode('utf-8'))
+            parser.close()
+            self.assertEqual(target.events, expected, document)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Tests of planning the queries of live Jama items.
+"""
+import datetime
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+import jama_query
+import jama_report
+
+
+# item types of the queries
+ITEM_TYPES = [
+    {'id': 11, 'display': 'REQ', 'typeKey': 'SYSRQ'},
+    {'id': 12, 'display': 'TEST', 'typeKey': 'TC'},
+    {'id': 13, 'display': 'FOLDER', 'typeKey': 'FLD'}]
+
+
+def date(day):
+    """
+    Creates a date of January 2017.
+    """
+    return datetime.datetime(2017, 1, day)
+
+
+def contains(text, required=True):
+    """
+    Creates a raw condition on a field which must contain text.
+    """
+    return {'field': {
+        'name': 'status', 'value': {'contains': text}, 'required': required}}
+
+
+class PlanQueryTest(unittest.TestCase):
+
+    def plan(self, main, **named):
+        named['main'] = main
+        return jama_query.plan_query(
+            jama_report.JamaFilter(jama_report.FILTER_SCHEMA(named)))
+
+    def assertPlan(self, plan, **expected):
+        for key in ['types', 'created_after', 'created_before',
+                    'modified_after', 'modified_before']:
+            self.assertEqual(getattr(plan, key), expected.get(key), key)
+
+        self.assertEqual(plan.contains, expected.get('contains', frozenset()))
+
+    def test_empty(self):
+        self.assertPlan(self.plan({'location': {'is under': 'A/B'}}))
+        self.assertPlan(self.plan(contains('open', required=False)))
+
+    def test_all(self):
+        plan = self.plan(
+            {'type': ['REQ', 'TEST'], 'according to all': [
+                {'created': {'after': '2017-01-02'}},
+                {'created': {'after': '2017-01-05', 'before': '2017-01-20'}},
+                {'modified': {'before': '2017-01-10'}},
+                contains('open'),
+                'X']},
+            X={'type': 'REQ', 'according to all': [
+                {'created': {'before': '2017-01-15'}}, contains('new')]})
+        self.assertPlan(
+            plan, types=frozenset(['REQ']), created_after=date(5),
+            created_before=date(15), modified_before=date(10),
+            contains=frozenset(['open', 'new']))
+
+    def test_all_types(self):
+        plan = self.plan(
+            {'type': 'REQ', 'according to all': [{'type': 'TEST'}]})
+        self.assertPlan(plan, types=frozenset())
+        self.assertEqual(plan.query(ITEM_TYPES), None)
+
+    def test_any(self):
+        plan = self.plan({'according to any': [
+            {'created': {'after': '2017-01-05', 'before': '2017-01-10'}},
+            {'created': {'after': '2017-01-02', 'before': '2017-01-07'}},
+            {'according to all': [
+                {'created': {'after': '2017-01-03', 'before': '2017-01-08'}},
+                {'modified': {'after': '2017-01-04'}}]}]})
+        self.assertPlan(plan, created_after=date(2), created_before=date(10))
+
+    def test_any_unbounded(self):
+        plan = self.plan({'according to any': [
+            {'created': {'after': '2017-01-05', 'before': '2017-01-10'}},
+            {'modified': {'after': '2017-01-04'}}]})
+        self.assertPlan(plan)
+        plan = self.plan({'according to any': [
+            {'created': {'after': '2017-01-05'}},
+            {'created': {'after': '2017-01-02', 'before': '2017-01-07'}}]})
+        self.assertPlan(plan, created_after=date(2))
+
+    def test_any_types(self):
+        plan = self.plan({'according to any': [
+            {'type': 'REQ'}, {'type': ['TEST', 'FOLDER']}]})
+        self.assertPlan(plan, types=frozenset(['REQ', 'TEST', 'FOLDER']))
+        plan = self.plan({'according to any': [
+            {'type': 'REQ'}, {'created': {'after': '2017-01-05'}}]})
+        self.assertPlan(plan)
+
+    def test_any_contains(self):
+        plan = self.plan({'according to any': [
+            contains('open'),
+            {'according to all': [contains('open'), contains('new')]}]})
+        self.assertPlan(plan, contains=frozenset(['open']))
+
+    def test_any_in_all(self):
+        plan = self.plan(
+            {'type': ['REQ', 'TEST'], 'according to any': ['X', 'Y']},
+            X={'type': 'REQ', 'according to all': [
+                {'modified': {'after': '2017-01-05'}}]},
+            Y={'type': 'FOLDER', 'according to all': [
+                {'modified': {'after': '2017-01-03'}}]})
+        self.assertPlan(
+            plan, types=frozenset(['REQ']), modified_after=date(3))
+
+
+class QueryTest(unittest.TestCase):
+
+    def test_query(self):
+        plan = jama_query.QueryPlan(
+            types=frozenset(['REQ', 'TC']), created_after=date(5),
+            modified_before=date(10), contains=frozenset(['open', 'new']))
+        margin = jama_query.DATE_MARGIN
+        self.assertEqual(plan.query(ITEM_TYPES), {
+            'item_type_id': [11, 12],
+            'created_after': date(5) - margin,
+            'modified_before': date(10) + margin})
+        self.assertEqual(
+            plan.query(ITEM_TYPES, text_search=True)['contains'],
+            ['new', 'open'])
+
+    def test_unknown_types(self):
+        plan = jama_query.QueryPlan(types=frozenset(['OTHER']))
+        self.assertEqual(plan.query(ITEM_TYPES), None)
+        self.assertEqual(jama_query.QueryPlan().query(ITEM_TYPES), {})
+
+
+@unittest.skipUnless(hasattr(time, 'tzset'), 'the timezone cannot be set')
+class DateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'America/Chicago'
+        time.tzset()
+
+    def tearDown(self):
+        if self.tz is None:
+            del os.environ['TZ']
+
+        else:
+            os.environ['TZ'] = self.tz
+
+        time.tzset()
+
+    def test_local(self):
+        parse = jama_query.JamaItemConverter._date
+        self.assertEqual(
+            parse('2017-03-04T16:11:12.000+0000'),
+            datetime.datetime(2017, 3, 4, 10, 11, 12))
+        self.assertEqual(
+            parse('2017-07-04T16:11:12.000+0000'),
+            datetime.datetime(2017, 7, 4, 11, 11, 12))
+        self.assertEqual(
+            parse('2017-07-04T16:11:12'),
+            datetime.datetime(2017, 7, 4, 16, 11, 12))
+
+
+if __name__ == '__main__':
+    unittest.main()
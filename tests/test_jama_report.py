@@ -0,0 +1,357 @@
+"""
+Tests of filtering Jama item data.
+"""
+import copy
+import datetime
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'utils'))
+
+import jama_report
+from jama_filter_set import JamaFilterSet
+from jama_index import JamaItemIndex
+from jama_store import JamaItemStore, np
+from jama_fixtures import make_items
+
+
+# words of the generated items
+WORDS = ['alpha', 'beta', 'gamma', 'delta']
+
+
+def make_filter(conditions):
+    """
+    Creates a filter from raw filter conditions.
+    """
+    return jama_report.JamaFilter(jama_report.FILTER_SCHEMA(conditions))
+
+
+def make_conditions(seed):
+    """
+    Generates random raw filter conditions.  Named conditions only reference
+    the named conditions generated before them, so there are no cycles.
+    """
+    r = random.Random(seed)
+
+    def strcomp():
+        logic = r.choice([
+            'contains', 'does not contain', 'is', 'is not', 'in', 'not in',
+            'matches'])
+        if logic in ('in', 'not in'):
+            return {logic: r.sample(WORDS, r.randint(1, 3))}
+
+        if logic == 'matches':
+            return {logic: r.choice(['al', '.*a$', 'b|g'])}
+
+        return {logic: r.choice(WORDS + ['a', 'mm'])}
+
+    def date():
+        dates = {}
+        if r.random() < 0.7:
+            dates['after'] = '{}-{:02}-01'.format(
+                r.choice([2016, 2017]), r.randint(1, 12))
+
+        if r.random() < 0.7 or not dates:
+            dates['before'] = '{}-{:02}-01'.format(
+                r.choice([2017, 2018, 2019]), r.randint(1, 12))
+
+        return dates
+
+    def leaf(names):
+        kind = r.randint(0, 7)
+        if kind == 0:
+            return {'location': {r.choice(['is under', 'is not under']):
+                                 '/'.join(r.sample(WORDS, r.randint(1, 2)))}}
+
+        if kind == 1:
+            return {'location': {
+                r.choice(['every node', 'no node']): strcomp()}}
+
+        if kind == 2:
+            field = {'name': r.choice(['status', 'owner']), 'value': strcomp()}
+            if r.random() < 0.3:
+                field['required'] = False
+
+            return {'field': field}
+
+        if kind == 3:
+            return {r.choice(['created', 'modified']): date()}
+
+        if kind == 4:
+            return {'tags': {
+                r.choice(['include', 'exclude']): r.choice(WORDS)}}
+
+        if kind in (5, 6) and names:
+            relationships = {}
+            if r.random() < 0.5:
+                relationships['with relationship type'] = r.sample(
+                    ['Verifies', 'Derived'], r.randint(1, 2))
+
+            logic = r.choice(['all match', 'none match', 'count match', None])
+            if logic is not None:
+                relationships[logic] = r.choice(names)
+
+            if logic in (None, 'count match'):
+                relationships['count'] = r.choice([
+                    {'is': r.randint(0, 2)}, {'in': [0, 2]},
+                    {'greater than': 1},
+                    {'greater than': 0, 'less than or equal to': 3}])
+
+            if r.random() < 0.4:
+                relationships['count unknowns'] = True
+
+            return {r.choice(['upstream items', 'downstream items']):
+                    relationships}
+
+        return {'type': r.choice(['REQ', 'TEST'])}
+
+    def group(names, depth):
+        conditions = {}
+        if r.random() < 0.3:
+            conditions['type'] = r.sample(['REQ', 'TEST'], 1)
+
+        children = []
+        for _ in xrange(r.randint(1, 4)):
+            x = r.random()
+            if x < 0.2 and depth < 2:
+                children.append(group(names, depth + 1))
+
+            elif x < 0.35 and names:
+                children.append(r.choice(names))
+
+            else:
+                children.append(leaf(names))
+
+        conditions[r.choice(['according to all', 'according to any'])] = (
+            children)
+        return conditions
+
+    conditions = {}
+    names = []
+    for i in xrange(r.randint(0, 4)):
+        name = 'N{}'.format(i)
+        conditions[name] = group(names, 1) if r.random() < 0.7 else leaf(names)
+        names.append(name)
+
+    conditions['main'] = group(names, 0)
+    return conditions
+
+
+def baseline(jama_filter, items):
+    """
+    Filters items by interpreting the conditions item by item, without
+    compiling them.
+    """
+    item_map = {item['project_id']: item for item in items}
+    return [
+        item for item in items if jama_filter.main_condition(
+            item, item_map, jama_filter.named_conditions)]
+
+
+class EquivalenceTest(unittest.TestCase):
+    """
+    Every way of filtering must give the same results as interpreting the
+    conditions item by item.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.items = make_items(300, 3)
+        for item in cls.items[::25]:
+            item['downstream'].append({
+                'global_id': 'G', 'project_id': 'X-1', 'type': 'Verifies',
+                'project': 'p', 'name': 'n'})
+
+        for item in cls.items[::7]:
+            item['fields']['owner'] = item['title']
+
+        # dates on the bounds of the generated date conditions
+        for i, item in enumerate(cls.items[::5]):
+            item['object_created'] = datetime.datetime(2017, i % 12 + 1, 1)
+
+        cls.filters = [
+            make_filter(make_conditions(seed)) for seed in xrange(60)]
+        cls.expected = [baseline(f, cls.items) for f in cls.filters]
+
+    def check(self, results, expected=None):
+        if expected is None:
+            expected = self.expected
+
+        self.assertEqual(len(results), len(expected))
+        for expected, actual in zip(expected, results):
+            self.assertEqual(
+                [i['project_id'] for i in actual],
+                [i['project_id'] for i in expected])
+
+    def test_generated(self):
+        self.assertTrue(any(
+            0 < len(e) < len(self.items) for e in self.expected))
+        self.assertTrue(any(f.is_relationship() for f in self.filters))
+
+    def test_list(self):
+        self.check([f(self.items) for f in self.filters])
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_store(self):
+        store = JamaItemStore(self.items)
+        self.check([f(store) for f in self.filters])
+
+    def test_index(self):
+        index = JamaItemIndex(self.items)
+        self.check([f(index) for f in self.filters])
+
+    def test_stream(self):
+        self.check([list(f.stream(iter(self.items))) for f in self.filters])
+
+    def test_profile(self):
+        self.check([f.profile(self.items).results for f in self.filters])
+
+    def test_filter_set(self):
+        self.check(JamaFilterSet(self.filters)(self.items))
+
+    def test_incremental(self):
+        incremental = [f.incremental(self.items) for f in self.filters]
+        self.check([i.results() for i in incremental])
+
+        r = random.Random(4)
+        items = copy.deepcopy(self.items)
+        changed = r.sample(items, 20)
+        for item in changed:
+            item['object_type'] = r.choice(['REQ', 'TEST'])
+            item['tags'] = r.sample(WORDS, r.randint(0, 2))
+
+        removed = [item['project_id'] for item in items[-10:]]
+        items = items[:-10]
+        expected = [baseline(f, items) for f in self.filters]
+        for i, before, after in zip(incremental, self.expected, expected):
+            before = set(item['project_id'] for item in before)
+            after = set(item['project_id'] for item in after)
+            entered, left = i.update(changed=changed, removed=removed)
+            self.assertEqual(
+                sorted(item['project_id'] for item in entered),
+                sorted(after - before))
+            self.assertEqual(
+                sorted(item['project_id'] for item in left),
+                sorted(before - after))
+
+        self.check([i.results() for i in incremental], expected)
+
+    def test_parallel(self):
+        # a pool of processes is started per filter
+        self.check(
+            [f.parallel(self.items, processes=2) for f in self.filters[::6]],
+            self.expected[::6])
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.items = make_items(4, 1)
+        object_types = ['REQ', 'REQ', 'TEST', 'REQ']
+        for item, object_type in zip(self.items, object_types):
+            item['object_type'] = object_type
+            item['upstream'] = []
+            item['downstream'] = []
+
+        self.incremental = make_filter(
+            {'main': {'type': 'REQ'}}).incremental(self.items)
+
+    def update(self, **kwargs):
+        entered, left = self.incremental.update(**kwargs)
+        return ([item['project_id'] for item in entered],
+                [item['project_id'] for item in left])
+
+    def changed(self, index, **values):
+        item = copy.deepcopy(self.items[index])
+        item.update(values)
+        return item
+
+    def test_enter(self):
+        self.assertEqual(
+            self.update(changed=[self.changed(2, object_type='REQ')]),
+            (['P-2'], []))
+
+    def test_stay_matched(self):
+        self.assertEqual(
+            self.update(changed=[self.changed(0, title='changed')]),
+            ([], []))
+        self.assertEqual(
+            self.incremental.results()[0]['title'], 'changed')
+
+    def test_leave(self):
+        self.assertEqual(
+            self.update(changed=[self.changed(1, object_type='TEST')]),
+            ([], ['P-1']))
+
+    def test_remove(self):
+        self.assertEqual(
+            self.update(removed=['P-3', 'P-2']), ([], ['P-3']))
+        self.assertEqual(
+            [item['project_id'] for item in self.incremental.results()],
+            ['P-0', 'P-1'])
+
+    def test_add(self):
+        added = self.changed(0, project_id='P-9')
+        self.assertEqual(self.update(added=[added]), (['P-9'], []))
+
+
+class ReferenceCycleTest(unittest.TestCase):
+
+    def test_group_cycle(self):
+        self.assertRaises(
+            jama_report.InvalidCondition, make_filter,
+            {'main': {'according to any': ['X']},
+             'X': {'according to all': ['Y']},
+             'Y': {'according to any': ['X']}})
+
+    def test_cycle_through_relationship(self):
+        self.assertRaises(
+            jama_report.InvalidCondition, make_filter,
+            {'main': {'downstream items': {'all match': 'X'}},
+             'X': {'according to any': ['X']}})
+
+    def test_mutual_cycle_through_relationship(self):
+        self.assertRaises(
+            jama_report.InvalidCondition, make_filter,
+            {'main': {'upstream items': {'all match': 'X'}},
+             'X': {'according to any': ['Y']},
+             'Y': {'according to all': ['X']}})
+
+    def test_relationship_recursion(self):
+        jama_filter = make_filter(
+            {'main': {'according to all': ['X']},
+             'X': {'according to all': [
+                 {'type': 'REQ'},
+                 {'downstream items': {'all match': 'X'}}]}})
+        items = make_items(20, 1)
+        for item, next_item in zip(items, items[1:] + [None]):
+            item['object_type'] = 'REQ'
+            item['downstream'] = [] if next_item is None else [
+                {'global_id': 'G', 'project_id': next_item['project_id'],
+                 'type': 'Verifies', 'project': 'p', 'name': 'n'}]
+
+        items[12]['object_type'] = 'TEST'
+
+        self.assertEqual(jama_filter(items), items[13:])
+
+
+class MemoTest(unittest.TestCase):
+
+    def test_failed_evaluation(self):
+        predicate = make_filter(
+            {'main': {'according to all': ['X']},
+             'X': {'type': 'REQ'}}).compile()
+        item = make_items(1, 1)[0]
+        invalid = dict(item)
+        del invalid['object_type']
+        memo = {}
+        self.assertRaises(KeyError, predicate, invalid, {}, memo)
+        self.assertEqual(
+            predicate(item, {}, memo), item['object_type'] == 'REQ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+"""
+Tests of the sax element tree.
+"""
+import copy
+import cPickle
+import pickle
+import random
+import unittest
+
+import local_suds
+local_suds.install()
+
+from suds.sax.attribute import Attribute
+from suds.sax.element import Element, Prefixes
+from suds.sax.text import Text
+
+
+# pickle (protocol 0), written before elements had slots, of
+# <p:r xmlns:p="urn:a" xmlns:q="urn:q"><c k="v">t</c></p:r>
+OLD_PICKLE = (
+    "(isuds.sax.element\nElement\np0\n(dp1\nS'name'\np2\nS'r'\np3\nsS'p"
+    "arent'\np4\nNsS'text'\np5\nNsS'prefix'\np6\nS'p'\np7\nsS'nsprefixe"
+    "s'\np8\n(dp9\nS'q'\np10\nS'urn:q'\np11\nsg7\nS'urn:a'\np12\nssS'at"
+    "tributes'\np13\n(lp14\nsS'children'\np15\n(lp16\n(isuds.sax.elemen"
+    "t\nElement\np17\n(dp18\ng2\nS'c'\np19\nsg4\ng0\nsg5\nccopy_reg\n_r"
+    "econstructor\np20\n(csuds.sax.text\nText\np21\nc__builtin__\nunico"
+    "de\np22\nVt\np23\ntp24\nRp25\n(dp26\nS'lang'\np27\nNsS'escaped'\np"
+    "28\nI00\nsbsg6\nNsg8\n(dp29\nsg13\n(lp30\n(isuds.sax.attribute\nAt"
+    "tribute\np31\n(dp32\nS'value'\np33\ng20\n(g21\ng22\nVv\np34\ntp35"
+    "\nRp36\n(dp37\ng27\nNsg28\nI00\nsbsg6\nNsg2\nS'k'\np38\nsg4\ng17\n"
+    "sbasg15\n(lp39\nsS'expns'\np40\nNsbasg40\nNsb.")
+
+
+class PrefixesTest(unittest.TestCase):
+    """
+    Tests that the cached namespace scopes follow prefix mapping changes.
+    """
+
+    def setUp(self):
+        self.root = Element('r')
+        self.root.addPrefix('p', 'urn:a')
+        self.leaf = Element('c')
+        self.root.append(Element('b').append(self.leaf))
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:a'))
+
+    def test_read(self):
+        scope = self.leaf._scope
+        self.root.nsprefixes
+        self.leaf.nsprefixes
+        self.assertTrue(self.leaf._scope is scope)
+        self.assertTrue(isinstance(self.leaf.nsprefixes, Prefixes))
+
+    def test_other_tree(self):
+        scope = self.leaf._scope
+        other = Element('o')
+        other.append(Element('c'))
+        other.addPrefix('p', 'urn:b')
+        other.expns = 'urn:c'
+        self.assertTrue(self.leaf._scope is scope)
+
+    def test_reparent(self):
+        branch = self.root.getChild('b')
+        other = Element('o')
+        other.addPrefix('p', 'urn:b')
+        self.assertEqual(other.resolvePrefix('p'), ('p', 'urn:b'))
+        other.append(branch.detach())
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:b'))
+        self.root.append(branch.detach())
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:a'))
+
+    def test_expns(self):
+        self.assertEqual(self.leaf.defaultNamespace(), (None, None))
+        self.root.expns = 'urn:d'
+        self.assertEqual(self.leaf.defaultNamespace(), (None, 'urn:d'))
+
+    def test_set_item(self):
+        prefixes = self.root.nsprefixes
+        prefixes['p'] = 'urn:b'
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:b'))
+        prefixes['q'] = 'urn:c'
+        self.assertEqual(self.leaf.resolvePrefix('q'), ('q', 'urn:c'))
+
+    def test_delete(self):
+        prefixes = self.root.nsprefixes
+        del prefixes['p']
+        self.assertEqual(self.leaf.resolvePrefix('p', None), None)
+
+    def test_methods(self):
+        prefixes = self.root.nsprefixes
+        prefixes.update(q='urn:c')
+        self.assertEqual(self.leaf.resolvePrefix('q'), ('q', 'urn:c'))
+        prefixes.pop('q')
+        self.assertEqual(self.leaf.resolvePrefix('q', None), None)
+        prefixes.setdefault('s', 'urn:d')
+        self.assertEqual(self.leaf.resolvePrefix('s'), ('s', 'urn:d'))
+        prefixes.clear()
+        self.assertEqual(self.leaf.resolvePrefix('p', None), None)
+
+    def test_assign(self):
+        self.root.nsprefixes = {'p': 'urn:b'}
+        self.assertTrue(isinstance(self.root.nsprefixes, Prefixes))
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:b'))
+        self.root.nsprefixes['p'] = 'urn:c'
+        self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:c'))
+
+    def test_copy(self):
+        for root in (pickle.loads(pickle.dumps(self.root)),
+                     pickle.loads(pickle.dumps(self.root, 2)),
+                     copy.deepcopy(self.root)):
+            leaf = root.getChild('b').getChild('c')
+            self.assertEqual(leaf.resolvePrefix('p'), ('p', 'urn:a'))
+            root.nsprefixes['p'] = 'urn:b'
+            self.assertEqual(leaf.resolvePrefix('p'), ('p', 'urn:b'))
+            self.assertEqual(self.leaf.resolvePrefix('p'), ('p', 'urn:a'))
+
+
+class BuildTest(unittest.TestCase):
+    """
+    Tests that resolving while a tree is built (as the marshaller does)
+    gives the same namespaces as walking up the tree.
+    """
+
+    prefixes = ['p', 'q', 'r']
+
+    def expected(self, node, prefix):
+        while node is not None:
+            if prefix in node.nsprefixes:
+                return (prefix, node.nsprefixes[prefix])
+            node = node.parent
+        return None
+
+    def expectedDefault(self, node):
+        while node is not None:
+            if node.expns is not None:
+                return (None, node.expns)
+            node = node.parent
+        return (None, None)
+
+    def check(self, nodes):
+        for node in nodes:
+            for prefix in self.prefixes:
+                self.assertEqual(
+                    node.resolvePrefix(prefix, None),
+                    self.expected(node, prefix))
+            self.assertEqual(
+                node.defaultNamespace(), self.expectedDefault(node))
+
+    def test_build(self):
+        r = random.Random(1)
+        roots = [Element('r%d' % i) for i in range(3)]
+        nodes = list(roots)
+        for i in range(2000):
+            x = r.random()
+            if x < 0.5:
+                node = Element('e', ns=(r.choice(self.prefixes), 'urn:%d' % i))
+                r.choice(nodes).append(node)
+                nodes.append(node)
+                self.check([node])
+                continue
+            node = r.choice(nodes)
+            if x < 0.6:
+                node.addPrefix(r.choice(self.prefixes), 'urn:%d' % i)
+            elif x < 0.65:
+                node.clearPrefix(r.choice(self.prefixes))
+            elif x < 0.7:
+                node.expns = r.choice([None, 'urn:%d' % i])
+            elif x < 0.75 and node.parent is not None:
+                r.choice(roots).append(node.detach())
+            else:
+                self.check([node])
+        self.check(nodes)
+
+
+class IndexTest(unittest.TestCase):
+    """
+    Tests that the index of the children follows name changes.
+    """
+
+    def setUp(self):
+        self.root = Element('r')
+        self.children = [Element('x%d' % (i % 5)) for i in range(20)]
+        self.root.append(self.children)
+        self.child = self.children[7]
+        self.assertTrue(self.root.getChild('x2') is self.children[2])
+
+    def test_assign(self):
+        self.child.name = 'yy'
+        self.assertTrue(self.root.getChild('yy') is self.child)
+        self.assertTrue(self.root.getChild('x2') is self.children[2])
+
+    def test_rename(self):
+        self.child.rename('p:yy')
+        self.assertTrue(self.root.getChild('yy') is self.child)
+        self.assertEqual(self.child.qname(), 'p:yy')
+
+    def test_pickle(self):
+        root = pickle.loads(pickle.dumps(self.root))
+        children = root.getChildren()
+        self.assertTrue(root.getChild('x2') is children[2])
+        children[7].name = 'yy'
+        self.assertTrue(root.getChild('yy') is children[7])
+
+
+class OldPickleTest(unittest.TestCase):
+    """
+    Tests loading the elements pickled before they had slots.
+    """
+
+    def check(self, root):
+        child = root.getChild('c')
+        self.assertTrue(child.parent is root)
+        self.assertEqual(child.resolvePrefix('q'), ('q', 'urn:q'))
+        self.assertEqual(child.get('k'), 'v')
+        self.assertEqual(child.getText().escape(), 't')
+        self.assertEqual(root.qname(), 'p:r')
+        self.assertEqual(root.resolvePrefix('p'), ('p', 'urn:a'))
+        self.assertEqual(child.plain(), '<c k="v">t</c>')
+        root.nsprefixes['q'] = 'urn:b'
+        self.assertEqual(child.resolvePrefix('q'), ('q', 'urn:b'))
+
+    def test_pickle(self):
+        self.check(pickle.loads(OLD_PICKLE))
+        self.check(cPickle.loads(OLD_PICKLE))
+
+    def test_state(self):
+        root = Element.__new__(Element)
+        child = Element.__new__(Element)
+        attribute = Attribute('k', 'v')
+        attribute.parent = child
+        root.__setstate__({
+            'prefix': 'p', 'name': 'r', 'text': None, 'expns': None,
+            'nsprefixes': {'p': 'urn:a', 'q': 'urn:q'}, 'attributes': [],
+            'parent': None, 'children': [child]})
+        child.__setstate__({
+            'prefix': None, 'name': 'c', 'text': Text('t'), 'expns': None,
+            'nsprefixes': {}, 'attributes': [attribute], 'parent': root,
+            'children': []})
+        for protocol in (0, 2):
+            self.check(pickle.loads(pickle.dumps(root, protocol)))
+        self.check(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Tests of the sax parser backends.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import urllib
+from cStringIO import StringIO
+
+import local_suds
+local_suds.install()
+
+from suds.sax import parser
+from suds.sax.parser import Parser
+
+
+# backends compared with each other
+BACKENDS = ['expat', 'sax'] + (['lxml'] if parser.etree is not None else [])
+
+# documents parsed by every backend
+DOCUMENTS = {
+    'entities': (
+        '<!DOCTYPE r [<!ENTITY e "in"><!ENTITY f "&e;&amp;2">]>'
+        '<r a="&e;-&lt;&#233;">x&e;y&f;z&amp;&lt;&gt;&#233;&#x263a;'
+        '<b>&f;</b>&quot;&apos;</r>'),
+    'namespaces': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<s:Envelope xmlns:s="urn:s" xmlns="urn:d" xmlns:p="urn:p">'
+        '<s:Body p:a="1"><p:x xmlns:p="urn:p2"><y b="2">v</y></p:x>'
+        '<z xml:lang="en"/></s:Body></s:Envelope>'),
+    'cdata': (
+        '<r><a><![CDATA[<x>&amp;]]></a>'
+        '<b>t<![CDATA[ & ]]>u<!-- c --><?pi x?>v</b></r>'),
+    'whitespace': (
+        '<?xml version="1.0"?>\n<!-- head -->\n<r>\n  <a> </a>\n'
+        '  <b>  t  u  </b>\n  <c>\n</c>\t<d/>\n</r>\n'),
+    'shared prefixes': (
+        '<r xmlns:a="urn:x" xmlns:b="urn:x" b:k="0">'
+        '<b:c b:k="1"><a:d b:z="2"/><d a:z="3"/></b:c>'
+        '<e xmlns:c="urn:x" c:v=\'x>"y\'><a:f c:w="4">t</a:f></e>'
+        '<g xmlns:b="urn:y" b:k="5"><h a:k="6"/></g></r>'),
+    'encoding': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<r t="caf\xc3\xa9">caf\xc3\xa9<a>\xe2\x98\xba</a></r>'),
+}
+
+
+class BackendParityTest(unittest.TestCase):
+    """
+    Every backend must build the same tree from the same document.
+    """
+
+    def parse(self, backend, xml, input):
+        p = Parser()
+        p.backend = backend
+        if input == 'file':
+            return p.parse(file=StringIO(xml))
+
+        if input == 'path':
+            fd, path = tempfile.mkstemp()
+            try:
+                os.write(fd, xml)
+                os.close(fd)
+                return p.parse(file=path)
+
+            finally:
+                os.remove(path)
+
+        return p.parse(string=xml)
+
+    def assertSameTree(self, expected, actual):
+        for name in ('prefix', 'name', 'expns', 'nsprefixes', 'text'):
+            self.assertEqual(
+                getattr(expected, name), getattr(actual, name),
+                '{} of {}'.format(name, expected.qname()))
+
+        self.assertEqual(
+            [(a.prefix, a.name, a.value) for a in expected.attributes],
+            [(a.prefix, a.name, a.value) for a in actual.attributes])
+
+        self.assertEqual(len(expected.children), len(actual.children))
+        for e, a in zip(expected.children, actual.children):
+            self.assertIs(a.parent, actual)
+            self.assertSameTree(e, a)
+
+    def check(self, name):
+        xml = DOCUMENTS[name]
+        expected = self.parse('expat', xml, 'string')
+        for backend in BACKENDS:
+            for input in ('string', 'file', 'path'):
+                actual = self.parse(backend, xml, input)
+                self.assertEqual(str(expected), str(actual), backend)
+                self.assertEqual(len(expected.children), 1)
+                self.assertSameTree(expected.root(), actual.root())
+
+    def test_entities(self):
+        self.check('entities')
+
+    def test_namespaces(self):
+        self.check('namespaces')
+
+    def test_cdata(self):
+        self.check('cdata')
+
+    def test_whitespace(self):
+        self.check('whitespace')
+
+    def test_encoding(self):
+        self.check('encoding')
+
+    def test_shared_prefixes(self):
+        self.check('shared prefixes')
+
+    def test_expected(self):
+        p = Parser()
+        root = p.parse(string=DOCUMENTS['entities']).root()
+        self.assertEqual(root.text, u'xinyin&2z&<>\xe9\u263a"\'')
+        self.assertEqual(root.get('a'), u'in-<\xe9')
+        self.assertEqual(root.getChild('b').text, u'in&2')
+
+        root = p.parse(string=DOCUMENTS['namespaces']).root()
+        x = root.getChild('Body').getChild('x')
+        self.assertEqual(x.namespace(), ('p', 'urn:p2'))
+        self.assertEqual(x.getChild('y').namespace(), (None, 'urn:d'))
+
+
+class ExternalEntityTest(unittest.TestCase):
+    """
+    External entities must never be resolved, whatever the backend.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        path = os.path.join(self.dir, 'secret.txt')
+        with open(path, 'wb') as f:
+            f.write('TOPSECRET')
+
+        self.xml = (
+            '<!DOCTYPE a [<!ENTITY x SYSTEM "file:{}">]>'
+            '<a>&x;</a>'.format(urllib.pathname2url(path)))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def parse(self, backend):
+        p = Parser()
+        p.backend = backend
+        return p.parse(string=self.xml)
+
+    @unittest.skipIf(parser.etree is None, 'lxml is not installed')
+    def test_lxml(self):
+        document = self.parse('lxml')
+        self.assertNotIn('TOPSECRET', str(document))
+        self.assertEqual(document.root().name, 'a')
+        self.assertIsNone(document.root().text)
+
+    def test_expat(self):
+        self.assertNotIn('TOPSECRET', str(self.parse('expat')))
+
+    def test_sax(self):
+        self.assertNotIn('TOPSECRET', str(self.parse('sax')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,6 +22,11 @@ from suds import *
 from suds.umx import *
 from suds.sax import Namespace
 
+#
+# whether the attributes in a namespace are skipped, by URI.
+#
+skipped = {}
+
 
 class AttrList:
     """
@@ -79,10 +84,16 @@ class AttrList:
         @rtype: bool
         """
         ns = attr.namespace()
+        try:
+            return skipped[ns[1]]
+        except KeyError:
+            pass
         skip = (
             Namespace.xmlns[1],
             'http://schemas.xmlsoap.org/soap/encoding/',
             'http://schemas.xmlsoap.org/soap/envelope/',
             'http://www.w3.org/2003/05/soap-envelope',
         )
-        return ( Namespace.xs(ns) or ns[1] in skip )
+        result = ( Namespace.xs(ns) or ns[1] in skip )
+        skipped[ns[1]] = result
+        return result
@@ -18,10 +18,13 @@
 Provides basic unmarshaller classes.
 """
 
+import gc
+import time
 from logging import getLogger
 from suds import *
 from suds.umx import *
 from suds.umx.core import Core
+from suds.sax.stats import registry
 
 
 class Basic(Core):
@@ -37,5 +40,16 @@ class Basic(Core):
         @return: A suds object.
         @rtype: L{Object}
         """
+        if self.planned():
+            started = time.time()
+            self.reset()
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                return self.build(node)
+            finally:
+                if collecting:
+                    gc.enable()
+                registry.unmarshalled(time.time()-started)
         content = Content(node)
         return Core.process(self, content)
\ No newline at end of file
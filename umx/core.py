@@ -18,18 +18,130 @@
 Provides base classes for XML->object I{unmarshalling}.
 """
 
+import time
 from logging import getLogger
 from suds import *
 from suds.umx import *
 from suds.umx.attrlist import AttrList
 from suds.sax.text import Text
-from suds.sudsobject import Factory, merge
+from suds.sax.stats import registry
+from suds.sudsobject import Factory, Object, merge
 
 
 log = getLogger(__name__)
 
 reserved = { 'class':'cls', 'def':'dfn', }
 
+#
+# compiled unmarshalling plans: (name, namespace) -> L{Plan}.
+#
+plans = {}
+
+#
+# the maximum number of cached plans.
+#
+planlimit = 10000
+
+#
+# The processing hooks.  The plans are only run by unmarshallers that
+# do not override any of them.
+#
+hooks = (
+    'append',
+    'postprocess',
+    'append_attributes',
+    'append_attribute',
+    'append_children',
+    'append_text',
+    'start',
+    'end',
+    'unbounded',
+    'nillable',
+)
+
+#
+# whether an unmarshaller (class) runs the plans, by class.
+#
+planned = {}
+
+
+class Plan:
+    """
+    A compiled unmarshalling plan for the elements of a given name and
+    namespace.  What does not depend on the content of an element is
+    computed once: the class of the built objects and the object keys
+    of the attributes and children.  Whether a child repeats is still
+    decided by each element.
+    @ivar name: The element name.
+    @type name: basestring
+    @ivar cls: The class of the objects built for the elements.
+    @type cls: I{classobj}
+    @ivar keys: The object keys by child name.
+    @type keys: {basestring:basestring}
+    @ivar attrkeys: The object keys by attribute name.
+    @type attrkeys: {basestring:basestring}
+    """
+
+    @classmethod
+    def get(cls, node):
+        """
+        Get the plan for the specified node.  Plans are cached by
+        element name and namespace.
+        @param node: An XML node.
+        @type node: L{sax.element.Element}
+        @return: The plan.
+        @rtype: L{Plan}
+        """
+        key = (node.name, node.namespace()[1])
+        try:
+            return plans[key]
+        except KeyError:
+            plan = cls(node.name)
+            if len(plans) < planlimit:
+                plans[key] = plan
+            return plan
+
+    def __init__(self, name):
+        """
+        @param name: The element name.
+        @type name: basestring
+        """
+        self.name = name
+        self.cls = Factory.subclass(name, Object)
+        self.keys = {}
+        self.attrkeys = {}
+
+    def key(self, name):
+        """
+        Get the object key of a child.
+        @param name: The child name.
+        @type name: basestring
+        @return: The key.
+        @rtype: basestring
+        """
+        try:
+            return self.keys[name]
+        except KeyError:
+            key = reserved.get(name, name)
+            self.keys[name] = key
+            return key
+
+    def attrkey(self, name):
+        """
+        Get the object key of an attribute.
+        @param name: The attribute name.
+        @type name: basestring
+        @return: The key.
+        @rtype: basestring
+        """
+        try:
+            return self.attrkeys[name]
+        except KeyError:
+            key = '_%s' % reserved.get(name, name)
+            self.attrkeys[name] = key
+            return key
+
+
 class Core:
     """
     The abstract XML I{node} unmarshaller.  This class provides the
@@ -44,8 +156,98 @@ class Core:
         @return: A suds object.
         @rtype: L{Object}
         """
+        started = time.time()
         self.reset()
-        return self.append(content)
+        try:
+            return self.append(content)
+        finally:
+            registry.unmarshalled(time.time()-started)
+
+    def planned(self):
+        """
+        Get whether the nodes can be unmarshalled by running the
+        compiled plans (L{build}) because none of the processing hooks
+        is overridden.
+        @return: True when planned.
+        @rtype: boolean
+        """
+        cls = self.__class__
+        try:
+            return planned[cls]
+        except KeyError:
+            result = True
+            for name in hooks:
+                if getattr(cls, name).im_func is not getattr(Core, name).im_func:
+                    result = False
+                    break
+            planned[cls] = result
+            return result
+
+    def build(self, node):
+        """
+        Convert the specified node into a I{suds} L{object} by running
+        the compiled plans.  The result is the same as L{append} with
+        the default processing hooks but no L{Content} is built and
+        nothing is built for the children of I{mixed} nodes.
+        @param node: An XML node.
+        @type node: L{sax.element.Element}
+        @return: A suds object (see: L{postprocess})
+        @rtype: I{any}
+        @see: L{planned()}
+        """
+        children = len(node)
+        text = None
+        if node.hasText():
+            if children:
+                return node
+            text = node.getText()
+        attributes = AttrList(node.attributes)
+        real = list(attributes.real())
+        data = None
+        if len(real) or children:
+            plan = Plan.get(node)
+            data = plan.cls()
+            for attr in real:
+                setattr(data, plan.attrkey(attr.name), attr.value)
+            keys = []
+            values = {}
+            for child in node:
+                cval = self.build(child)
+                key = plan.key(child.name)
+                if key in values:
+                    v = values[key]
+                    if isinstance(v, list):
+                        v.append(cval)
+                    else:
+                        values[key] = [v, cval]
+                    continue
+                if len(real) and key in data:
+                    v = getattr(data, key)
+                    if isinstance(v, list):
+                        v.append(cval)
+                    else:
+                        setattr(data, key, [v, cval])
+                    continue
+                keys.append(key)
+                values[key] = cval
+            for key in keys:
+                setattr(data, key, values[key])
+            if len(real) and \
+                not children and \
+                text is not None:
+                    p = Factory.property(node.name, text)
+                    return merge(data, p)
+            if len(data):
+                return data
+        lang = attributes.lang()
+        if node.isnil():
+            return None
+        if not children and text is None:
+            return Text('', lang=lang)
+        if isinstance(text, basestring):
+            return Text(text, lang=lang)
+        else:
+            return text
     
     def append(self, content):
         """
@@ -79,11 +281,11 @@ class Core:
         @rtype: I{any}
         """
         node = content.node
-        if len(node.children) and node.hasText():
+        if len(node) and node.hasText():
             return node
         attributes = AttrList(node.attributes)
         if attributes.rlen() and \
-            not len(node.children) and \
+            not len(node) and \
             node.hasText():
                 p = Factory.property(node.name, node.getText())
                 return merge(content.data, p)
@@ -92,7 +294,7 @@ class Core:
         lang = attributes.lang()
         if content.node.isnil():
             return None
-        if not len(node.children) and content.text is None:
+        if not len(node) and content.text is None:
             if self.nillable(content):
                 return None
             else:
@@ -175,7 +377,7 @@ class Core:
         @return: A subclass of Object.
         @rtype: L{Object}
         """
-        content.data = Factory.object(content.node.name)
+        content.data = Plan.get(content.node).cls()
     
     def end(self, content):
         """
@@ -12,6 +12,7 @@ import logging
 import os
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 from distutils import spawn
@@ -152,6 +153,60 @@ def communicate(command, stdin=None, cwd=None, env=None, shell=False):
     return out, err
 
 
+def stream(command, cwd=None, env=None, shell=False, chunk_size=65536):
+    """
+    Executes a command in a subprocess and yields its output from stdout as it
+    is produced.  The subprocess is killed if the output is not read to the end.
+
+    :param command: command to execute
+    :type  command: basestring
+    :param cwd: directory to execute from
+    :type  cwd: basestring
+    :param env: environment variables to use for the subprocess
+    :type  env: dict
+    :param shell: whether to run in the OS shell
+    :type  shell: bool
+    :param chunk_size: maximum size of the chunks of output
+    :type  chunk_size: int
+    :return: chunks of output from stdout
+    :rtype: generator[basestring]
+    """
+    if env is None:
+        env = os.environ.copy()
+
+    logging.debug(command)
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env=env,
+            shell=shell,
+            stdout=subprocess.PIPE,
+            stderr=err)
+
+        try:
+            chunk = proc.stdout.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = proc.stdout.read(chunk_size)
+
+        except:
+            if proc.poll() is None:
+                proc.kill()
+
+            proc.wait()
+            raise
+
+        finally:
+            proc.stdout.close()
+
+        result = proc.wait()
+
+    if result != 0:
+        logging.error('Command "{}" failed!'.format(command))
+        raise ExecuteException(result)
+
+
 def get_exec(executable, default):
     """
     Get the full path to an executable on PATH.
@@ -129,6 +129,27 @@ class JamaRestApi(RestApi):
 
         return date.isoformat()
 
+    @classmethod
+    def _date_range(cls, after=None, before=None):
+        """
+        Converts date bounds to the value(s) of a date query argument, which
+        is either a single date to filter after or a range of dates.
+
+        :param after: date and time to filter after
+        :type  after: datetime.datetime
+        :param before: date and time to filter before
+        :type  before: datetime.datetime
+        :return: ISO 8601 representation(s) of the dates
+        :rtype: basestring or list[basestring]
+        """
+        if before is None:
+            return cls._date_str(after)
+
+        if after is None:
+            after = datetime.datetime(1970, 1, 1)
+
+        return [cls._date_str(after), cls._date_str(before)]
+
     def get_all(self, path, query=None, batch_size=DEFAULT_BATCH_SIZE):
         """
         Gets all resources from a collection.
@@ -196,10 +217,11 @@ class JamaRestApi(RestApi):
                     if req_query['maxResults'] > 1:
                         subindex = i
 
-                    new_query = {
+                    new_query = copy.deepcopy(query)
+                    new_query.update({
                         'maxResults': 1,
                         'startAt': start,
-                    }
+                    })
 
                     new_urls[self.url(path, query=new_query)] = (
                         index, subindex, path, new_query)
@@ -220,15 +242,16 @@ class JamaRestApi(RestApi):
             self, project_id=None, item_type_id=None, document_key=None,
             release_id=None, created_after=None, modified_after=None,
             last_activity_after=None, contains=None, sort_by=None,
-            start_at=None, max_results=None):
+            start_at=None, max_results=None, created_before=None,
+            modified_before=None):
         """
         Searches Jama for items, test plans, test cycles, test runs, or 
         attachments which match the criteria.
 
         :param project_id: Jama project ID which contains the items
         :type  project_id: int
-        :param item_type_id: Jama item type ID used by the items
-        :type  item_type_id: int
+        :param item_type_id: Jama item type ID(s) used by the items
+        :type  item_type_id: int or list[int]
         :param document_key: Jama document key used by the items
                              (eg. COL-SysReq-1234)
         :type  document_key: basestring
@@ -250,6 +273,10 @@ class JamaRestApi(RestApi):
         :param max_results: max number of resources to get (defaults to 20 and 
                             cannot be larger than 50)
         :type  max_results: int
+        :param created_before: filter by created before a date and time
+        :type  created_before: datetime.datetime
+        :param modified_before: filter by modified before a date and time
+        :type  modified_before: datetime.datetime
         :return: response containing Jama search results
         :rtype: dict
         """
@@ -266,11 +293,13 @@ class JamaRestApi(RestApi):
         if release_id is not None:
             query['release'] = release_id
 
-        if created_after is not None:
-            query['createdDate'] = self._date_str(created_after)
+        if created_after is not None or created_before is not None:
+            query['createdDate'] = self._date_range(
+                created_after, created_before)
 
-        if modified_after is not None:
-            query['modifiedDate'] = self._date_str(modified_after)
+        if modified_after is not None or modified_before is not None:
+            query['modifiedDate'] = self._date_range(
+                modified_after, modified_before)
 
         if last_activity_after is not None:
             query['lastActivityDate'] = self._date_str(last_activity_after)
@@ -306,7 +335,8 @@ class JamaRestApi(RestApi):
             self, project_id=None, item_type_id=None, document_key=None,
             release_id=None, created_after=None, modified_after=None,
             last_activity_after=None, contains=None, sort_by=None,
-            batch_size=DEFAULT_BATCH_SIZE):
+            batch_size=DEFAULT_BATCH_SIZE, created_before=None,
+            modified_before=None):
         """
         Searches Jama for all items, test plans, test cycles, test runs, or 
         attachments which match the criteria.
@@ -318,8 +348,8 @@ class JamaRestApi(RestApi):
 
         :param project_id: Jama project ID which contains the items
         :type  project_id: int
-        :param item_type_id: Jama item type ID used by the items
-        :type  item_type_id: int
+        :param item_type_id: Jama item type ID(s) used by the items
+        :type  item_type_id: int or list[int]
         :param document_key: Jama document key used by the items
                              (eg. COL-SysReq-1234)
         :type  document_key: basestring
@@ -338,6 +368,10 @@ class JamaRestApi(RestApi):
         :type  sort_by: basestring or list[basestring]
         :param batch_size: number of resources to get in each request
         :type  batch_size: int
+        :param created_before: filter by created before a date and time
+        :type  created_before: datetime.datetime
+        :param modified_before: filter by modified before a date and time
+        :type  modified_before: datetime.datetime
         :return: all Jama search results
         :rtype: dict
         """
@@ -354,11 +388,13 @@ class JamaRestApi(RestApi):
         if release_id is not None:
             query['release'] = release_id
 
-        if created_after is not None:
-            query['createdDate'] = self._date_str(created_after)
+        if created_after is not None or created_before is not None:
+            query['createdDate'] = self._date_range(
+                created_after, created_before)
 
-        if modified_after is not None:
-            query['modifiedDate'] = self._date_str(modified_after)
+        if modified_after is not None or modified_before is not None:
+            query['modifiedDate'] = self._date_range(
+                modified_after, modified_before)
 
         if last_activity_after is not None:
             query['lastActivityDate'] = self._date_str(last_activity_after)
@@ -0,0 +1,435 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility functions for caching item data parsed from Jama trace data reports.
+"""
+import bisect
+import datetime
+import gc
+import glob
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+from dateutil import tz
+
+import files
+from constants import JAMA_CACHE_DIR
+
+
+# version of the cache file format
+CACHE_VERSION = 3
+
+# header of a cache file: magic string and offset of the block index
+CACHE_HEADER = struct.Struct('<4sQ')
+
+# magic string of a cache file
+CACHE_MAGIC = 'JRC{}'.format(CACHE_VERSION)
+
+# extension of a cache file
+CACHE_EXT = '.jrc'
+
+# keys of the dates of a Jama item
+DATE_KEYS = ('object_created', 'object_modified')
+
+
+class InvalidCacheFile(Exception):
+    """Exception for a cache file which cannot be read"""
+    pass
+
+
+class CachedJamaItems(object):
+    """Interface for Jama items in a cache file, which are loaded lazily"""
+    def __init__(self, path):
+        """
+        Constructor called in instantiation.  Maps a cache file into memory
+        and reads its block index.
+
+        :param path: path to the cache file
+        :type  path: basestring
+        :raises InvalidCacheFile: if the file is not a cache file
+        """
+        object.__init__(self)
+        self._path = path
+        with open(path, 'rb') as f:
+            try:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            except ValueError:
+                raise InvalidCacheFile('Empty cache file "{}"'.format(path))
+
+        try:
+            magic, index_offset = CACHE_HEADER.unpack_from(self._data)
+            self._blocks = marshal.loads(self._data[index_offset:])
+
+        except (struct.error, EOFError, ValueError, TypeError):
+            magic = None
+
+        if magic != CACHE_MAGIC:
+            self._data.close()
+            raise InvalidCacheFile('Corrupt cache file "{}"'.format(path))
+
+        # index of the first item of each block
+        self._starts = []
+        size = 0
+        for offset, length, count in self._blocks:
+            self._starts.append(size)
+            size += count
+
+        self._size = size
+        self._block = (None, None)
+
+    def __len__(self):
+        """
+        Gets the number of cached items.
+
+        :return: number of cached items
+        :rtype: int
+        """
+        return self._size
+
+    def __iter__(self):
+        """
+        Iterates over the cached items, loading one block at a time.
+
+        :return: cached items
+        :rtype: generator[dict]
+        """
+        for i in xrange(len(self._blocks)):
+            for item in self._load_block(i):
+                yield item
+
+    def __getitem__(self, index):
+        """
+        Gets a cached item.
+
+        :param index: index of the item
+        :type  index: int
+        :return: cached item
+        :rtype: dict
+        """
+        if index < 0:
+            index += self._size
+
+        if not 0 <= index < self._size:
+            raise IndexError('Cached item index out of range')
+
+        i = bisect.bisect_right(self._starts, index) - 1
+        block_index, block = self._block
+        if block_index != i:
+            block = self._load_block(i)
+            self._block = (i, block)
+
+        return block[index - self._starts[i]]
+
+    def close(self):
+        """
+        Unmaps the cache file.
+        """
+        self._block = (None, None)
+        self._data.close()
+
+    def _load_block(self, i):
+        """
+        Loads a block of items.
+
+        :param i: index of the block
+        :type  i: int
+        :return: items of the block
+        :rtype: list[dict]
+        """
+        offset, length, count = self._blocks[i]
+
+        # loading many small objects repeatedly triggers the garbage collector
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return load_block(self._data[offset:offset + length])
+
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    @property
+    def path(self):
+        """
+        Gets the path to the cache file.
+
+        :return: path to the cache file
+        :rtype: basestring
+        """
+        return self._path
+
+
+class JamaReportCache(object):
+    """
+    Cache for validated item data parsed from Jama trace data reports.  Items
+    are stored in blocks of a binary cache file per report, keyed by a
+    manifest of the paths, sizes and modification times of the report files.
+    The least recently used cache files are evicted when the cache grows
+    beyond its maximum size.
+    """
+    def __init__(self, cache_dir=JAMA_CACHE_DIR, max_size=2 * 1024 ** 3,
+                 block_size=10000):
+        """
+        Constructor called in instantiation.  Creates a cache interface.
+
+        :param cache_dir: directory to store cache files in
+        :type  cache_dir: basestring
+        :param max_size: maximum total size of the cache files in bytes
+        :type  max_size: int
+        :param block_size: number of items per block of a cache file
+        :type  block_size: int
+        """
+        object.__init__(self)
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._block_size = block_size
+
+    def key(self, reports_path):
+        """
+        Determines the cache key of a trace data report (or a directory of
+        trace data reports).
+
+        :param reports_path: path to the trace data report(s)
+        :type  reports_path: basestring
+        :return: cache key
+        :rtype: str
+        """
+        reports_path = os.path.abspath(reports_path)
+        if os.path.isdir(reports_path):
+            paths = []
+            for root, dirs, filenames in os.walk(reports_path):
+                paths.extend(os.path.join(root, f) for f in filenames)
+
+        else:
+            paths = [reports_path]
+
+        manifest = []
+        for path in sorted(paths):
+            stat = os.stat(path)
+            manifest.append(
+                (os.path.relpath(path, reports_path), stat.st_size,
+                 stat.st_mtime))
+
+        return hashlib.sha1(repr(
+            (CACHE_VERSION, sys.version, reports_path, manifest))).hexdigest()
+
+    def get(self, reports_path):
+        """
+        Gets the cached items of a trace data report.
+
+        :param reports_path: path to the trace data report(s)
+        :type  reports_path: basestring
+        :return: cached items, or None if the report is not cached
+        :rtype: CachedJamaItems
+        """
+        path = self._path(self.key(reports_path))
+        if not os.path.isfile(path):
+            return None
+
+        try:
+            items = CachedJamaItems(path)
+
+        except (EnvironmentError, InvalidCacheFile) as e:
+            logging.warning('Ignoring cache file: {}'.format(e))
+            return None
+
+        # keep track of the last use for evicting cache files
+        os.utime(path, None)
+        logging.info('Loaded {num} cached items of "{path}"'.format(
+            num=len(items), path=reports_path))
+
+        return items
+
+    def put(self, reports_path, items):
+        """
+        Caches the items of a trace data report as they are consumed.  The
+        cache file is completed once all of the items have been consumed.
+
+        :param reports_path: path to the trace data report(s)
+        :type  reports_path: basestring
+        :param items: validated Jama item data
+        :type  items: iterable[dict]
+        :return: the items
+        :rtype: generator[dict]
+        """
+        files.mkdir(self._cache_dir)
+        path = self._path(self.key(reports_path))
+        temp_path = '{path}.{pid}.tmp'.format(path=path, pid=os.getpid())
+        blocks = []
+        with open(temp_path, 'wb') as f:
+            try:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, 0))
+                block = []
+                for item in items:
+                    block.append(item)
+                    if len(block) == self._block_size:
+                        blocks.append(self._write_block(f, block))
+                        block = []
+
+                    yield item
+
+                if len(block) > 0:
+                    blocks.append(self._write_block(f, block))
+
+                index_offset = f.tell()
+                f.write(marshal.dumps(blocks))
+                f.seek(0)
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, index_offset))
+
+            except:
+                f.close()
+                os.remove(temp_path)
+                raise
+
+        try:
+            os.rename(temp_path, path)
+
+        except OSError:
+            # cached by another process in the meantime
+            os.remove(temp_path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used cache files until the cache fits in
+        its maximum size.
+        """
+        cache_files = []
+        for path in glob.glob(os.path.join(self._cache_dir, '*' + CACHE_EXT)):
+            try:
+                stat = os.stat(path)
+
+            except OSError:
+                continue
+
+            cache_files.append((stat.st_mtime, stat.st_size, path))
+
+        cache_files.sort(reverse=True)
+        total_size = 0
+        for mtime, size, path in cache_files:
+            total_size += size
+            if total_size <= self._max_size:
+                continue
+
+            logging.debug('Evicting cache file "{}"'.format(path))
+            try:
+                os.remove(path)
+
+            except OSError:
+                # still in use
+                pass
+
+    def _path(self, key):
+        """
+        Determines the path to a cache file.
+
+        :param key: cache key
+        :type  key: str
+        :return: path to the cache file
+        :rtype: basestring
+        """
+        return os.path.join(self._cache_dir, key + CACHE_EXT)
+
+    @staticmethod
+    def _write_block(f, items):
+        """
+        Writes a block of items to a cache file.
+
+        :param f: cache file
+        :type  f: file
+        :param items: validated Jama item data
+        :type  items: list[dict]
+        :return: block index entry: offset, length and number of items
+        :rtype: tuple(int, int, int)
+        """
+        data = dump_block(items)
+        offset = f.tell()
+        f.write(data)
+        return offset, len(data), len(items)
+
+
+def dump_block(items):
+    """
+    Serializes a block of Jama items.  Items are marshalled with their dates
+    as tuples, so blocks can be loaded without running any code.
+
+    :param items: validated Jama item data
+    :type  items: list[dict]
+    :return: serialized block
+    :rtype: str
+    """
+    encoded = []
+    for item in items:
+        item = dict(item)
+        for key in DATE_KEYS:
+            item[key] = _encode_date(item[key])
+
+        encoded.append(item)
+
+    return marshal.dumps(encoded)
+
+
+def load_block(data):
+    """
+    Deserializes a block of Jama items.
+
+    :param data: serialized block
+    :type  data: str
+    :return: Jama item data
+    :rtype: list[dict]
+    """
+    items = marshal.loads(data)
+    for item in items:
+        for key in DATE_KEYS:
+            item[key] = _decode_date(item[key])
+
+    return items
+
+
+def _encode_date(date):
+    """
+    Encodes a date as a tuple of its fields.  Timezone-aware dates are
+    encoded as the tuple of their fields and their UTC offset in seconds.
+
+    :param date: date
+    :type  date: datetime.datetime
+    :return: encoded date
+    :rtype: tuple
+    """
+    fields = (
+        date.year, date.month, date.day, date.hour, date.minute, date.second,
+        date.microsecond)
+
+    offset = date.utcoffset()
+    if offset is None:
+        return fields
+
+    return fields, offset.days * 86400 + offset.seconds
+
+
+def _decode_date(value):
+    """
+    Decodes a date encoded by _encode_date.  Timezone-aware dates get a fixed
+    UTC offset.
+
+    :param value: encoded date
+    :type  value: tuple
+    :return: date
+    :rtype: datetime.datetime
+    """
+    if len(value) == 2:
+        fields, offset = value
+        return datetime.datetime(*fields, tzinfo=tz.tzoffset(None, offset))
+
+    return datetime.datetime(*value)
@@ -0,0 +1,348 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility functions for finding what changed between two snapshots of Jama
+trace data reports.
+"""
+import hashlib
+import heapq
+import logging
+import marshal
+import operator
+import struct
+import tempfile
+from collections import Counter
+
+from jama_cache import dump_block, load_block
+from jama_report import iter_jama_reports
+
+
+# number of items sorted in memory at a time; larger snapshots are sorted in
+# runs which are stored in temporary files and merged
+RUN_SIZE = 100000
+
+# number of items per block of a run in a temporary file
+BLOCK_SIZE = 1000
+
+# header of a block of a run: number of items and length of the serialized
+# items, which follow the fingerprints of the items
+BLOCK_HEADER = struct.Struct('<II')
+
+# length of a fingerprint
+FINGERPRINT_SIZE = hashlib.sha1().digest_size
+
+# kinds of item changes
+ADDED = 'added'
+REMOVED = 'removed'
+MODIFIED = 'modified'
+
+# item values compared as a whole
+ATTRIBUTE_KEYS = (
+    'object_type', 'title', 'object_created', 'object_modified', 'location',
+    'tags')
+
+# item relationship lists
+RELATIONSHIP_KEYS = ('upstream', 'downstream')
+
+
+def fingerprint(item):
+    """
+    Computes a fingerprint of the content of a Jama item, which is the same
+    for items with the same content in different reports.  The order of the
+    relationships of an item does not matter.
+
+    :param item: Jama item data
+    :type  item: dict
+    :return: fingerprint of the item
+    :rtype: str
+    """
+    content = (
+        item['object_type'],
+        item['title'],
+        item['object_created'].isoformat(),
+        item['object_modified'].isoformat(),
+        tuple(item['location']),
+        tuple(item['tags']),
+        tuple(sorted(item['fields'].iteritems())),
+        tuple(sorted(_relationship_keys(item['upstream']))),
+        tuple(sorted(_relationship_keys(item['downstream']))))
+
+    return hashlib.sha1(marshal.dumps(content)).digest()
+
+
+def _relationship_keys(relationships):
+    """
+    Identifies relationships by the related item and relationship type.
+
+    :param relationships: relationships of a Jama item
+    :type  relationships: list[dict]
+    :return: (project ID, relationship type) of each relationship
+    :rtype: generator[tuple(basestring, basestring)]
+    """
+    for relationship in relationships:
+        yield relationship['project_id'], relationship['type']
+
+
+def sort_items(items, run_size=RUN_SIZE, temp_dir=None):
+    """
+    Sorts Jama items by project ID in bounded memory.  Items are sorted in
+    runs of at most `run_size` items; all but the last run are stored in
+    temporary files and the runs are merged as the items are consumed.
+
+    :param items: Jama item data
+    :type  items: iterable[dict]
+    :param run_size: number of items sorted in memory at a time
+    :type  run_size: int
+    :param temp_dir: directory of the temporary files (system default if None)
+    :type  temp_dir: basestring
+    :return: project ID, fingerprint and data of each item, sorted by project
+             ID
+    :rtype: generator[tuple(basestring, str, dict)]
+    """
+    runs = []
+    run = []
+    try:
+        for item in items:
+            run.append((item['project_id'], fingerprint(item), item))
+            if len(run) == run_size:
+                runs.append(_write_run(run, temp_dir))
+                run = []
+
+        run.sort(key=operator.itemgetter(0))
+        if len(runs) == 0:
+            for record in run:
+                yield record
+
+            return
+
+        logging.debug('Merging {} sorted runs of items...'.format(
+            len(runs) + 1))
+
+        sources = [_read_run(f, i) for i, f in enumerate(runs)]
+        sources.append(
+            (pid, len(runs), fp, item) for pid, fp, item in run)
+
+        for pid, i, fp, item in heapq.merge(*sources):
+            yield pid, fp, item
+
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _write_run(run, temp_dir):
+    """
+    Sorts a run of items and stores it in a temporary file.
+
+    :param run: project ID, fingerprint and data of each item
+    :type  run: list[tuple(basestring, str, dict)]
+    :param temp_dir: directory of the temporary file (system default if None)
+    :type  temp_dir: basestring
+    :return: temporary file
+    :rtype: file
+    """
+    run.sort(key=operator.itemgetter(0))
+    f = tempfile.TemporaryFile(dir=temp_dir)
+    for start in xrange(0, len(run), BLOCK_SIZE):
+        block = run[start:start + BLOCK_SIZE]
+        data = dump_block([item for pid, fp, item in block])
+        f.write(BLOCK_HEADER.pack(len(block), len(data)))
+        f.write(''.join(fp for pid, fp, item in block))
+        f.write(data)
+
+    f.seek(0)
+    return f
+
+
+def _read_run(f, index):
+    """
+    Reads a sorted run of items from a temporary file.
+
+    Blocks are read into strings before they are loaded, as the temporary
+    file is not necessarily a built-in file object (e.g. on Windows).
+
+    :param f: temporary file
+    :type  f: file
+    :param index: index of the run, which orders items with the same project
+                  ID
+    :type  index: int
+    :return: project ID, run index, fingerprint and data of each item
+    :rtype: generator[tuple(basestring, int, str, dict)]
+    """
+    while True:
+        header = f.read(BLOCK_HEADER.size)
+        if len(header) < BLOCK_HEADER.size:
+            return
+
+        count, length = BLOCK_HEADER.unpack(header)
+        fingerprints = f.read(count * FINGERPRINT_SIZE)
+        items = load_block(f.read(length))
+        for i, item in enumerate(items):
+            fp = fingerprints[i * FINGERPRINT_SIZE:(i + 1) * FINGERPRINT_SIZE]
+            yield item['project_id'], index, fp, item
+
+
+def diff_items(old_items, new_items, run_size=RUN_SIZE, temp_dir=None):
+    """
+    Finds what changed between two snapshots of Jama items.  Both snapshots
+    are sorted by project ID in bounded memory and merged in a single pass;
+    only items whose fingerprints differ are compared in detail.
+
+    Changes are dictionaries with the kind of change ("added", "removed" or
+    "modified"), the project ID and the old and new item data (None where the
+    item does not exist).  Modified items also have the changed attributes
+    and fields, as (old, new) values, and the added and removed links of
+    each relationship list, as (project ID, relationship type).
+
+    :param old_items: Jama item data of the old snapshot
+    :type  old_items: iterable[dict]
+    :param new_items: Jama item data of the new snapshot
+    :type  new_items: iterable[dict]
+    :param run_size: number of items sorted in memory at a time
+    :type  run_size: int
+    :param temp_dir: directory of temporary files (system default if None)
+    :type  temp_dir: basestring
+    :return: changes, sorted by project ID
+    :rtype: generator[dict]
+    """
+    old = _unique(sort_items(old_items, run_size, temp_dir))
+    new = _unique(sort_items(new_items, run_size, temp_dir))
+    counts = Counter()
+    old_record = next(old, None)
+    new_record = next(new, None)
+    while old_record is not None or new_record is not None:
+        if new_record is None or (
+                old_record is not None and old_record[0] < new_record[0]):
+            counts[REMOVED] += 1
+            yield _change(REMOVED, old_record[0], old_record[2], None)
+            old_record = next(old, None)
+
+        elif old_record is None or new_record[0] < old_record[0]:
+            counts[ADDED] += 1
+            yield _change(ADDED, new_record[0], None, new_record[2])
+            new_record = next(new, None)
+
+        else:
+            if old_record[1] != new_record[1]:
+                counts[MODIFIED] += 1
+                yield _modification(old_record[2], new_record[2])
+
+            else:
+                counts['unchanged'] += 1
+
+            old_record = next(old, None)
+            new_record = next(new, None)
+
+    logging.info(', '.join(
+        '{} {}'.format(counts[k], k)
+        for k in [ADDED, REMOVED, MODIFIED, 'unchanged']))
+
+
+def _unique(records):
+    """
+    Skips records of items with a project ID which was already seen.
+
+    :param records: project ID, fingerprint and data of each item, sorted by
+                    project ID
+    :type  records: iterable[tuple(basestring, str, dict)]
+    :return: records with unique project IDs
+    :rtype: generator[tuple(basestring, str, dict)]
+    """
+    last = None
+    for record in records:
+        if record[0] == last:
+            logging.warning('Ignoring duplicate item "{}"'.format(record[0]))
+            continue
+
+        last = record[0]
+        yield record
+
+
+def _change(kind, project_id, old_item, new_item):
+    """
+    Creates a change of an item.
+
+    :param kind: kind of change
+    :type  kind: basestring
+    :param project_id: project ID of the item
+    :type  project_id: basestring
+    :param old_item: old item data, or None if the item was added
+    :type  old_item: dict
+    :param new_item: new item data, or None if the item was removed
+    :type  new_item: dict
+    :return: change
+    :rtype: dict
+    """
+    return {
+        'change': kind,
+        'project_id': project_id,
+        'old': old_item,
+        'new': new_item}
+
+
+def _modification(old_item, new_item):
+    """
+    Compares the content of two versions of an item.
+
+    :param old_item: old item data
+    :type  old_item: dict
+    :param new_item: new item data
+    :type  new_item: dict
+    :return: change
+    :rtype: dict
+    """
+    change = _change(
+        MODIFIED, new_item['project_id'], old_item, new_item)
+
+    change['attributes'] = {
+        key: (old_item[key], new_item[key]) for key in ATTRIBUTE_KEYS
+        if old_item[key] != new_item[key]}
+
+    old_fields = old_item['fields']
+    new_fields = new_item['fields']
+    change['fields'] = {
+        name: (old_fields.get(name), new_fields.get(name))
+        for name in set(old_fields).union(new_fields)
+        if old_fields.get(name) != new_fields.get(name)}
+
+    change['links'] = {}
+    for key in RELATIONSHIP_KEYS:
+        old_links = set(_relationship_keys(old_item[key]))
+        new_links = set(_relationship_keys(new_item[key]))
+        if old_links != new_links:
+            change['links'][key] = {
+                ADDED: sorted(new_links - old_links),
+                REMOVED: sorted(old_links - new_links)}
+
+    return change
+
+
+def diff_jama_reports(
+        old_reports_path, new_reports_path, cache=None, run_size=RUN_SIZE,
+        temp_dir=None):
+    """
+    Finds what changed between two snapshots of trace data reports generated
+    from Jama (or directories of trace data reports).  The reports are parsed
+    as the changes are consumed.
+
+    :param old_reports_path: path to the old trace data report(s)
+    :type  old_reports_path: basestring
+    :param new_reports_path: path to the new trace data report(s)
+    :type  new_reports_path: basestring
+    :param cache: cache of parsed item data
+    :type  cache: JamaReportCache
+    :param run_size: number of items sorted in memory at a time
+    :type  run_size: int
+    :param temp_dir: directory of temporary files (system default if None)
+    :type  temp_dir: basestring
+    :return: changes, sorted by project ID (see diff_items)
+    :rtype: generator[dict]
+    """
+    return diff_items(
+        iter_jama_reports(old_reports_path, cache=cache),
+        iter_jama_reports(new_reports_path, cache=cache),
+        run_size, temp_dir)
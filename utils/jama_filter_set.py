@@ -0,0 +1,188 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility classes for evaluating many Jama filters together.
+"""
+import logging
+
+from jama_index import JamaItemIndex
+from jama_report import ConditionGroup, InvalidCondition, JamaFilter
+from jama_store import JamaItemStore
+
+
+class JamaFilterSet(object):
+    """
+    Set of filters which are evaluated together in a single pass over the same
+    Jama items.  Structurally identical conditions of the filters, named or
+    not, are compiled once and evaluated at most once per item for all of
+    the filters.
+    """
+    def __init__(self, filters):
+        """
+        Constructor called in instantiation.  Creates a set of filters which
+        share their conditions.
+
+        :param filters: Jama filters
+        :type  filters: list[JamaFilter]
+        """
+        object.__init__(self)
+        self.filters = list(filters)
+
+        # map of condition signatures to compiled conditions
+        self._compiled = {}
+        self._signatures = {}
+        self.predicates = [self._compile(f) for f in self.filters]
+        logging.debug('Compiled {num} distinct conditions of {filters} '
+                      'filters'.format(
+                          num=len(self._compiled), filters=len(self.filters)))
+
+    def __len__(self):
+        """
+        Gets the number of filters.
+
+        :return: number of filters
+        :rtype: int
+        """
+        return len(self.filters)
+
+    def __call__(self, items):
+        """
+        Filters items according to the conditions of each filter.  A list of
+        items is filtered in a single pass; the filters share the map of
+        items and the memo of condition results.  The filters of a columnar
+        store or an item index share its columns or indexes.
+
+        :param items: Jama item data
+        :type  items: list[dict], JamaItemStore or JamaItemIndex
+        :return: Jama items that matched the conditions of each filter
+        :rtype: list[list[dict]]
+        """
+        if isinstance(items, (JamaItemStore, JamaItemIndex)):
+            return [jama_filter(items) for jama_filter in self.filters]
+
+        item_map = {item['project_id']: item for item in items}
+        memo = {}
+        results = [[] for predicate in self.predicates]
+        predicates = zip(self.predicates, results)
+        for item in items:
+            for predicate, result in predicates:
+                if predicate(item, item_map, memo):
+                    result.append(item)
+
+        return results
+
+    def _compile(self, jama_filter):
+        """
+        Compiles the main condition of a filter into a predicate.  Conditions
+        which have been compiled for another filter (or under another name)
+        are not compiled again, and the results of all conditions are
+        memoized per item, keyed by their signatures.
+
+        :param jama_filter: Jama filter
+        :type  jama_filter: JamaFilter
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        def shared(name, condition):
+            signature = self._signature(jama_filter, name)
+            key, holder = self._compiled.get(signature, (None, None))
+            if holder is None:
+                # registered before it is compiled, like JamaFilter.compile
+                key = len(self._compiled)
+                holder = []
+                self._compiled[signature] = (key, holder)
+                holder.append(condition.compile(resolve))
+
+            return JamaFilter._memoize(name, holder, key)
+
+        def resolve(name, related=False):
+            condition = jama_filter.named_conditions.get(name)
+            if condition is None:
+                raise InvalidCondition(
+                    'Missing condition with name "{}"'.format(name))
+
+            return shared(name, condition)
+
+        return shared('main', jama_filter.main_condition)
+
+    def _signature(self, jama_filter, condition, names=()):
+        """
+        Determines the structural signature of a condition, in which named
+        conditions are replaced by their signatures.  A named condition which
+        references itself through relationships is only identical to itself.
+
+        :param jama_filter: Jama filter of the condition
+        :type  jama_filter: JamaFilter
+        :param condition: condition, or name of a condition of the filter
+        :type  condition: Condition, ConditionGroup or basestring
+        :param names: names of the conditions being signed
+        :type  names: tuple(basestring)
+        :return: signature of the condition
+        :rtype: tuple
+        """
+        if isinstance(condition, basestring):
+            if (condition in names or
+                    condition not in jama_filter.named_conditions and
+                    condition != 'main'):
+                return ('named', id(jama_filter), condition)
+
+            signature = self._signatures.get((id(jama_filter), condition))
+            if signature is None:
+                if condition == 'main':
+                    named_condition = jama_filter.main_condition
+
+                else:
+                    named_condition = jama_filter.named_conditions[condition]
+
+                signature = self._signature(
+                    jama_filter, named_condition, names + (condition,))
+
+                self._signatures[(id(jama_filter), condition)] = signature
+
+            return signature
+
+        if isinstance(condition, ConditionGroup):
+            types = None
+            if condition.type is not None:
+                types = frozenset(condition.type)
+
+            conditions = None
+            if condition.conditions is not None:
+                conditions = tuple(
+                    self._signature(jama_filter, c, names)
+                    for c in condition.conditions)
+
+            return ('group', types, condition.group_logic, conditions)
+
+        attrs = []
+        for attr, value in sorted(vars(condition).iteritems()):
+            if (attr in ['upstream_condition', 'downstream_condition'] and
+                    value is not None):
+                value = self._signature(jama_filter, value, names)
+
+            attrs.append((attr, _freeze(value)))
+
+        return ('condition', tuple(attrs))
+
+
+def _freeze(value):
+    """
+    Converts a value of condition logic into a hashable value.
+
+    :param value: value of condition logic
+    :type  value: object
+    :return: hashable value
+    :rtype: object
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+
+    if hasattr(value, 'pattern'):
+        return ('regex', value.pattern, value.flags)
+
+    return value
@@ -0,0 +1,559 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility functions for parsing Jama item trace data reports (HTML) without the
+jama_report_to_json converter.
+"""
+import htmlentitydefs
+import logging
+import multiprocessing
+import os
+from HTMLParser import HTMLParser, HTMLParseError
+
+try:
+    from lxml import etree
+
+except ImportError:
+    # reports are parsed with HTMLParser
+    etree = None
+
+
+# comments which delimit the items in a report
+OBJECT_START = 'jama object start'
+OBJECT_END = 'jama object end'
+
+# extensions of report files in a directory of reports
+REPORT_EXTS = ('.html', '.htm')
+
+# size of the chunks a report is read in
+CHUNK_SIZE = 65536
+
+# item values by class
+ITEM_CLASSES = {
+    'object-type': 'object_type',
+    'object-start': 'object_created',
+    'object-update': 'object_modified',
+    'project-id': 'project_id',
+    'object-title': 'title'}
+
+# relationship lists by class
+RELATIONSHIP_CLASSES = {
+    'upstream-relationship': 'upstream',
+    'downstream-relationship': 'downstream'}
+
+# relationship values by class
+RELATIONSHIP_VALUE_CLASSES = {
+    '{}-relationship-{}'.format(d, c): v
+    for d in ['upstream', 'downstream']
+    for c, v in [
+        ('project-id', 'project_id'),
+        ('global-id', 'global_id'),
+        ('name', 'name'),
+        ('project', 'project'),
+        ('type', 'type')]}
+
+# item lists by class
+LIST_CLASSES = {
+    'location-node': 'location',
+    'tag': 'tags'}
+
+# field row classes
+FIELD_ROW = 'info-table-field-row'
+FIELD_LABEL = 'info-table-field-label'
+FIELD_VALUE = 'info-table-field'
+
+# elements without an end tag
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+# headings and font style elements, for the implied end tags
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+FONT_STYLES = ('tt', 'i', 'b', 'u', 's', 'strike', 'big', 'small')
+
+# elements whose start tag implies the end tag of the current element, if it
+# is one of the listed elements (the rules of the HTML parser of libxml2,
+# which lxml uses)
+IMPLIED_END_TAGS = {
+    tag: frozenset(closed) for tag, closed in [
+        ('form', ('form', 'p', 'hr', 'dl', 'ul', 'ol', 'menu', 'dir',
+                  'address', 'pre', 'listing', 'xmp', 'head') + HEADINGS),
+        ('head', ('p',)),
+        ('title', ('p',)),
+        ('body', ('head', 'style', 'script', 'title')),
+        ('li', ('p', 'dl', 'address', 'pre', 'listing', 'xmp', 'head',
+                'li') + HEADINGS),
+        ('hr', ('p', 'head')),
+        ('dir', ('p', 'head')),
+        ('address', ('p', 'head', 'ul')),
+        ('pre', ('p', 'head', 'ul')),
+        ('listing', ('p', 'head')),
+        ('xmp', ('p',)),
+        ('blockquote', ('p', 'head')),
+        ('dl', ('p', 'dt', 'menu', 'dir', 'address', 'pre', 'listing', 'xmp',
+                'head')),
+        ('dt', ('p', 'menu', 'dir', 'address', 'pre', 'listing', 'xmp',
+                'head', 'dd')),
+        ('dd', ('p', 'menu', 'dir', 'address', 'pre', 'listing', 'xmp',
+                'head', 'dt')),
+        ('ul', ('p', 'head', 'ol', 'menu', 'dir', 'address', 'pre',
+                'listing', 'xmp')),
+        ('ol', ('p', 'head', 'ul')),
+        ('menu', ('p', 'head', 'ul')),
+        ('p', ('p', 'head') + HEADINGS + FONT_STYLES),
+        ('div', ('p', 'head')),
+        ('noscript', ('script',)),
+        ('center', ('font', 'b', 'i', 'p', 'head')),
+        ('a', ('a', 'head')),
+        ('caption', ('p',)),
+        ('colgroup', ('caption', 'colgroup', 'col', 'p')),
+        ('col', ('caption', 'col', 'p')),
+        ('table', ('p', 'head', 'pre', 'listing', 'xmp', 'a') + HEADINGS),
+        ('th', ('th', 'td', 'p', 'span', 'font', 'a', 'b', 'i', 'u')),
+        ('td', ('th', 'td', 'p', 'span', 'font', 'a', 'b', 'i', 'u')),
+        ('tr', ('th', 'td', 'tr', 'caption', 'col', 'colgroup', 'p')),
+        ('thead', ('caption', 'col', 'colgroup')),
+        ('tfoot', ('th', 'td', 'tr', 'caption', 'col', 'colgroup', 'thead',
+                   'tbody', 'p')),
+        ('tbody', ('th', 'td', 'tr', 'caption', 'col', 'colgroup', 'thead',
+                   'tfoot', 'tbody', 'p')),
+        ('optgroup', ('option',)),
+        ('option', ('option',)),
+        ('fieldset', ('legend', 'p', 'head', 'pre', 'listing', 'xmp', 'a') +
+         HEADINGS)] +
+    [(tag, ('p', 'head')) for tag in HEADINGS]}
+
+# priorities of elements for misplaced end tags: an end tag does not close
+# the elements left open in between if one of them has a higher priority
+END_TAG_PRIORITIES = {
+    'div': 150, 'td': 160, 'th': 160, 'tr': 170, 'thead': 180, 'tbody': 180,
+    'tfoot': 180, 'table': 190, 'head': 200, 'body': 200, 'html': 220}
+
+# priority of the other elements for misplaced end tags
+DEFAULT_END_TAG_PRIORITY = 100
+
+
+class InvalidReport(Exception):
+    """Exception for a trace data report which cannot be parsed"""
+    pass
+
+
+class ReportTarget(object):
+    """
+    Collects the items of a trace data report from parser events.  Items are
+    delimited by "jama object start" and "jama object end" comments; their
+    values are the text of the elements with the classes the converter
+    selects.
+    """
+    def __init__(self, report_path):
+        """
+        Constructor called in instantiation.  Creates a target for the parser
+        events of a report.
+
+        :param report_path: path to the report
+        :type  report_path: basestring
+        """
+        object.__init__(self)
+        self.report_path = report_path
+        self.items = []
+        self._item = None
+        self._stack = []
+        self._captures = []
+        self._relationship = None
+        self._field = None
+
+    def start(self, tag, attrib):
+        """
+        Handles the start of an element.
+
+        :param tag: element tag
+        :type  tag: basestring
+        :param attrib: element attributes
+        :type  attrib: dict
+        """
+        if self._item is None:
+            return
+
+        classes = attrib.get('class')
+        opened = None
+        if classes:
+            opened = []
+            for cls in classes.split():
+                opened.extend(self._open(cls))
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append((tag, opened))
+
+        elif opened:
+            self._close(opened)
+
+    def end(self, tag):
+        """
+        Handles the end of an element.
+
+        :param tag: element tag
+        :type  tag: basestring
+        """
+        stack = self._stack
+        if len(stack) > 0 and stack[-1][0] == tag:
+            opened = stack.pop()[1]
+            if opened:
+                self._close(opened)
+
+            return
+
+        # close the elements left open in between
+        for i in xrange(len(stack) - 1, -1, -1):
+            if stack[i][0] == tag:
+                while len(stack) > i:
+                    opened = stack.pop()[1]
+                    if opened:
+                        self._close(opened)
+
+                break
+
+    def data(self, text):
+        """
+        Handles the text of an element.
+
+        :param text: element text
+        :type  text: basestring
+        """
+        for capture in self._captures:
+            capture[1].append(text)
+
+    def comment(self, text):
+        """
+        Handles a comment, which may delimit an item.
+
+        :param text: comment text
+        :type  text: basestring
+        """
+        text = text.strip()
+        if text == OBJECT_START:
+            self._item = {
+                'downstream': [],
+                'fields': {},
+                'location': [],
+                'report_path': self.report_path,
+                'tags': [],
+                'upstream': []}
+
+            self._stack = []
+            self._captures = []
+
+        elif text == OBJECT_END and self._item is not None:
+            while len(self._stack) > 0:
+                opened = self._stack.pop()[1]
+                if opened:
+                    self._close(opened)
+
+            for cls, key in sorted(ITEM_CLASSES.iteritems()):
+                if key not in self._item:
+                    raise InvalidReport(
+                        'Error in "{path}": Selector ".{cls}" not found'.format(
+                            path=self.report_path, cls=cls))
+
+            self.items.append(self._item)
+            self._item = None
+
+    def close(self):
+        """
+        Handles the end of the report.
+
+        :return: items of the report
+        :rtype: list[dict]
+        """
+        return self.items
+
+    def _open(self, cls):
+        """
+        Opens the captures of an element class.
+
+        :param cls: element class
+        :type  cls: basestring
+        :return: opened captures
+        :rtype: list[tuple(basestring, list)]
+        """
+        if cls in RELATIONSHIP_CLASSES:
+            self._relationship = {}
+            return [(cls, None)]
+
+        if cls == FIELD_ROW:
+            self._field = {}
+            return [(cls, None)]
+
+        if (cls in ITEM_CLASSES or cls in LIST_CLASSES or
+                cls in RELATIONSHIP_VALUE_CLASSES or
+                cls in (FIELD_LABEL, FIELD_VALUE)):
+            capture = (cls, [])
+            self._captures.append(capture)
+            return [capture]
+
+        return []
+
+    def _close(self, captures):
+        """
+        Closes the captures of an element and stores their values.
+
+        :param captures: captures to close
+        :type  captures: list[tuple(basestring, list)]
+        """
+        for capture in reversed(captures):
+            cls, text = capture
+            if text is None:
+                if cls in RELATIONSHIP_CLASSES:
+                    self._item[RELATIONSHIP_CLASSES[cls]].append(
+                        self._relationship)
+                    self._relationship = None
+
+                elif self._field is not None:
+                    if FIELD_LABEL in self._field:
+                        self._item['fields'][self._field[FIELD_LABEL]] = (
+                            self._field.get(FIELD_VALUE, ''))
+
+                    self._field = None
+
+                continue
+
+            for i in xrange(len(self._captures) - 1, -1, -1):
+                if self._captures[i] is capture:
+                    del self._captures[i]
+                    break
+
+            value = u''.join(text).strip()
+            if cls in ITEM_CLASSES:
+                self._item.setdefault(ITEM_CLASSES[cls], value)
+
+            elif cls in LIST_CLASSES:
+                self._item[LIST_CLASSES[cls]].append(value)
+
+            elif cls in RELATIONSHIP_VALUE_CLASSES:
+                if self._relationship is not None:
+                    self._relationship.setdefault(
+                        RELATIONSHIP_VALUE_CLASSES[cls], value)
+
+            elif self._field is not None:
+                self._field.setdefault(cls, value)
+
+
+class _ReportParser(HTMLParser):
+    """
+    Drives a report target with the events of HTMLParser.  End tags which HTML
+    allows to omit are implied as the HTML parser of libxml2 implies them, so
+    the target gets the same events as from lxml.
+    """
+    def __init__(self, target):
+        """
+        Constructor called in instantiation.
+
+        :param target: report target
+        :type  target: ReportTarget
+        """
+        HTMLParser.__init__(self)
+        self.target = target
+        self._open = []
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.target.end(tag)
+
+        else:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        open_tags = self._open
+        priority = END_TAG_PRIORITIES.get(tag, DEFAULT_END_TAG_PRIORITY)
+        for i in xrange(len(open_tags) - 1, -1, -1):
+            if open_tags[i] == tag:
+                break
+
+            if END_TAG_PRIORITIES.get(
+                    open_tags[i], DEFAULT_END_TAG_PRIORITY) > priority:
+                return
+
+        else:
+            # not open
+            return
+
+        while len(open_tags) > i:
+            self.target.end(open_tags.pop())
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def handle_entityref(self, name):
+        codepoint = htmlentitydefs.name2codepoint.get(name)
+        self.target.data(
+            unichr(codepoint) if codepoint else u'&{};'.format(name))
+
+    def handle_charref(self, name):
+        try:
+            if name[:1] in 'xX':
+                codepoint = int(name[1:], 16)
+
+            else:
+                codepoint = int(name)
+
+            self.target.data(unichr(codepoint))
+
+        except ValueError:
+            self.target.data(u'&#{};'.format(name))
+
+    def handle_comment(self, data):
+        self.target.comment(data)
+
+    def close(self):
+        HTMLParser.close(self)
+        while len(self._open) > 0:
+            self.target.end(self._open.pop())
+
+    def _start(self, tag, attrs):
+        """
+        Handles the start of an element, after the end of the elements whose
+        end tags it implies.
+
+        :param tag: element tag
+        :type  tag: basestring
+        :param attrs: element attributes
+        :type  attrs: list[tuple(basestring, basestring)]
+        """
+        implied = IMPLIED_END_TAGS.get(tag)
+        open_tags = self._open
+        while implied and len(open_tags) > 0 and open_tags[-1] in implied:
+            self.target.end(open_tags.pop())
+
+        self.target.start(tag, dict(attrs))
+
+
+def parse_report(report_path):
+    """
+    Parses a trace data report generated from Jama.
+
+    :param report_path: path to the trace data report
+    :type  report_path: basestring
+    :return: Jama item data as the converter produces it
+    :rtype: list[dict]
+    :raises InvalidReport: if the report cannot be parsed
+    """
+    return list(iter_report(report_path))
+
+
+def iter_report(report_path):
+    """
+    Parses a trace data report generated from Jama and yields the items as
+    they are parsed.  Reports are parsed with lxml when it is available.
+
+    :param report_path: path to the trace data report
+    :type  report_path: basestring
+    :return: Jama item data as the converter produces it
+    :rtype: generator[dict]
+    :raises InvalidReport: if the report cannot be parsed
+    """
+    target = ReportTarget(report_path)
+    if etree is not None:
+        parser = etree.HTMLParser(target=target, encoding='utf-8')
+        feed = parser.feed
+
+    else:
+        parser = _ReportParser(target)
+        feed = lambda chunk: parser.feed(chunk.decode('utf-8'))
+
+    try:
+        with open(report_path, 'rb') as f:
+            chunk = f.read(CHUNK_SIZE)
+            while chunk:
+                feed(chunk)
+                for item in target.items:
+                    yield item
+
+                del target.items[:]
+                chunk = f.read(CHUNK_SIZE)
+
+        parser.close()
+
+    except (HTMLParseError, UnicodeDecodeError) as e:
+        raise InvalidReport('Error in "{path}": {err}'.format(
+            path=report_path, err=e))
+
+    for item in target.items:
+        yield item
+
+
+def report_files(reports_path):
+    """
+    Finds the trace data reports at a path.
+
+    :param reports_path: path to a trace data report or a directory of trace
+                         data reports
+    :type  reports_path: basestring
+    :return: paths to the trace data reports
+    :rtype: list[basestring]
+    :raises InvalidReport: if the path is not a file or directory
+    """
+    if os.path.isfile(reports_path):
+        return [reports_path]
+
+    if not os.path.isdir(reports_path):
+        raise InvalidReport(
+            '"{}" is not a valid directory or file'.format(reports_path))
+
+    paths = []
+    for root, dirs, filenames in os.walk(reports_path):
+        paths.extend(
+            os.path.join(root, f) for f in filenames
+            if os.path.splitext(f)[1].lower() in REPORT_EXTS)
+
+    return sorted(paths)
+
+
+def iter_reports(reports_path, processes=1):
+    """
+    Parses a trace data report generated from Jama (or a directory of trace data
+    reports) and yields the item data as the converter produces it.  Reports
+    in a directory are parsed in a pool of processes, in order.
+
+    :param reports_path: path to the trace data report(s)
+    :type  reports_path: basestring
+    :param processes: number of processes parsing reports (all CPUs if None)
+    :type  processes: int
+    :return: Jama item data
+    :rtype: generator[dict]
+    :raises InvalidReport: if a report cannot be parsed
+    """
+    paths = report_files(reports_path)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    processes = min(processes, len(paths))
+    if processes <= 1:
+        for path in paths:
+            logging.debug('Parsing "{}"...'.format(path))
+            for item in iter_report(path):
+                yield item
+
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for items in pool.imap(parse_report, paths):
+            for item in items:
+                yield item
+
+        pool.close()
+
+    except:
+        pool.terminate()
+        raise
+
+    finally:
+        pool.join()
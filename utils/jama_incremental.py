@@ -0,0 +1,231 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility classes for keeping the results of Jama filters up to date as Jama
+items change.
+"""
+import collections
+import logging
+
+from jama_report import Condition, ConditionGroup
+
+
+class IncrementalJamaFilter(object):
+    """
+    Results of a filter which are kept up to date as Jama items change.  Only
+    the items whose results can be affected by a change are evaluated again:
+    the changed items themselves and, when the conditions evaluate
+    relationships, the items which are related to them (up to as many
+    relationships away as the conditions look).
+    """
+    def __init__(self, jama_filter, items):
+        """
+        Constructor called in instantiation.  Filters the items according to
+        the conditions of the filter.
+
+        :param jama_filter: Jama filter
+        :type  jama_filter: JamaFilter
+        :param items: Jama item data, with unique project IDs
+        :type  items: list[dict]
+        """
+        object.__init__(self)
+        self.jama_filter = jama_filter
+        self.items = collections.OrderedDict(
+            (item['project_id'], item) for item in items)
+
+        self.matched = {}
+        self._memo = {}
+        self._depth = jama_filter.relationship_depth()
+        self._keys = self._relationship_keys()
+
+        # map of project IDs to the project IDs of the items related to them
+        self._dependents = {}
+        for item in self.items.itervalues():
+            self._link(item)
+
+        predicate = jama_filter.predicate
+        for project_id, item in self.items.iteritems():
+            self.matched[project_id] = predicate(item, self.items, self._memo)
+
+    def __len__(self):
+        """
+        Gets the number of matching items.
+
+        :return: number of matching items
+        :rtype: int
+        """
+        return sum(1 for matched in self.matched.itervalues() if matched)
+
+    def results(self):
+        """
+        Gets the items which match the conditions, in the order the items
+        were added.
+
+        :return: all Jama items that matched the filter conditions
+        :rtype: list[dict]
+        """
+        matched = self.matched
+        return [
+            item for project_id, item in self.items.iteritems()
+            if matched[project_id]]
+
+    def update(self, added=None, changed=None, removed=None):
+        """
+        Applies a change of the items and evaluates the affected items again.
+        Changed items keep their order; added items are appended.
+
+        :param added: data of added Jama items
+        :type  added: list[dict]
+        :param changed: new data of changed Jama items
+        :type  changed: list[dict]
+        :param removed: project IDs of removed Jama items
+        :type  removed: list[basestring]
+        :return: items which started matching the conditions and items which
+                 stopped matching them
+        :rtype: tuple(list[dict], list[dict])
+        """
+        entered = []
+        left = []
+        changed_ids = set()
+        for project_id in removed or []:
+            item = self.items.pop(project_id, None)
+            if item is None:
+                continue
+
+            self._unlink(item)
+            if self.matched.pop(project_id):
+                left.append(item)
+
+            changed_ids.add(project_id)
+
+        for item in (added or []) + (changed or []):
+            project_id = item['project_id']
+            previous = self.items.get(project_id)
+            if previous is not None:
+                self._unlink(previous)
+
+            self.items[project_id] = item
+            self._link(item)
+            changed_ids.add(project_id)
+
+        affected = self._affected(changed_ids)
+        for project_id in affected:
+            for name in self.jama_filter.named_conditions:
+                self._memo.pop((name, project_id), None)
+
+        predicate = self.jama_filter.predicate
+        for project_id in affected:
+            item = self.items.get(project_id)
+            if item is None:
+                continue
+
+            was_matched = self.matched.get(project_id, False)
+            is_matched = predicate(item, self.items, self._memo)
+            self.matched[project_id] = is_matched
+            if is_matched and not was_matched:
+                entered.append(item)
+
+            elif was_matched and not is_matched:
+                left.append(item)
+
+        logging.debug('Evaluated {num} of {total} items again'.format(
+            num=len(affected), total=len(self.items)))
+
+        return entered, left
+
+    def _affected(self, project_ids):
+        """
+        Finds the items whose results can be affected by a change of items.
+
+        :param project_ids: project IDs of the changed items
+        :type  project_ids: set[basestring]
+        :return: project IDs of the affected items
+        :rtype: set[basestring]
+        """
+        affected = set(project_ids)
+        frontier = project_ids
+        depth = 0
+        while len(frontier) > 0:
+            if self._depth is not None and depth == self._depth:
+                break
+
+            related = set()
+            for project_id in frontier:
+                related.update(self._dependents.get(project_id, ()))
+
+            frontier = related - affected
+            affected.update(frontier)
+            depth += 1
+
+        return affected
+
+    def _link(self, item):
+        """
+        Adds the relationships of an item to the dependency graph.
+
+        :param item: Jama item data
+        :type  item: dict
+        """
+        project_id = item['project_id']
+        for key in self._keys:
+            for relationship in item[key]:
+                self._dependents.setdefault(
+                    relationship['project_id'], set()).add(project_id)
+
+    def _unlink(self, item):
+        """
+        Removes the relationships of an item from the dependency graph.
+
+        :param item: Jama item data
+        :type  item: dict
+        """
+        project_id = item['project_id']
+        for key in self._keys:
+            for relationship in item[key]:
+                dependents = self._dependents.get(relationship['project_id'])
+                if dependents is None:
+                    continue
+
+                dependents.discard(project_id)
+                if len(dependents) == 0:
+                    del self._dependents[relationship['project_id']]
+
+    def _relationship_keys(self):
+        """
+        Determines which relationships of an item the conditions follow.
+
+        :return: keys of the relationships of an item
+        :rtype: list[basestring]
+        """
+        keys = set()
+        names = set()
+        conditions = [self.jama_filter.main_condition]
+        while len(conditions) > 0:
+            condition = conditions.pop()
+            if isinstance(condition, basestring):
+                if condition not in names:
+                    names.add(condition)
+                    conditions.append(
+                        self.jama_filter.named_conditions.get(condition))
+
+            elif isinstance(condition, ConditionGroup):
+                conditions.extend(condition.conditions or [])
+
+            elif isinstance(condition, Condition):
+                if (condition.upstream_logic is not None or
+                        condition.upstream_count is not None):
+                    keys.add('upstream')
+                    if condition.upstream_condition is not None:
+                        conditions.append(condition.upstream_condition)
+
+                if (condition.downstream_logic is not None or
+                        condition.downstream_count is not None):
+                    keys.add('downstream')
+                    if condition.downstream_condition is not None:
+                        conditions.append(condition.downstream_condition)
+
+        return sorted(keys)
@@ -0,0 +1,226 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility classes for indexing Jama item data, which JamaFilter uses to plan
+filtering.
+"""
+import bisect
+import calendar
+import itertools
+
+
+class JamaItemIndex(object):
+    """Secondary indexes of Jama item data used to plan filtering"""
+    def __init__(self, items):
+        """
+        Constructor called in instantiation.  Creates the indexes of a set of
+        Jama items.  The indexes are built once, when they are first used.
+        Items are identified by their row in the item list and every index
+        maps to sorted rows.
+
+        :param items: Jama item data
+        :type  items: list[dict]
+        """
+        self.items = items
+        self.item_map = {item['project_id']: item for item in items}
+        self.size = len(items)
+        self.indexes = {}
+
+    def __len__(self):
+        return self.size
+
+    def select(self, rows):
+        """
+        Selects items by row.
+
+        :param rows: rows of the items
+        :type  rows: list[int]
+        :return: selected Jama items
+        :rtype: list[dict]
+        """
+        items = self.items
+        return [items[i] for i in rows]
+
+    def typed(self, types):
+        """
+        Looks up the items of the given types.
+
+        :param types: Jama item types
+        :type  types: list[basestring]
+        :return: sorted rows of the items of one of the types
+        :rtype: list[int]
+        """
+        index = self._hash('object_type', lambda item: item['object_type'])
+        return self._union(index.get(x) for x in set(types))
+
+    def count_typed(self, types):
+        """
+        Counts the items of the given types.
+
+        :param types: Jama item types
+        :type  types: list[basestring]
+        :return: number of items of one of the types
+        :rtype: int
+        """
+        index = self._hash('object_type', lambda item: item['object_type'])
+        return sum(len(index.get(x, [])) for x in set(types))
+
+    def field(self, name, values):
+        """
+        Looks up the items with one of the given values in a field.
+
+        :param name: name of the field
+        :type  name: basestring
+        :param values: field values
+        :type  values: list[basestring]
+        :return: sorted rows of the items with one of the values
+        :rtype: list[int]
+        """
+        index = self._hash(
+            ('fields', name), lambda item: item['fields'].get(name))
+        return self._union(index.get(x) for x in set(values))
+
+    def tagged(self, tag):
+        """
+        Looks up the items tagged with a tag.
+
+        :param tag: tag
+        :type  tag: basestring
+        :return: sorted rows of the items with the tag
+        :rtype: list[int]
+        """
+        index = self.indexes.get('tags')
+        if index is None:
+            index = {}
+            for row, item in enumerate(self.items):
+                for x in set(item['tags']):
+                    index.setdefault(x, []).append(row)
+
+            self.indexes['tags'] = index
+
+        return index.get(tag, [])
+
+    def between(self, key, after, before):
+        """
+        Looks up the items with a date (exclusively) between two dates in a
+        sorted index of the dates as integers.
+
+        :param key: Jama item key of the date
+        :type  key: basestring
+        :param after: date to be after, or None
+        :type  after: datetime.datetime
+        :param before: date to be before, or None
+        :type  before: datetime.datetime
+        :return: sorted rows of the items with a date between the dates, or
+                 None if the dates are not comparable as naive dates
+        :rtype: list[int]
+        """
+        index = self.indexes.get(key)
+        if index is None:
+            index = (None, None)
+            dates = [item[key] for item in self.items]
+            if all(x.tzinfo is None for x in dates):
+                epochs = [_epoch(x) for x in dates]
+                order = sorted(xrange(len(epochs)), key=epochs.__getitem__)
+                index = ([epochs[row] for row in order], order)
+
+            self.indexes[key] = index
+
+        epochs, order = index
+        if epochs is None or any(
+                x is not None and x.tzinfo is not None
+                for x in [after, before]):
+            return None
+
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right(epochs, _epoch(after))
+
+        stop = len(epochs)
+        if before is not None:
+            stop = bisect.bisect_left(epochs, _epoch(before))
+
+        return sorted(order[start:stop])
+
+    def under(self, location_path):
+        """
+        Looks up the items under a location in the location prefix trie.  Each
+        node of the trie holds the rows of all of the items under it.
+
+        :param location_path: location nodes
+        :type  location_path: list[basestring]
+        :return: sorted rows of the items under the location
+        :rtype: list[int]
+        """
+        trie = self.indexes.get('location')
+        if trie is None:
+            trie = ([], {})
+            for row, item in enumerate(self.items):
+                node = trie
+                for x in item['location'] + [item['title']]:
+                    node = node[1].setdefault(x, ([], {}))
+                    node[0].append(row)
+
+            self.indexes['location'] = trie
+
+        node = trie
+        for x in location_path:
+            node = node[1].get(x)
+            if node is None:
+                return []
+
+        return node[0]
+
+    def _hash(self, key, value):
+        """
+        Gets (or builds) a hash index.
+
+        :param key: key of the index
+        :type  key: hashable
+        :param value: function which returns the indexed value of an item
+        :type  value: callable
+        :return: sorted rows by value
+        :rtype: dict{object:list[int]}
+        """
+        index = self.indexes.get(key)
+        if index is None:
+            index = {}
+            for row, item in enumerate(self.items):
+                index.setdefault(value(item), []).append(row)
+
+            self.indexes[key] = index
+
+        return index
+
+    @staticmethod
+    def _union(row_lists):
+        """
+        Merges disjoint lists of sorted rows.
+
+        :param row_lists: lists of sorted rows (or None)
+        :type  row_lists: iterable
+        :return: sorted rows
+        :rtype: list[int]
+        """
+        row_lists = [x for x in row_lists if x]
+        if len(row_lists) == 1:
+            return row_lists[0]
+
+        return sorted(itertools.chain(*row_lists))
+
+
+def _epoch(date):
+    """
+    Converts a date to an integer, so dates can be compared as integers.
+    Naive dates are converted as if they were in UTC.
+
+    :param date: date
+    :type  date: datetime.datetime
+    :return: microseconds since the epoch
+    :rtype: int
+    """
+    return calendar.timegm(date.utctimetuple()) * 1000000 + date.microsecond
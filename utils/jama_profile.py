@@ -0,0 +1,235 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility classes for profiling the evaluation of Jama filters.
+"""
+import json
+from timeit import default_timer
+
+from jama_report import ConditionGroup
+
+
+class FilterProfile(object):
+    """
+    Profile of a filter run, which explains how each condition of the filter
+    was evaluated: how often, how selectively and at what cost.
+    """
+    def __init__(self, jama_filter):
+        """
+        Constructor called in instantiation.  Creates an empty profile of a
+        filter run.
+
+        :param jama_filter: profiled Jama filter
+        :type  jama_filter: JamaFilter
+        """
+        object.__init__(self)
+        self.jama_filter = jama_filter
+        self.results = None
+        self.size = 0
+        self.time = 0.0
+        self.stats = {}
+        self._stack = []
+
+    def wrap(self, key, predicate):
+        """
+        Instruments the predicate of a condition.  The time spent evaluating
+        other instrumented predicates is excluded from its self time.
+
+        :param key: key of the condition in the profile
+        :type  key: tuple
+        :param predicate: predicate of the condition
+        :type  predicate: callable
+        :return: instrumented predicate
+        :rtype: callable
+        """
+        stats = self._stats(key)
+        stack = self._stack
+
+        def profiled(item, item_map, memo):
+            # frame: time of nested conditions, relationship hops, memo hits
+            frame = [0.0, 0, 0]
+            stack.append(frame)
+            start = default_timer()
+            try:
+                result = predicate(item, item_map, memo)
+
+            finally:
+                elapsed = default_timer() - start
+                stack.pop()
+
+            stats['evaluations'] += 1
+            if result:
+                stats['matches'] += 1
+
+            stats['total_time'] += elapsed
+            stats['self_time'] += elapsed - frame[0]
+            stats['hops'] += frame[1]
+            stats['memo_hits'] += frame[2]
+            if len(stack) > 0:
+                stack[-1][0] += elapsed
+
+            return result
+
+        return profiled
+
+    def related(self, name, predicate):
+        """
+        Instruments the memoized predicate of a named condition evaluated
+        against related items, which counts the relationship hops and memo
+        hits of the condition evaluating it.
+
+        :param name: name of the condition
+        :type  name: basestring
+        :param predicate: memoized predicate of the condition
+        :type  predicate: callable
+        :return: instrumented predicate
+        :rtype: callable
+        """
+        stack = self._stack
+
+        def profiled(item, item_map, memo):
+            if len(stack) > 0:
+                frame = stack[-1]
+                frame[1] += 1
+                if (name, item['project_id']) in memo:
+                    frame[2] += 1
+
+            return predicate(item, item_map, memo)
+
+        return profiled
+
+    def dict(self):
+        """
+        Gets the profile as a tree of conditions for each of the main condition
+        and the named conditions which were evaluated.
+
+        :return: profile data
+        :rtype: dict
+        """
+        named = {}
+        for key in self.stats:
+            if key[0] == 'named':
+                named[key[1]] = self._node(
+                    key, self.jama_filter.named_conditions[key[1]])
+
+        return {
+            'items': self.size,
+            'matches': len(self.results or []),
+            'time': self.time,
+            'main': self._node(('main',), self.jama_filter.main_condition),
+            'named': named}
+
+    def json(self, indent=2):
+        """
+        Gets the profile as JSON.
+
+        :param indent: indentation of the JSON
+        :type  indent: int
+        :return: profile data as JSON
+        :rtype: basestring
+        """
+        return json.dumps(self.dict(), indent=indent, sort_keys=True)
+
+    def text(self):
+        """
+        Gets the profile as an indented tree of conditions.
+
+        :return: profile as text
+        :rtype: basestring
+        """
+        profile = self.dict()
+        lines = ['{matches} of {items} items matched in {time:.3f}s'.format(
+            **profile)]
+
+        def add(node, prefix, depth):
+            selectivity = '-'
+            if node['selectivity'] is not None:
+                selectivity = '{:.1%}'.format(node['selectivity'])
+
+            memo = '-'
+            if node['memo_hit_rate'] is not None:
+                memo = '{:.1%}'.format(node['memo_hit_rate'])
+
+            lines.append(
+                '{indent}{prefix}{condition}  [evaluations={evaluations} '
+                'selectivity={selectivity} total={total_time:.6f}s '
+                'self={self_time:.6f}s hops={hops} memo={memo}]'.format(
+                    **dict(
+                        node,
+                        indent='  ' * depth,
+                        prefix=prefix,
+                        selectivity=selectivity,
+                        memo=memo)))
+
+            for child in node.get('children', []):
+                add(child, '', depth + 1)
+
+        add(profile['main'], 'main: ', 0)
+        for name, node in sorted(profile['named'].iteritems()):
+            add(node, '{}: '.format(name), 0)
+
+        return '\n'.join(lines)
+
+    def _stats(self, key):
+        """
+        Gets (or creates) the statistics of a condition.
+
+        :param key: key of the condition in the profile
+        :type  key: tuple
+        :return: statistics of the condition
+        :rtype: dict
+        """
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = {
+                'evaluations': 0,
+                'matches': 0,
+                'total_time': 0.0,
+                'self_time': 0.0,
+                'hops': 0,
+                'memo_hits': 0}
+
+            self.stats[key] = stats
+
+        return stats
+
+    def _node(self, key, condition):
+        """
+        Gets the profile of a condition and of the conditions in it.
+
+        :param key: key of the condition in the profile
+        :type  key: tuple
+        :param condition: condition, or name of a condition
+        :type  condition: Condition, ConditionGroup or basestring
+        :return: profile of the condition
+        :rtype: dict
+        """
+        node = dict(self._stats(key))
+        if isinstance(condition, basestring):
+            node['condition'] = '"{}"'.format(condition)
+
+        else:
+            node['condition'] = condition.describe()
+
+        node['selectivity'] = None
+        if node['evaluations'] > 0:
+            node['selectivity'] = float(node['matches']) / node['evaluations']
+
+        node['memo_hit_rate'] = None
+        if node['hops'] > 0:
+            node['memo_hit_rate'] = float(node['memo_hits']) / node['hops']
+
+        if (isinstance(condition, ConditionGroup) and
+                condition.conditions is not None):
+            node['children'] = [
+                self._node((id(condition), i), c)
+                for i, c in enumerate(condition.conditions)]
+
+        return node
+
+    def __str__(self):
+        return self.text()
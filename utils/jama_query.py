@@ -0,0 +1,558 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility functions for filtering live Jama items with Jama filters.  The parts
+of a filter which the Jama REST API can evaluate are pushed down into the
+search query, so only candidate items are downloaded; the filter is then
+applied to the candidates locally.
+"""
+import datetime
+import logging
+import re
+from HTMLParser import HTMLParser
+
+from dateutil import parser as date_parser
+from dateutil import tz
+
+from jama_report import (
+    Condition, ConditionGroup, GROUP_ALL, GROUP_ANY, STR_CONTAINS)
+
+
+# margin added to the date bounds pushed down into a query, since the dates
+# of filters and trace data reports are local times of an unknown timezone
+DATE_MARGIN = datetime.timedelta(days=1)
+
+# matches the tags of rich text field values
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+class QueryPlan(object):
+    """
+    Necessary conditions of a filter which can be evaluated by the Jama REST
+    API.  Every item which matches the filter matches the plan, but not the
+    other way around.
+    """
+    def __init__(
+            self, types=None, created_after=None, created_before=None,
+            modified_after=None, modified_before=None, contains=None):
+        """
+        Constructor called in instantiation.  Creates a query plan.
+
+        :param types: names of the item types the items must be of (any
+                      item type if None)
+        :type  types: frozenset[basestring]
+        :param created_after: date the items must be created after
+        :type  created_after: datetime.datetime
+        :param created_before: date the items must be created before
+        :type  created_before: datetime.datetime
+        :param modified_after: date the items must be modified after
+        :type  modified_after: datetime.datetime
+        :param modified_before: date the items must be modified before
+        :type  modified_before: datetime.datetime
+        :param contains: text the items must contain
+        :type  contains: frozenset[basestring]
+        """
+        object.__init__(self)
+        self.types = types
+        self.created_after = created_after
+        self.created_before = created_before
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+        self.contains = contains or frozenset()
+
+    def both(self, other):
+        """
+        Combines the plan with the plan of a condition which must also match.
+
+        :param other: query plan
+        :type  other: QueryPlan
+        :return: combined query plan
+        :rtype: QueryPlan
+        """
+        types = self.types
+        if types is None:
+            types = other.types
+
+        elif other.types is not None:
+            types = types & other.types
+
+        return QueryPlan(
+            types=types,
+            created_after=_latest(self.created_after, other.created_after),
+            created_before=_earliest(
+                self.created_before, other.created_before),
+            modified_after=_latest(self.modified_after, other.modified_after),
+            modified_before=_earliest(
+                self.modified_before, other.modified_before),
+            contains=self.contains | other.contains)
+
+    def either(self, other):
+        """
+        Combines the plan with the plan of an alternative condition.
+
+        :param other: query plan
+        :type  other: QueryPlan
+        :return: combined query plan
+        :rtype: QueryPlan
+        """
+        types = None
+        if self.types is not None and other.types is not None:
+            types = self.types | other.types
+
+        return QueryPlan(
+            types=types,
+            created_after=_earliest(
+                self.created_after, other.created_after, unbounded=True),
+            created_before=_latest(
+                self.created_before, other.created_before, unbounded=True),
+            modified_after=_earliest(
+                self.modified_after, other.modified_after, unbounded=True),
+            modified_before=_latest(
+                self.modified_before, other.modified_before, unbounded=True),
+            contains=self.contains & other.contains)
+
+    def query(self, item_types, text_search=False):
+        """
+        Converts the plan to the arguments of a search for abstract items.
+        Date bounds are widened by a margin.
+
+        :param item_types: Jama item types
+        :type  item_types: list[dict]
+        :param text_search: whether to search for the text which the items
+                            must contain; the text search of Jama matches
+                            words rather than substrings of the field values
+                            and may miss items
+        :type  text_search: bool
+        :return: arguments of JamaRestApi.get_all_abstract_items, or None if
+                 no item can match
+        :rtype: dict
+        """
+        query = {}
+        if self.types is not None:
+            item_type_ids = sorted(
+                item_type['id'] for item_type in item_types
+                if item_type.get('display') in self.types or
+                item_type.get('typeKey') in self.types)
+
+            if len(item_type_ids) == 0:
+                return None
+
+            query['item_type_id'] = item_type_ids
+
+        for key, date, margin in [
+                ('created_after', self.created_after, -DATE_MARGIN),
+                ('created_before', self.created_before, DATE_MARGIN),
+                ('modified_after', self.modified_after, -DATE_MARGIN),
+                ('modified_before', self.modified_before, DATE_MARGIN)]:
+            if date is not None:
+                query[key] = date + margin
+
+        if text_search and len(self.contains) > 0:
+            query['contains'] = sorted(self.contains)
+
+        return query
+
+
+def _earliest(a, b, unbounded=False):
+    """
+    Gets the earliest of two date bounds.
+
+    :param a: date bound, or None if unbounded
+    :type  a: datetime.datetime
+    :param b: date bound, or None if unbounded
+    :type  b: datetime.datetime
+    :param unbounded: whether an unbounded date is the earliest
+    :type  unbounded: bool
+    :return: earliest date bound
+    :rtype: datetime.datetime
+    """
+    if a is None or b is None:
+        return None if unbounded else (a or b)
+
+    return min(a, b)
+
+
+def _latest(a, b, unbounded=False):
+    """
+    Gets the latest of two date bounds.
+
+    :param a: date bound, or None if unbounded
+    :type  a: datetime.datetime
+    :param b: date bound, or None if unbounded
+    :type  b: datetime.datetime
+    :param unbounded: whether an unbounded date is the latest
+    :type  unbounded: bool
+    :return: latest date bound
+    :rtype: datetime.datetime
+    """
+    if a is None or b is None:
+        return None if unbounded else (a or b)
+
+    return max(a, b)
+
+
+def plan_query(jama_filter):
+    """
+    Determines the necessary conditions of the main condition of a filter
+    which can be evaluated by the Jama REST API: item types, created and
+    modified dates, and text which a field must contain.
+
+    :param jama_filter: Jama filter
+    :type  jama_filter: JamaFilter
+    :return: query plan
+    :rtype: QueryPlan
+    """
+    def plan(condition):
+        if isinstance(condition, basestring):
+            return plan(jama_filter.named_conditions.get(condition))
+
+        if isinstance(condition, ConditionGroup):
+            result = QueryPlan()
+            if condition.type is not None:
+                result = QueryPlan(types=frozenset(condition.type))
+
+            if (condition.conditions is None or
+                    condition.group_logic not in [GROUP_ALL, GROUP_ANY]):
+                return result
+
+            plans = [plan(c) for c in condition.conditions]
+            if condition.group_logic == GROUP_ALL:
+                return reduce(QueryPlan.both, plans, result)
+
+            if len(plans) == 0:
+                return result
+
+            return result.both(reduce(QueryPlan.either, plans))
+
+        if not isinstance(condition, Condition):
+            return QueryPlan()
+
+        # only the first condition logic of a condition is evaluated
+        if condition.location_logic is not None:
+            return QueryPlan()
+
+        if condition.field_name is not None:
+            if condition.field_required and condition.field_logic == (
+                    STR_CONTAINS):
+                return QueryPlan(contains=frozenset([condition.field_value]))
+
+            return QueryPlan()
+
+        if (condition.created_after is not None or
+                condition.created_before is not None):
+            return QueryPlan(
+                created_after=condition.created_after,
+                created_before=condition.created_before)
+
+        if (condition.modified_after is not None or
+                condition.modified_before is not None):
+            return QueryPlan(
+                modified_after=condition.modified_after,
+                modified_before=condition.modified_before)
+
+        return QueryPlan()
+
+    return plan(jama_filter.main_condition)
+
+
+def query_jama_items(api, jama_filter, project_id=None, text_search=False):
+    """
+    Filters live Jama items.  Only the candidate items of a query plan are
+    downloaded, unless the filter evaluates relationships; related items must
+    be known to evaluate them, so all items of the project are downloaded.
+
+    :param api: Jama REST API interface
+    :type  api: JamaRestApi
+    :param jama_filter: Jama filter
+    :type  jama_filter: JamaFilter
+    :param project_id: Jama project ID which contains the items
+    :type  project_id: int
+    :param text_search: whether to push text which fields must contain down
+                        into the query (see QueryPlan.query)
+    :type  text_search: bool
+    :return: filtered Jama items, as parsed from trace data reports
+    :rtype: list[dict]
+    :raises ValueError: if relationships or tags are evaluated for items
+                        which are not in a project
+    """
+    conditions = _conditions(jama_filter)
+    relationships = jama_filter.is_relationship()
+    tags = any(
+        c.tags_include is not None or c.tags_exclude is not None
+        for c in conditions)
+
+    if project_id is None and (relationships or tags):
+        raise ValueError(
+            'Relationships and tags can only be filtered in a project')
+
+    item_types = api.get_all_item_types()
+    query = {}
+    if not relationships:
+        query = plan_query(jama_filter).query(item_types, text_search)
+        if query is None:
+            return []
+
+    logging.info('Querying Jama items ({})...'.format(
+        ', '.join('{}={}'.format(k, v) for k, v in sorted(query.iteritems()))
+        or 'all'))
+
+    items = api.get_all_abstract_items(project_id=project_id, **query)
+    logging.info('Converting {} Jama items...'.format(len(items)))
+
+    converter = JamaItemConverter(api, item_types)
+    if relationships:
+        converter.add_relationships(items, project_id)
+
+    if tags:
+        converter.add_tags(project_id)
+
+    location = any(c.location_logic is not None for c in conditions)
+    return jama_filter([
+        converter.convert(item, location=location) for item in items])
+
+
+def _conditions(jama_filter):
+    """
+    Finds the conditions which the main condition of a filter evaluates,
+    directly or through named conditions.
+
+    :param jama_filter: Jama filter
+    :type  jama_filter: JamaFilter
+    :return: conditions
+    :rtype: list[Condition]
+    """
+    result = []
+    names = set()
+    conditions = [jama_filter.main_condition]
+    while len(conditions) > 0:
+        condition = conditions.pop()
+        if isinstance(condition, basestring):
+            if condition not in names:
+                names.add(condition)
+                conditions.append(jama_filter.named_conditions.get(condition))
+
+        elif isinstance(condition, ConditionGroup):
+            conditions.extend(condition.conditions or [])
+
+        elif isinstance(condition, Condition):
+            result.append(condition)
+            conditions.extend(
+                c for c in [
+                    condition.upstream_condition,
+                    condition.downstream_condition]
+                if c is not None)
+
+    return result
+
+
+class JamaItemConverter(object):
+    """
+    Converts Jama items from the REST API to the item data parsed from trace
+    data reports, so they can be filtered.
+    """
+    def __init__(self, api, item_types):
+        """
+        Constructor called in instantiation.  Creates a converter.
+
+        :param api: Jama REST API interface
+        :type  api: JamaRestApi
+        :param item_types: Jama item types
+        :type  item_types: list[dict]
+        """
+        object.__init__(self)
+        self.api = api
+        self.item_types = {
+            item_type['id']: item_type for item_type in item_types}
+
+        self._upstream = {}
+        self._downstream = {}
+        self._tags = {}
+        self._pick_lists = {}
+        self._items = {}
+        self._html = HTMLParser()
+
+    def convert(self, item, location=False):
+        """
+        Converts a Jama item.
+
+        :param item: Jama item from the REST API
+        :type  item: dict
+        :param location: whether to get the location of the item, which
+                         takes a request per folder
+        :type  location: bool
+        :return: Jama item data
+        :rtype: dict
+        """
+        item_type = self.item_types.get(item.get('itemType'), {})
+        field_defs = {f['name']: f for f in item_type.get('fields', [])}
+        fields = {}
+        for name, value in item.get('fields', {}).iteritems():
+            field_def = field_defs.get(name, {})
+            value = self._field_value(value, field_def.get('pickList'))
+            if value is not None:
+                fields[field_def.get('label', name)] = value
+
+        return {
+            'downstream': self._downstream.get(item['id'], []),
+            'fields': fields,
+            'location': self._location(item) if location else [],
+            'object_created': self._date(item['createdDate']),
+            'object_modified': self._date(item['modifiedDate']),
+            'object_type': item_type.get('display', unicode(
+                item.get('itemType'))),
+            'project_id': item.get('documentKey', unicode(item['id'])),
+            'report_path': self.api.url('abstractitems/{}'.format(item['id'])),
+            'tags': self._tags.get(item['id'], []),
+            'title': self._plain_text(item.get('fields', {}).get('name', u'')),
+            'upstream': self._upstream.get(item['id'], [])}
+
+    def add_relationships(self, items, project_id):
+        """
+        Gets the relationships of the items of a project.
+
+        :param items: Jama items from the REST API
+        :type  items: list[dict]
+        :param project_id: Jama project ID
+        :type  project_id: int
+        """
+        self._items.update((item['id'], item) for item in items)
+        relationship_types = {
+            t['id']: t.get('name') for t in
+            self.api.get_all_relationship_types()}
+
+        for relationship in self.api.get_all_relationships(project_id):
+            from_id = relationship['fromItem']
+            to_id = relationship['toItem']
+            relationship_type = relationship_types.get(
+                relationship.get('relationshipType'), u'')
+
+            self._downstream.setdefault(from_id, []).append(
+                self._relationship(to_id, relationship_type))
+
+            self._upstream.setdefault(to_id, []).append(
+                self._relationship(from_id, relationship_type))
+
+    def add_tags(self, project_id):
+        """
+        Gets the tags of the items of a project.
+
+        :param project_id: Jama project ID
+        :type  project_id: int
+        """
+        for tag in self.api.get_all_tags(project_id):
+            for item in self.api.get_all_tag_items(tag['id']):
+                self._tags.setdefault(item['id'], []).append(tag['name'])
+
+    def _relationship(self, item_id, relationship_type):
+        """
+        Converts a relationship to a Jama item.  Items which were not
+        downloaded are identified by their API IDs, so they are unknown to
+        the filter.
+
+        :param item_id: Jama item ID of the related item
+        :type  item_id: int
+        :param relationship_type: name of the relationship type
+        :type  relationship_type: basestring
+        :return: relationship data
+        :rtype: dict
+        """
+        item = self._items.get(item_id, {})
+        return {
+            'global_id': item.get('globalId', u''),
+            'name': self._plain_text(item.get('fields', {}).get('name', u'')),
+            'project': unicode(item.get('project', u'')),
+            'project_id': item.get('documentKey', unicode(item_id)),
+            'type': relationship_type}
+
+    def _location(self, item):
+        """
+        Gets the names of the folders an item is located in, from the top.
+
+        :param item: Jama item from the REST API
+        :type  item: dict
+        :return: location of the item
+        :rtype: list[basestring]
+        """
+        location = []
+        parent = item.get('location', {}).get('parent', {}).get('item')
+        while parent is not None:
+            if parent not in self._items:
+                self._items[parent] = self.api.get_abstract_item(
+                    parent)['data']
+
+            item = self._items[parent]
+            location.append(
+                self._plain_text(item.get('fields', {}).get('name', u'')))
+
+            parent = item.get('location', {}).get('parent', {}).get('item')
+
+        return location[::-1]
+
+    def _field_value(self, value, pick_list_id):
+        """
+        Converts the value of a field to text.
+
+        :param value: field value
+        :type  value: object
+        :param pick_list_id: Jama pick list ID of the field, if any
+        :type  pick_list_id: int
+        :return: text of the value, or None if the field is not set
+        :rtype: basestring
+        """
+        if value is None:
+            return None
+
+        if isinstance(value, list):
+            values = [self._field_value(v, pick_list_id) for v in value]
+            return u', '.join(v for v in values if v is not None)
+
+        if pick_list_id is not None and isinstance(value, (int, long)):
+            options = self._pick_lists.get(pick_list_id)
+            if options is None:
+                options = {
+                    option['id']: option['name'] for option in
+                    self.api.get_all_pick_list_options(pick_list_id)}
+
+                self._pick_lists[pick_list_id] = options
+
+            return options.get(value, unicode(value))
+
+        if isinstance(value, basestring):
+            return self._plain_text(value)
+
+        return unicode(value)
+
+    def _plain_text(self, text):
+        """
+        Converts rich text to plain text.
+
+        :param text: rich text
+        :type  text: basestring
+        :return: plain text
+        :rtype: basestring
+        """
+        if '<' in text or '&' in text:
+            text = self._html.unescape(TAG_RE.sub(u'', text))
+
+        return text.strip()
+
+    @staticmethod
+    def _date(value):
+        """
+        Parses a date of the REST API as a local date without a timezone,
+        like the dates of trace data reports.
+
+        :param value: ISO 8601 date
+        :type  value: basestring
+        :return: date
+        :rtype: datetime.datetime
+        """
+        date = date_parser.parse(value)
+        if date.tzinfo is not None:
+            date = date.astimezone(tz.tzlocal()).replace(tzinfo=None)
+
+        return date
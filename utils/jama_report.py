@@ -1,923 +1,2576 @@
-"""
-+------------------------------------------------------------------------------+
-|                       Copyright 2017 Rockwell Collins                        |
-|                             All Rights Reserved                              |
-|                           Proprietary Information                            |
-+------------------------------------------------------------------------------+
-
-Utility functions for reading and filtering Jama item trace data reports.
-"""
-import json
-import logging
-import re
-
-import voluptuous as vol
-import yaml
-from dateutil import parser as date_parser
-
-import execute
-from constants import JAMA_PARSER_BIN
-from dictutils import dict_get_first
-from strings import plainstr
-
-
-# schema for verifying the Jama data structure
-DATA_SCHEMA = vol.Schema([{
-    vol.Required('downstream'): [{
-        vol.Required('global_id'): plainstr,
-        vol.Required('project_id'): plainstr,
-        vol.Required('type'): plainstr,
-        vol.Required('project'): plainstr,
-        vol.Required('name'): plainstr
-    }],
-    vol.Required('fields'): vol.All(
-        dict,
-        lambda v: {plainstr(k): plainstr(x) for k, x in v.iteritems()}),
-    vol.Required('location'): [plainstr],
-    vol.Required('object_created'): vol.All(plainstr, date_parser.parse),
-    vol.Required('object_modified'): vol.All(plainstr, date_parser.parse),
-    vol.Required('object_type'): plainstr,
-    vol.Required('project_id'): plainstr,
-    vol.Required('report_path'): plainstr,
-    vol.Required('tags'): [plainstr],
-    vol.Required('title'): plainstr,
-    vol.Required('upstream'): [{
-        vol.Required('global_id'): plainstr,
-        vol.Required('project_id'): plainstr,
-        vol.Required('type'): plainstr,
-        vol.Required('project'): plainstr,
-        vol.Required('name'): plainstr
-    }]
-}])
-
-# matches unescaped path separators in Jama location strings
-LOCATION_RE = re.compile(r'(?<!\\)/')
-
-
-def _location(v):
-    """Location string validator"""
-    return [
-        x.replace('\\/', '/').replace('\\\\', '\\')
-        for x in LOCATION_RE.split(v)]
-
-
-def _recursive_conditions(v):
-    """Recursive condition validator"""
-    return vol.Any(
-        vol.All(CONDITION_GROUP_SCHEMA, vol.Coerce(ConditionGroup)),
-        vol.All(CONDITION_SCHEMA, vol.Coerce(Condition)))(v)
-
-
-# schema constants
-STR_CONTAINS = 'contains'
-STR_DOES_NOT_CONTAIN = 'does not contain'
-STR_IS = 'is'
-STR_IS_NOT = 'is not'
-STR_IN = 'in'
-STR_NOT_IN = 'not in'
-STR_MATCHES = 'matches'
-DATE_BEFORE = 'before'
-DATE_AFTER = 'after'
-NUM_IS = 'is'
-NUM_IS_NOT = 'is not'
-NUM_IN = 'in'
-NUM_NOT_IN = 'not in'
-NUM_GREATER_THAN = 'greater than'
-NUM_GREATER_THAN_EQ = 'greater than or equal to'
-NUM_LESS_THAN = 'less than'
-NUM_LESS_THAN_EQ = 'less than or equal to'
-RELS_WITH_TYPE = 'with relationship type'
-RELS_COUNT = 'count'
-RELS_ALL_MATCH = 'all match'
-RELS_COUNT_MATCH = 'count match'
-RELS_NONE_MATCH = 'none match'
-RELS_COUNT_UNKNOWNS = 'count unknowns'
-LOCATION = 'location'
-LOCATION_IS_UNDER = 'is under'
-LOCATION_IS_NOT_UNDER = 'is not under'
-LOCATION_EVERY_NODE = 'every node'
-LOCATION_NO_NODE = 'no node'
-FIELD = 'field'
-FIELD_NAME = 'name'
-FIELD_VALUE = 'value'
-FIELD_REQUIRED = 'required'
-CREATED = 'created'
-MODIFIED = 'modified'
-TAGS = 'tags'
-TAGS_INCLUDE = 'include'
-TAGS_EXCLUDE = 'exclude'
-UPSTREAM_ITEMS = 'upstream items'
-DOWNSTREAM_ITEMS = 'downstream items'
-GROUP_TYPE = 'type'
-GROUP_ALL = 'according to all'
-GROUP_ANY = 'according to any'
-
-# schema for filtering strings
-STRCOMP_SCHEMA = vol.Schema({
-    vol.Exclusive(STR_CONTAINS, 'str_compare'): plainstr,
-    vol.Exclusive(STR_DOES_NOT_CONTAIN, 'str_compare'): plainstr,
-    vol.Exclusive(STR_IS, 'str_compare'): plainstr,
-    vol.Exclusive(STR_IS_NOT, 'str_compare'): plainstr,
-    vol.Exclusive(STR_IN, 'str_compare'): [plainstr],
-    vol.Exclusive(STR_NOT_IN, 'str_compare'): [plainstr],
-    vol.Exclusive(STR_MATCHES, 'str_compare'): vol.All(
-        plainstr,
-        lambda v: re.compile(v, re.IGNORECASE))
-}, extra=vol.PREVENT_EXTRA)
-
-# schema for filtering dates
-DATE_SCHEMA = vol.Schema({
-    vol.Optional(DATE_BEFORE): vol.All(plainstr, date_parser.parse),
-    vol.Optional(DATE_AFTER): vol.All(plainstr, date_parser.parse)
-}, extra=vol.PREVENT_EXTRA)
-
-# schema for filtering numbers
-NUMCOMP_SCHEMA = vol.Any(
-    vol.Schema({
-        vol.Exclusive(NUM_IS, 'num_compare'): vol.Coerce(int),
-        vol.Exclusive(NUM_IS_NOT, 'num_compare'): vol.Coerce(int),
-        vol.Exclusive(NUM_IN, 'num_compare'): [vol.Coerce(int)],
-        vol.Exclusive(NUM_NOT_IN, 'num_compare'): [vol.Coerce(int)]
-    }, extra=vol.PREVENT_EXTRA),
-    vol.Schema({
-        vol.Exclusive(NUM_GREATER_THAN, 'gt'): vol.Coerce(int),
-        vol.Exclusive(NUM_GREATER_THAN_EQ, 'gt'): vol.Coerce(int),
-        vol.Exclusive(NUM_LESS_THAN, 'lt'): vol.Coerce(int),
-        vol.Exclusive(NUM_LESS_THAN_EQ, 'lt'): vol.Coerce(int)
-    }, extra=vol.PREVENT_EXTRA))
-
-# schema for filtering relationships
-RELATIONSHIPS_SCHEMA = vol.Schema({
-    vol.Optional(RELS_WITH_TYPE): vol.Any(
-        [plainstr], lambda v: [plainstr(v)]),
-    vol.Optional(RELS_COUNT): NUMCOMP_SCHEMA,
-    vol.Exclusive(RELS_ALL_MATCH, 'relationship_logic'): plainstr,
-    vol.Exclusive(RELS_COUNT_MATCH, 'relationship_logic'): plainstr,
-    vol.Exclusive(RELS_NONE_MATCH, 'relationship_logic'): plainstr,
-    vol.Optional(RELS_COUNT_UNKNOWNS, default=False): vol.Boolean
-}, extra=vol.PREVENT_EXTRA)
-
-# schema for filtering items
-CONDITION_SCHEMA = vol.Schema({
-    vol.Exclusive(LOCATION, 'attribute'): vol.Schema({
-        vol.Exclusive(LOCATION_IS_UNDER, 'location_logic'): _location,
-        vol.Exclusive(LOCATION_IS_NOT_UNDER, 'location_logic'): _location,
-        vol.Exclusive(LOCATION_EVERY_NODE, 'location_logic'): STRCOMP_SCHEMA,
-        vol.Exclusive(LOCATION_NO_NODE, 'location_logic'): STRCOMP_SCHEMA
-    }, extra=vol.PREVENT_EXTRA),
-    vol.Exclusive(FIELD, 'attribute'): vol.Schema({
-        vol.Required(FIELD_NAME): plainstr,
-        vol.Optional(FIELD_VALUE): STRCOMP_SCHEMA,
-        vol.Optional(FIELD_REQUIRED, default=True): vol.Coerce(bool)
-    }, extra=vol.PREVENT_EXTRA),
-    vol.Exclusive(CREATED, 'attribute'): DATE_SCHEMA,
-    vol.Exclusive(MODIFIED, 'attribute'): DATE_SCHEMA,
-    vol.Exclusive(TAGS, 'attribute'): vol.Schema({
-        vol.Exclusive(TAGS_INCLUDE, 'tag_logic'): plainstr,
-        vol.Exclusive(TAGS_EXCLUDE, 'tag_logic'): plainstr
-    }, extra=vol.PREVENT_EXTRA),
-    vol.Exclusive(UPSTREAM_ITEMS, 'attribute'): RELATIONSHIPS_SCHEMA,
-    vol.Exclusive(DOWNSTREAM_ITEMS, 'attribute'): RELATIONSHIPS_SCHEMA
-}, extra=vol.PREVENT_EXTRA)
-
-# schema for filtering items with multiple conditions
-CONDITION_GROUP_SCHEMA = vol.Schema({
-    vol.Optional(GROUP_TYPE): vol.Any([plainstr], lambda v: [plainstr(v)]),
-    vol.Exclusive(GROUP_ALL, 'group_logic'): [
-        vol.Any(_recursive_conditions, plainstr)],
-    vol.Exclusive(GROUP_ANY, 'group_logic'): [
-        vol.Any(_recursive_conditions, plainstr)]
-}, extra=vol.PREVENT_EXTRA)
-
-# schema for a top-level filter
-FILTER_SCHEMA = vol.All(
-    dict,
-    vol.Contains('main'),
-    lambda v: {plainstr(k): _recursive_conditions(x) for k, x in v.iteritems()})
-
-
-class InvalidCondition(Exception):
-    """Exception raised when a condition definition is invalid"""
-    pass
-
-
-class Condition(object):
-    """Condition to filter Jama items"""
-    def __init__(self, condition):
-        """
-        Constructor called in instantiation.  Creates a condition which can be
-        used to determine whether a Jama item should be filtered.
-
-        :param condition: condition logic
-        :type  condition: dict
-        """
-        self.location_logic = None
-        self.location_path = None
-        self.field_name = None
-        self.field_logic = None
-        self.field_value = None
-        self.field_required = None
-        self.created_before = None
-        self.created_after = None
-        self.modified_before = None
-        self.modified_after = None
-        self.tags_include = None
-        self.tags_exclude = None
-        self.upstream_type = None
-        self.upstream_count = None
-        self.upstream_logic = None
-        self.upstream_condition = None
-        self.upstream_count_unknowns = None
-        self.downstream_type = None
-        self.downstream_count = None
-        self.downstream_logic = None
-        self.downstream_condition = None
-        self.downstream_count_unknowns = None
-
-        # location
-        location_condition = condition.get(LOCATION)
-        if location_condition is not None:
-            self.location_logic, location_value = dict_get_first(
-                location_condition, [
-                    LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER,
-                    LOCATION_EVERY_NODE, LOCATION_NO_NODE])
-
-            if self.location_logic in [
-                    LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER]:
-                self.location_path = location_value
-                if self.location_logic is None:
-                    raise InvalidCondition('Invalid location path "{}"'.format(
-                        self.location_path))
-
-            else:
-                self.location_node_logic, self.location_node_value = (
-                    dict_get_first(location_value, [
-                        STR_CONTAINS, STR_DOES_NOT_CONTAIN, STR_IS,
-                        STR_IS_NOT, STR_IN, STR_NOT_IN, STR_MATCHES]))
-
-                if any(x is None for x in [
-                        self.location_node_logic, self.location_node_value]):
-                    raise InvalidCondition(
-                        'Missing attribute for "{}" condition'.format(
-                            self.location_logic))
-
-            if self.location_logic is None:
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(LOCATION))
-
-        # field
-        field_condition = condition.get(FIELD)
-        if field_condition is not None:
-            self.field_name = field_condition.get(FIELD_NAME)
-            field_value = field_condition.get(FIELD_VALUE)
-            if field_value is not None:
-                self.field_logic, self.field_value = dict_get_first(
-                    field_value, [
-                        STR_CONTAINS, STR_DOES_NOT_CONTAIN, STR_IS, STR_IS_NOT,
-                        STR_IN, STR_NOT_IN, STR_MATCHES])
-
-            self.field_required = field_condition.get(FIELD_REQUIRED, True)
-            if self.field_name is None:
-                raise InvalidCondition(
-                    'Missing "{attr}" attribute for "{cnd}" condition'.format(
-                        attr=FIELD_NAME, cnd=FIELD))
-
-            if not self.field_required and all(x is None for x in [
-                    self.field_value, self.field_value]):
-                raise InvalidCondition(
-                    'Missing "{attr}" attribute for "{cnd}" condition'.format(
-                        attr=FIELD_VALUE, cnd=FIELD))
-
-        # created
-        created_condition = condition.get(CREATED)
-        if created_condition is not None:
-            self.created_before = created_condition.get(DATE_BEFORE)
-            self.created_after = created_condition.get(DATE_AFTER)
-            if all(x is None for x in [
-                    self.created_before, self.created_after]):
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(CREATED))
-
-        # modified
-        modified_condition = condition.get(MODIFIED)
-        if modified_condition is not None:
-            self.modified_before = modified_condition.get(DATE_BEFORE)
-            self.modified_after = modified_condition.get(DATE_AFTER)
-            if all(x is None for x in [
-                    self.modified_before, self.modified_after]):
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(MODIFIED))
-
-        # tags
-        tags_condition = condition.get(TAGS)
-        if tags_condition is not None:
-            self.tags_include = tags_condition.get(TAGS_INCLUDE)
-            self.tags_exclude = tags_condition.get(TAGS_EXCLUDE)
-            if all(x is None for x in [
-                    self.tags_include, self.tags_exclude]):
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(TAGS))
-
-        # upstream items
-        upstream_condition = condition.get(UPSTREAM_ITEMS)
-        if upstream_condition is not None:
-            self.upstream_type = upstream_condition.get(RELS_WITH_TYPE)
-            count = upstream_condition.get(RELS_COUNT)
-            if count is not None:
-                logic, comp_value = dict_get_first(
-                    count, [NUM_IS, NUM_IS_NOT, NUM_IN, NUM_NOT_IN])
-
-                if logic is not None:
-                    self.upstream_count = [(logic, count[logic])]
-
-                else:
-                    self.upstream_count = []
-                    for logic in [
-                            NUM_GREATER_THAN, NUM_GREATER_THAN_EQ,
-                            NUM_LESS_THAN, NUM_LESS_THAN_EQ]:
-                        if logic in count:
-                            self.upstream_count.append((logic, count[logic]))
-
-                    if len(self.upstream_count) == 0:
-                        raise InvalidCondition(
-                            'Missing sub-attribute of attribute "{attr}" for '
-                            '"{cnd}" condition'.format(
-                                attr=RELS_COUNT, cnd=UPSTREAM_ITEMS))
-
-            self.upstream_logic, self.upstream_condition = dict_get_first(
-                upstream_condition,
-                [RELS_ALL_MATCH, RELS_COUNT_MATCH, RELS_NONE_MATCH])
-
-            self.upstream_count_unknowns = upstream_condition.get(
-                RELS_COUNT_UNKNOWNS, False)
-
-            if all(x is None for x in [
-                    self.upstream_count, self.upstream_condition]):
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(
-                        UPSTREAM_ITEMS))
-
-            if self.upstream_count is None:
-                if self.upstream_logic == RELS_COUNT_MATCH:
-                    raise InvalidCondition(
-                        'Attribute "{attr1}" must be used with attribute '
-                        '"{attr2}"'.format(
-                            attr1=RELS_COUNT, attr2=RELS_COUNT_MATCH))
-
-            elif self.upstream_logic not in [None, RELS_COUNT_MATCH]:
-                raise InvalidCondition(
-                    'Attribute "{attr1}" cannot be combined with attribute '
-                    '"{attr2}"'.format(
-                        attr1=RELS_COUNT, attr2=self.upstream_logic))
-
-        # downstream items
-        downstream_condition = condition.get(DOWNSTREAM_ITEMS)
-        if downstream_condition is not None:
-            self.downstream_type = downstream_condition.get(RELS_WITH_TYPE)
-            count = downstream_condition.get(RELS_COUNT)
-            if count is not None:
-                logic, comp_value = dict_get_first(
-                    count, [NUM_IS, NUM_IS_NOT, NUM_IN, NUM_NOT_IN])
-
-                if logic is not None:
-                    self.downstream_count = [(logic, count[logic])]
-
-                else:
-                    self.downstream_count = []
-                    for logic in [
-                            NUM_GREATER_THAN, NUM_GREATER_THAN_EQ,
-                            NUM_LESS_THAN, NUM_LESS_THAN_EQ]:
-                        if logic in count:
-                            self.downstream_count.append((logic, count[logic]))
-
-                    if len(self.downstream_count) == 0:
-                        raise InvalidCondition(
-                            'Missing sub-attribute of attribute "{attr}" for '
-                            '"{cnd}" condition'.format(
-                                attr=RELS_COUNT, cnd=DOWNSTREAM_ITEMS))
-
-            self.downstream_logic, self.downstream_condition = dict_get_first(
-                downstream_condition,
-                [RELS_ALL_MATCH, RELS_COUNT_MATCH, RELS_NONE_MATCH])
-
-            self.downstream_count_unknowns = downstream_condition.get(
-                RELS_COUNT_UNKNOWNS, False)
-
-            if all(x is None for x in [
-                    self.downstream_count, self.downstream_condition]):
-                raise InvalidCondition(
-                    'Missing attribute for "{}" condition'.format(
-                        DOWNSTREAM_ITEMS))
-
-            if self.downstream_count is None:
-                if self.downstream_logic == RELS_COUNT_MATCH:
-                    raise InvalidCondition(
-                        'Attribute "{attr1}" must be used with attribute '
-                        '"{attr2}"'.format(
-                            attr1=RELS_COUNT, attr2=RELS_COUNT_MATCH))
-
-            elif self.downstream_logic not in [None, RELS_COUNT_MATCH]:
-                raise InvalidCondition(
-                    'Attribute "{attr1}" cannot be combined with attribute '
-                    '"{attr2}"'.format(
-                        attr1=RELS_COUNT, attr2=self.downstream_logic))
-
-    def __call__(self, item, item_map, named_conditions):
-        """
-        Determines whether or not a Jama item matches the condition logic.
-
-        :param item: Jama item data
-        :type  item: dict
-        :param item_map: map of project IDs to Jama item data
-        :type  item_map: dict{basestring:dict}
-        :param named_conditions: map of condition names to conditions
-        :type  named_conditions: dict{basestring:Condition}
-        :return: whether the item matches the condition logic
-        :rtype: bool
-        """
-        # location is under
-        if self.location_logic == LOCATION_IS_UNDER:
-            item_path = item['location'] + [item['title']]
-            if len(item_path) < len(self.location_path):
-                return False
-
-            return all(
-                item_path[i] == node
-                for i, node in enumerate(self.location_path))
-
-        # location is not under
-        if self.location_logic == LOCATION_IS_NOT_UNDER:
-            item_path = item['location'] + [item['title']]
-            if len(item_path) < len(self.location_path):
-                return True
-
-            return not all(
-                item_path[i] == node
-                for i, node in enumerate(self.location_path))
-
-        # location every node
-        if self.location_logic == LOCATION_EVERY_NODE:
-            item_path = item['location'] + [item['title']]
-            return all(
-                self._strcomp(value=node,
-                    comp_value=self.location_node_value,
-                    logic=self.location_node_logic)
-                for node in item_path)
-
-        # location no node
-        if self.location_logic == LOCATION_NO_NODE:
-            item_path = item['location'] + [item['title']]
-            return all(
-                not self._strcomp(value=node,
-                    comp_value=self.location_node_value,
-                    logic=self.location_node_logic)
-                for node in item_path)
-
-        # field
-        if self.field_name is not None:
-            value = item['fields'].get(self.field_name)
-            if value is None:
-                return not self.field_required
-
-            if self.field_logic is None:
-                return True
-
-            return self._strcomp(
-                value=value,
-                comp_value=self.field_value,
-                logic=self.field_logic)
-
-        # created after
-        if (self.created_after is not None and
-                item['object_created'] <= self.created_after):
-            return False
-
-        # created before
-        if (self.created_before is not None and
-                item['object_created'] >= self.created_before):
-            return False
-
-        if any(x is not None for x in [
-                self.created_after, self.created_before]):
-            return True
-
-        # modified after
-        if (self.modified_after is not None and
-                item['object_modified'] <= self.modified_after):
-            return False
-
-        # modified before
-        if (self.modified_before is not None and
-                item['object_modified'] >= self.modified_before):
-            return False
-
-        if any(x is not None for x in [
-                self.modified_after, self.modified_before]):
-            return True
-
-        # tags include
-        if self.tags_include is not None:
-            return self.tags_include in item['tags']
-
-        # tags exclude
-        if self.tags_exclude is not None:
-            return self.tags_exclude not in item['tags']
-
-        # upstream items
-        if any(x is not None for x in [
-                self.upstream_logic, self.upstream_count]):
-            condition = None
-            if self.upstream_condition is not None:
-                condition = named_conditions.get(self.upstream_condition)
-                if condition is None:
-                    raise InvalidCondition(
-                        'Missing condition with name "{}"'.format(
-                            self.upstream_condition))
-
-            return self._evaluate_relationships(
-                relationships=item['upstream'],
-                types=self.upstream_type,
-                logic=self.upstream_logic,
-                count_unknowns=self.upstream_count_unknowns,
-                count=self.upstream_count,
-                condition=condition,
-                item_map=item_map,
-                named_conditions=named_conditions)
-
-        # downstream items
-        if any(x is not None for x in [
-                self.downstream_logic, self.downstream_count]):
-            condition = None
-            if self.downstream_condition is not None:
-                condition = named_conditions.get(self.downstream_condition)
-                if condition is None:
-                    raise InvalidCondition(
-                        'Missing condition with name "{}"'.format(
-                            self.downstream_condition))
-
-            return self._evaluate_relationships(
-                relationships=item['downstream'],
-                types=self.downstream_type,
-                logic=self.downstream_logic,
-                count_unknowns=self.downstream_count_unknowns,
-                count=self.downstream_count,
-                condition=condition,
-                item_map=item_map,
-                named_conditions=named_conditions)
-
-        raise InvalidCondition('No condition logic to evaluate')
-
-    def _evaluate_relationships(
-            self, relationships, types, logic, count_unknowns, count, condition,
-            item_map, named_conditions):
-        """
-        Determines whether or not a Jama item's relationships match the
-        relationship condition logic.
-
-        :param relationships: Jama item relationships to evaluate
-        :type  relationships: list[dict]
-        :param types: relationship types to consider
-        :type  types: list[basestring]
-        :param logic: logic to determine how the relationships are evaluated
-                      against the condition
-        :type  logic: basestring
-        :param count_unknowns:
-        :type  count_unknowns: bool
-        :param count: number comparison conditions used to evaluate the
-                      relationship count against
-        :type  count: dict{basestring: int}
-        :param condition: nested condition to evaluate the relationships against
-        :type  condition: Condition
-        :param item_map: map of project IDs to Jama item data
-        :type  item_map: dict{basestring:dict}
-        :param named_conditions: map of condition names to conditions
-        :type  named_conditions: dict{basestring:Condition}
-        :return: whether the relationships match the condition logic
-        :rtype: bool
-        """
-        # collect known items
-        known_items = []
-        num_unknowns = 0
-        for relationship in relationships:
-            if (types is not None and
-                    relationship['type'] not in types):
-                continue
-
-            related_item = item_map.get(relationship['project_id'])
-            if related_item is None:
-                num_unknowns += 1
-                continue
-
-            known_items.append(related_item)
-
-        if logic is None:
-            # just count
-            num_related_items = len(known_items)
-            if count_unknowns:
-                num_related_items += num_unknowns
-
-            return all(
-                self._numcomp(
-                    value=num_related_items,
-                    comp_value=value,
-                    logic=logic)
-                for logic, value in count)
-
-        else:
-            # invalid unknowns
-            if (not count_unknowns and num_unknowns > 0 and
-                    logic in [RELS_ALL_MATCH, RELS_NONE_MATCH]):
-                return False
-
-            # evaluate condition against related items
-            if logic == RELS_COUNT_MATCH:
-                num_items = (
-                    sum(1 for u in known_items if condition(
-                        u, item_map, named_conditions)) + num_unknowns)
-
-                return all(
-                    self._numcomp(
-                        value=num_items,
-                        comp_value=value,
-                        logic=logic)
-                    for logic, value in count)
-
-            return self._relcomp(
-                related_items=known_items,
-                condition=condition,
-                logic=logic,
-                item_map=item_map,
-                named_conditions=named_conditions)
-
-    @staticmethod
-    def _strcomp(value, comp_value, logic):
-        """
-        Evaluates a string against another value according to the given logic.
-
-        :param value: string to evaluate
-        :type  value: basestring
-        :param comp_value: value to evaluate against
-        :type  comp_value: basestring, list[basestring], or regex pattern
-        :param logic: method used to compare the values
-        :type  logic: basestring
-        :return: whether the string matched the comparison value
-        :rtype: bool
-        """
-        if logic == STR_CONTAINS:
-            return comp_value in value
-
-        if logic == STR_DOES_NOT_CONTAIN:
-            return comp_value not in value
-
-        if logic == STR_IS:
-            return value == comp_value
-
-        if logic == STR_IS_NOT:
-            return value != comp_value
-
-        if logic == STR_IN:
-            return value in comp_value
-
-        if logic == STR_NOT_IN:
-            return value not in comp_value
-
-        if logic == STR_MATCHES:
-            return comp_value.match(value) is not None
-
-        raise InvalidCondition(
-            'Invalid string comparison logic "{}"'.format(logic))
-
-    @staticmethod
-    def _numcomp(value, comp_value, logic):
-        """
-        Evaluates a number against another value according to the given logic.
-
-        :param value: number to evaluate
-        :type  value: int or float
-        :param comp_value: value to evaluate against
-        :type  comp_value: int, float, or list[int or float]
-        :param logic: method used to compare the values
-        :type  logic: basestring
-        :return: whether the number matched the comparison value
-        :rtype: bool
-        """
-        if logic == NUM_IS:
-            return value == comp_value
-
-        if logic == NUM_IS_NOT:
-            return value != comp_value
-
-        if logic == NUM_IN:
-            return value in comp_value
-
-        if logic == NUM_NOT_IN:
-            return value not in comp_value
-
-        if logic == NUM_GREATER_THAN:
-            return value > comp_value
-
-        if logic == NUM_GREATER_THAN_EQ:
-            return value >= comp_value
-
-        if logic == NUM_LESS_THAN:
-            return value < comp_value
-
-        if logic == NUM_LESS_THAN_EQ:
-            return value <= comp_value
-
-        raise InvalidCondition(
-            'Invalid number comparison logic "{}"'.format(logic))
-
-    @staticmethod
-    def _relcomp(related_items, condition, logic, item_map, named_conditions):
-        """
-        Evaluates related items against a condition according to the given
-        logic.
-
-        :param related_items: related items to evaluate
-        :type  related_items: list[dict]
-        :param condition: condition to evaluate against
-        :type  condition: Condition
-        :param logic: method used to combine the condition evaluations for the
-                      whole item group
-        :type  logic: basestring
-        :param item_map: map of project IDs to Jama item data
-        :type  item_map: dict{basestring:dict}
-        :param named_conditions: map of condition names to conditions
-        :type  named_conditions: dict{basestring:Condition}
-        :return: whether the related items matched the condition
-        :rtype: bool
-        """
-        if logic == RELS_ALL_MATCH:
-            return all(
-                condition(u, item_map, named_conditions)
-                for u in related_items)
-
-        if logic == RELS_NONE_MATCH:
-            return all(
-                not condition(u, item_map, named_conditions)
-                for u in related_items)
-
-        raise InvalidCondition(
-            'Invalid relationship comparison logic "{}"'.format(logic))
-
-
-class ConditionGroup(object):
-    """Group of conditions to filter Jama items"""
-    def __init__(self, condition):
-        """
-        Constructor called in instantiation.  Creates a condition group which
-        can be used to determine whether a Jama item should be filtered
-        according to multiple conditions.
-
-        :param condition: condition group logic
-        :type  condition: dict
-        """
-        self.type = condition.get(GROUP_TYPE)
-        self.group_logic, self.conditions = dict_get_first(
-            condition, [GROUP_ALL, GROUP_ANY])
-
-        if self.type is None and len(self.conditions) == 0:
-            raise InvalidCondition(
-                'Condition group must specify a type and/or group of '
-                'conditions')
-
-    def __call__(self, item, item_map, named_conditions):
-        """
-        Determines whether or not a Jama item matches the condition group logic.
-
-        :param item: Jama item data
-        :type  item: dict
-        :param item_map: map of project IDs to Jama item data
-        :type  item_map: dict{basestring:dict}
-        :param named_conditions: map of condition names to conditions
-        :type  named_conditions: dict{basestring:Condition}
-        :return: whether the item matches the condition group logic
-        :rtype: bool
-        """
-        if self.type is not None:
-            if item['object_type'] not in self.type:
-                return False
-
-        if self.conditions is None:
-            return True
-
-        conditions = []
-        for condition in self.conditions:
-            if isinstance(condition, basestring):
-                named_condition = named_conditions.get(condition)
-                if named_condition is None:
-                    raise InvalidCondition(
-                        'Missing condition with name "{}"'.format(condition))
-
-                condition = named_condition
-
-            conditions.append(condition)
-
-        if self.group_logic == GROUP_ALL:
-            return all(
-                condition(item, item_map, named_conditions)
-                for condition in conditions)
-
-        if self.group_logic == GROUP_ANY:
-            return any(
-                condition(item, item_map, named_conditions)
-                for condition in conditions)
-
-        return True
-
-
-class JamaFilter(object):
-    """Filter used to filter sets of Jama items"""
-    def __init__(self, conditions):
-        """
-        Constructor called in instantiation.  Creates a filter which can
-        determine what items from a set of Jama items match nested condition
-        logic.
-
-        :param conditions: nested conditions logic
-        :type  conditions: dict
-        """
-        self.main_condition = conditions.pop('main')
-        self.named_conditions = conditions
-
-    def __call__(self, items):
-        """
-        Filters items according to the conditions.
-
-        :param items: Jama item data
-        :type  items: list[dict]
-        :return: all Jama items that matched the filter conditions
-        :rtype: list[dict]
-        """
-        item_map = {item['project_id']: item for item in items}
-        return [
-            item for item in items
-            if self.main_condition(item, item_map, self.named_conditions)]
-
-    @classmethod
-    def load(cls, file_handler):
-        """
-        Instantiates a filter based on condition logic from a YAML file.
-
-        :param file_handler: handle to a YAML file which describes Jama filter
-                             conditions
-        :type  file_handler: file
-        :return: a Jama filter based on the conditions in the file
-        :rtype: JamaFilter
-        """
-        logging.debug('Reading filter...')
-        conditions = yaml.safe_load(file_handler)
-
-        logging.debug('Validating filter...')
-        conditions = FILTER_SCHEMA(conditions)
-
-        logging.debug('Parsing filter...')
-        return cls(conditions)
-
-
-def parse_jama_reports(reports_path):
-    """
-    Parses a trace data report generated from Jama (or a directory of trace data
-    reports) and collects the item data as dictionaries.
-
-    :param reports_path: path to the trace data report(s)
-    :type  reports_path: basestring
-    :return: parsed Jama item data
-    :rtype: list[dict]
-    """
-    logging.info('Parsing Jama reports in "{}"...'.format(reports_path))
-    jama_data, err = execute.communicate(
-        command='{bin} -p {path}'.format(
-            bin=JAMA_PARSER_BIN,
-            path=reports_path),
-        shell=True)
-
-    logging.info('Validating data from Jama reports...')
-    return DATA_SCHEMA(json.loads(jama_data))
-
-
-def filter_jama_data(jama_data, jama_filter):
-    """
-    Filters Jama items based.
-
-    :param jama_data: Jama item data or path to the trace data report(s)
-    :type  jama_data: list[dict] or basestring
-    :param jama_filter: Jama filter, nested condition map, or path to a filter
-                        file
-    :type  jama_filter: JamaFilter, dict{basestring:dict}, basestring
-    :return: filtered Jama items
-    :rtype: list[dict]
-    """
-    if isinstance(jama_data, basestring):
-        jama_data = parse_jama_reports(jama_data)
-
-    if isinstance(jama_filter, basestring):
-        logging.info('Creating filter from "{}"...'.format(jama_filter))
-        with open(jama_filter, 'r') as f:
-            jama_filter = JamaFilter.load(f)
-
-    elif isinstance(jama_filter, dict):
-        jama_filter = JamaFilter(jama_filter)
-
-    return jama_filter(jama_data)
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility functions for reading and filtering Jama item trace data reports.
+"""
+import datetime
+import functools
+import json
+import logging
+import multiprocessing
+import operator
+import os
+import re
+from timeit import default_timer
+
+import voluptuous as vol
+import yaml
+from dateutil import parser as date_parser
+
+try:
+    import numpy as np
+
+except ImportError:
+    # items are only filtered item by item
+    np = None
+
+import execute
+import jama_html
+from constants import JAMA_PARSER_BIN
+from dictutils import dict_get_first
+from jama_index import JamaItemIndex
+from jama_store import JamaItemStore
+from strings import plainstr
+
+
+# matches the ISO 8601 timestamps in Jama reports
+ISO_DATE_RE = re.compile(
+    r'(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:\.(\d{1,6}))?\Z')
+
+# matches ISO 8601 dates, e.g. in filters
+ISO_DAY_RE = re.compile(r'(\d{4})-(\d\d)-(\d\d)\Z')
+
+
+class DateCoercer(object):
+    """
+    Parses dates, taking a fast path for the ISO 8601 formats of Jama reports
+    and filters and falling back to dateutil for other formats.  Parsed dates
+    are cached, since reports repeat many of their timestamps.
+    """
+    def __init__(self, max_size=100000):
+        """
+        Constructor called in instantiation.  Creates a date parser.
+
+        :param max_size: maximum number of cached dates
+        :type  max_size: int
+        """
+        object.__init__(self)
+        self._max_size = max_size
+        self._cache = {}
+
+    def __call__(self, value):
+        """
+        Parses a date.
+
+        :param value: date string
+        :type  value: basestring
+        :return: parsed date
+        :rtype: datetime.datetime
+        :raises ValueError: if the date is invalid
+        """
+        try:
+            return self._cache[value]
+
+        except KeyError:
+            pass
+
+        date = self.parse(value)
+        if len(self._cache) >= self._max_size:
+            self._cache.clear()
+
+        self._cache[value] = date
+        return date
+
+    @staticmethod
+    def parse(value):
+        """
+        Parses a date without caching it.
+
+        :param value: date string
+        :type  value: basestring
+        :return: parsed date
+        :rtype: datetime.datetime
+        :raises ValueError: if the date is invalid
+        """
+        match = ISO_DATE_RE.match(value)
+        if match is not None:
+            year, month, day, hour, minute, second, fraction = match.groups()
+            return datetime.datetime(
+                int(year), int(month), int(day), int(hour), int(minute),
+                int(second), int(fraction.ljust(6, '0')) if fraction else 0)
+
+        match = ISO_DAY_RE.match(value)
+        if match is not None:
+            year, month, day = match.groups()
+            return datetime.datetime(int(year), int(month), int(day))
+
+        return date_parser.parse(value)
+
+
+# parses the dates of Jama reports and filters
+parse_date = DateCoercer()
+
+# schema for verifying the structure of a Jama item
+ITEM_SCHEMA = vol.Schema({
+    vol.Required('downstream'): [{
+        vol.Required('global_id'): plainstr,
+        vol.Required('project_id'): plainstr,
+        vol.Required('type'): plainstr,
+        vol.Required('project'): plainstr,
+        vol.Required('name'): plainstr
+    }],
+    vol.Required('fields'): vol.All(
+        dict,
+        lambda v: {plainstr(k): plainstr(x) for k, x in v.iteritems()}),
+    vol.Required('location'): [plainstr],
+    vol.Required('object_created'): vol.All(plainstr, parse_date),
+    vol.Required('object_modified'): vol.All(plainstr, parse_date),
+    vol.Required('object_type'): plainstr,
+    vol.Required('project_id'): plainstr,
+    vol.Required('report_path'): plainstr,
+    vol.Required('tags'): [plainstr],
+    vol.Required('title'): plainstr,
+    vol.Required('upstream'): [{
+        vol.Required('global_id'): plainstr,
+        vol.Required('project_id'): plainstr,
+        vol.Required('type'): plainstr,
+        vol.Required('project'): plainstr,
+        vol.Required('name'): plainstr
+    }]
+})
+
+# schema for verifying the Jama data structure
+DATA_SCHEMA = vol.Schema([ITEM_SCHEMA])
+
+# keys of a Jama item
+ITEM_KEYS = frozenset([
+    'downstream', 'fields', 'location', 'object_created', 'object_modified',
+    'object_type', 'project_id', 'report_path', 'tags', 'title', 'upstream'])
+
+# keys of a Jama item relationship
+RELATIONSHIP_KEYS = frozenset([
+    'global_id', 'project_id', 'type', 'project', 'name'])
+
+# matches whitespace and separators between the items in a stream of Jama data,
+# which is either a JSON array of items or JSON lines
+SEPARATOR_RE = re.compile(r'[\s,\[\]]*')
+
+# matches unescaped path separators in Jama location strings
+LOCATION_RE = re.compile(r'(?<!\\)/')
+
+
+def validate_item(item):
+    """
+    Validates the structure of a Jama item and coerces its values, with the
+    same result as ITEM_SCHEMA.  Items with the expected structure are coerced
+    directly; anything else is validated with ITEM_SCHEMA, so errors are the
+    same as well.
+
+    :param item: Jama item data
+    :type  item: dict
+    :return: validated Jama item data
+    :rtype: dict
+    :raises vol.Invalid: if the item is invalid
+    """
+    try:
+        return _coerce_item(item)
+
+    except (TypeError, ValueError):
+        return ITEM_SCHEMA(item)
+
+
+def _coerce_item(item):
+    """
+    Coerces the values of a Jama item with the expected structure.
+
+    :param item: Jama item data
+    :type  item: dict
+    :return: validated Jama item data
+    :rtype: dict
+    :raises TypeError: if the item does not have the expected structure
+    :raises ValueError: if a date is invalid
+    """
+    if not isinstance(item, dict) or item.viewkeys() != ITEM_KEYS:
+        raise TypeError('Unexpected item structure')
+
+    return {k: ITEM_COERCIONS[k](v) for k, v in item.iteritems()}
+
+
+def _coerce_fields(fields):
+    """
+    Coerces the values of Jama item fields.
+
+    :param fields: Jama item fields
+    :type  fields: dict
+    :return: validated Jama item fields
+    :rtype: dict{str:str}
+    :raises TypeError: if the fields are not a dictionary
+    """
+    if not isinstance(fields, dict):
+        raise TypeError('Unexpected fields structure')
+
+    return {plainstr(k): plainstr(v) for k, v in fields.iteritems()}
+
+
+def _coerce_strings(values):
+    """
+    Coerces a list of strings.
+
+    :param values: strings
+    :type  values: list
+    :return: plain strings
+    :rtype: list[str]
+    :raises TypeError: if the values are not a list
+    """
+    if not isinstance(values, list):
+        raise TypeError('Unexpected list structure')
+
+    return [plainstr(v) for v in values]
+
+
+def _coerce_relationships(relationships):
+    """
+    Coerces the values of Jama item relationships with the expected structure.
+
+    :param relationships: Jama item relationships
+    :type  relationships: list[dict]
+    :return: validated Jama item relationships
+    :rtype: list[dict]
+    :raises TypeError: if a relationship does not have the expected structure
+    """
+    if not isinstance(relationships, list):
+        raise TypeError('Unexpected relationships structure')
+
+    result = []
+    for relationship in relationships:
+        if (not isinstance(relationship, dict) or
+                relationship.viewkeys() != RELATIONSHIP_KEYS):
+            raise TypeError('Unexpected relationship structure')
+
+        result.append(
+            {k: plainstr(v) for k, v in relationship.iteritems()})
+
+    return result
+
+
+# coerces the values of a Jama item by key
+ITEM_COERCIONS = {
+    'downstream': _coerce_relationships,
+    'fields': _coerce_fields,
+    'location': _coerce_strings,
+    'object_created': lambda v: parse_date(plainstr(v)),
+    'object_modified': lambda v: parse_date(plainstr(v)),
+    'object_type': plainstr,
+    'project_id': plainstr,
+    'report_path': plainstr,
+    'tags': _coerce_strings,
+    'title': plainstr,
+    'upstream': _coerce_relationships}
+
+
+def _location(v):
+    """Location string validator"""
+    return [
+        x.replace('\\/', '/').replace('\\\\', '\\')
+        for x in LOCATION_RE.split(v)]
+
+
+def _recursive_conditions(v):
+    """Recursive condition validator"""
+    return vol.Any(
+        vol.All(CONDITION_GROUP_SCHEMA, vol.Coerce(ConditionGroup)),
+        vol.All(CONDITION_SCHEMA, vol.Coerce(Condition)))(v)
+
+
+# schema constants
+STR_CONTAINS = 'contains'
+STR_DOES_NOT_CONTAIN = 'does not contain'
+STR_IS = 'is'
+STR_IS_NOT = 'is not'
+STR_IN = 'in'
+STR_NOT_IN = 'not in'
+STR_MATCHES = 'matches'
+DATE_BEFORE = 'before'
+DATE_AFTER = 'after'
+NUM_IS = 'is'
+NUM_IS_NOT = 'is not'
+NUM_IN = 'in'
+NUM_NOT_IN = 'not in'
+NUM_GREATER_THAN = 'greater than'
+NUM_GREATER_THAN_EQ = 'greater than or equal to'
+NUM_LESS_THAN = 'less than'
+NUM_LESS_THAN_EQ = 'less than or equal to'
+RELS_WITH_TYPE = 'with relationship type'
+RELS_COUNT = 'count'
+RELS_ALL_MATCH = 'all match'
+RELS_COUNT_MATCH = 'count match'
+RELS_NONE_MATCH = 'none match'
+RELS_COUNT_UNKNOWNS = 'count unknowns'
+LOCATION = 'location'
+LOCATION_IS_UNDER = 'is under'
+LOCATION_IS_NOT_UNDER = 'is not under'
+LOCATION_EVERY_NODE = 'every node'
+LOCATION_NO_NODE = 'no node'
+FIELD = 'field'
+FIELD_NAME = 'name'
+FIELD_VALUE = 'value'
+FIELD_REQUIRED = 'required'
+CREATED = 'created'
+MODIFIED = 'modified'
+TAGS = 'tags'
+TAGS_INCLUDE = 'include'
+TAGS_EXCLUDE = 'exclude'
+UPSTREAM_ITEMS = 'upstream items'
+DOWNSTREAM_ITEMS = 'downstream items'
+GROUP_TYPE = 'type'
+GROUP_ALL = 'according to all'
+GROUP_ANY = 'according to any'
+
+# number comparisons by logic, called with the comparison value first
+# (e.g. "greater than" is comp_value < value)
+NUMCOMP_OPERATORS = {
+    NUM_IS: operator.eq,
+    NUM_IS_NOT: operator.ne,
+    NUM_IN: operator.contains,
+    NUM_NOT_IN: lambda comp_value, value: value not in comp_value,
+    NUM_GREATER_THAN: operator.lt,
+    NUM_GREATER_THAN_EQ: operator.le,
+    NUM_LESS_THAN: operator.gt,
+    NUM_LESS_THAN_EQ: operator.ge
+}
+
+# schema for filtering strings
+STRCOMP_SCHEMA = vol.Schema({
+    vol.Exclusive(STR_CONTAINS, 'str_compare'): plainstr,
+    vol.Exclusive(STR_DOES_NOT_CONTAIN, 'str_compare'): plainstr,
+    vol.Exclusive(STR_IS, 'str_compare'): plainstr,
+    vol.Exclusive(STR_IS_NOT, 'str_compare'): plainstr,
+    vol.Exclusive(STR_IN, 'str_compare'): [plainstr],
+    vol.Exclusive(STR_NOT_IN, 'str_compare'): [plainstr],
+    vol.Exclusive(STR_MATCHES, 'str_compare'): vol.All(
+        plainstr,
+        lambda v: re.compile(v, re.IGNORECASE))
+}, extra=vol.PREVENT_EXTRA)
+
+# schema for filtering dates
+DATE_SCHEMA = vol.Schema({
+    vol.Optional(DATE_BEFORE): vol.All(plainstr, parse_date),
+    vol.Optional(DATE_AFTER): vol.All(plainstr, parse_date)
+}, extra=vol.PREVENT_EXTRA)
+
+# schema for filtering numbers
+NUMCOMP_SCHEMA = vol.Any(
+    vol.Schema({
+        vol.Exclusive(NUM_IS, 'num_compare'): vol.Coerce(int),
+        vol.Exclusive(NUM_IS_NOT, 'num_compare'): vol.Coerce(int),
+        vol.Exclusive(NUM_IN, 'num_compare'): [vol.Coerce(int)],
+        vol.Exclusive(NUM_NOT_IN, 'num_compare'): [vol.Coerce(int)]
+    }, extra=vol.PREVENT_EXTRA),
+    vol.Schema({
+        vol.Exclusive(NUM_GREATER_THAN, 'gt'): vol.Coerce(int),
+        vol.Exclusive(NUM_GREATER_THAN_EQ, 'gt'): vol.Coerce(int),
+        vol.Exclusive(NUM_LESS_THAN, 'lt'): vol.Coerce(int),
+        vol.Exclusive(NUM_LESS_THAN_EQ, 'lt'): vol.Coerce(int)
+    }, extra=vol.PREVENT_EXTRA))
+
+# schema for filtering relationships
+RELATIONSHIPS_SCHEMA = vol.Schema({
+    vol.Optional(RELS_WITH_TYPE): vol.Any(
+        [plainstr], lambda v: [plainstr(v)]),
+    vol.Optional(RELS_COUNT): NUMCOMP_SCHEMA,
+    vol.Exclusive(RELS_ALL_MATCH, 'relationship_logic'): plainstr,
+    vol.Exclusive(RELS_COUNT_MATCH, 'relationship_logic'): plainstr,
+    vol.Exclusive(RELS_NONE_MATCH, 'relationship_logic'): plainstr,
+    vol.Optional(RELS_COUNT_UNKNOWNS, default=False): vol.Boolean()
+}, extra=vol.PREVENT_EXTRA)
+
+# schema for filtering items
+CONDITION_SCHEMA = vol.Schema({
+    vol.Exclusive(LOCATION, 'attribute'): vol.Schema({
+        vol.Exclusive(LOCATION_IS_UNDER, 'location_logic'): _location,
+        vol.Exclusive(LOCATION_IS_NOT_UNDER, 'location_logic'): _location,
+        vol.Exclusive(LOCATION_EVERY_NODE, 'location_logic'): STRCOMP_SCHEMA,
+        vol.Exclusive(LOCATION_NO_NODE, 'location_logic'): STRCOMP_SCHEMA
+    }, extra=vol.PREVENT_EXTRA),
+    vol.Exclusive(FIELD, 'attribute'): vol.Schema({
+        vol.Required(FIELD_NAME): plainstr,
+        vol.Optional(FIELD_VALUE): STRCOMP_SCHEMA,
+        vol.Optional(FIELD_REQUIRED, default=True): vol.Coerce(bool)
+    }, extra=vol.PREVENT_EXTRA),
+    vol.Exclusive(CREATED, 'attribute'): DATE_SCHEMA,
+    vol.Exclusive(MODIFIED, 'attribute'): DATE_SCHEMA,
+    vol.Exclusive(TAGS, 'attribute'): vol.Schema({
+        vol.Exclusive(TAGS_INCLUDE, 'tag_logic'): plainstr,
+        vol.Exclusive(TAGS_EXCLUDE, 'tag_logic'): plainstr
+    }, extra=vol.PREVENT_EXTRA),
+    vol.Exclusive(UPSTREAM_ITEMS, 'attribute'): RELATIONSHIPS_SCHEMA,
+    vol.Exclusive(DOWNSTREAM_ITEMS, 'attribute'): RELATIONSHIPS_SCHEMA
+}, extra=vol.PREVENT_EXTRA)
+
+# schema for filtering items with multiple conditions
+CONDITION_GROUP_SCHEMA = vol.Schema({
+    vol.Optional(GROUP_TYPE): vol.Any([plainstr], lambda v: [plainstr(v)]),
+    vol.Exclusive(GROUP_ALL, 'group_logic'): [
+        vol.Any(_recursive_conditions, plainstr)],
+    vol.Exclusive(GROUP_ANY, 'group_logic'): [
+        vol.Any(_recursive_conditions, plainstr)]
+}, extra=vol.PREVENT_EXTRA)
+
+# schema for a top-level filter
+FILTER_SCHEMA = vol.All(
+    dict,
+    vol.Contains('main'),
+    lambda v: {plainstr(k): _recursive_conditions(x) for k, x in v.iteritems()})
+
+
+def _describe_comp(logic, comp_value):
+    """
+    Describes a string comparison.
+
+    :param logic: method used to compare the values
+    :type  logic: basestring
+    :param comp_value: value to evaluate against
+    :type  comp_value: basestring, list[basestring], or regex pattern
+    :return: description of the comparison
+    :rtype: basestring
+    """
+    if isinstance(comp_value, list):
+        comp_value = ', '.join('"{}"'.format(v) for v in comp_value)
+
+    elif hasattr(comp_value, 'pattern'):
+        comp_value = '"{}"'.format(comp_value.pattern)
+
+    else:
+        comp_value = '"{}"'.format(comp_value)
+
+    return '{} {}'.format(logic, comp_value)
+
+
+class InvalidCondition(Exception):
+    """Exception raised when a condition definition is invalid"""
+    pass
+
+
+class Condition(object):
+    """Condition to filter Jama items"""
+    def __init__(self, condition):
+        """
+        Constructor called in instantiation.  Creates a condition which can be
+        used to determine whether a Jama item should be filtered.
+
+        :param condition: condition logic
+        :type  condition: dict
+        """
+        self.location_logic = None
+        self.location_path = None
+        self.field_name = None
+        self.field_logic = None
+        self.field_value = None
+        self.field_required = None
+        self.created_before = None
+        self.created_after = None
+        self.modified_before = None
+        self.modified_after = None
+        self.tags_include = None
+        self.tags_exclude = None
+        self.upstream_type = None
+        self.upstream_count = None
+        self.upstream_logic = None
+        self.upstream_condition = None
+        self.upstream_count_unknowns = None
+        self.downstream_type = None
+        self.downstream_count = None
+        self.downstream_logic = None
+        self.downstream_condition = None
+        self.downstream_count_unknowns = None
+
+        # location
+        location_condition = condition.get(LOCATION)
+        if location_condition is not None:
+            self.location_logic, location_value = dict_get_first(
+                location_condition, [
+                    LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER,
+                    LOCATION_EVERY_NODE, LOCATION_NO_NODE])
+
+            if self.location_logic in [
+                    LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER]:
+                self.location_path = location_value
+                if self.location_logic is None:
+                    raise InvalidCondition('Invalid location path "{}"'.format(
+                        self.location_path))
+
+            else:
+                self.location_node_logic, self.location_node_value = (
+                    dict_get_first(location_value, [
+                        STR_CONTAINS, STR_DOES_NOT_CONTAIN, STR_IS,
+                        STR_IS_NOT, STR_IN, STR_NOT_IN, STR_MATCHES]))
+
+                if any(x is None for x in [
+                        self.location_node_logic, self.location_node_value]):
+                    raise InvalidCondition(
+                        'Missing attribute for "{}" condition'.format(
+                            self.location_logic))
+
+            if self.location_logic is None:
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(LOCATION))
+
+        # field
+        field_condition = condition.get(FIELD)
+        if field_condition is not None:
+            self.field_name = field_condition.get(FIELD_NAME)
+            field_value = field_condition.get(FIELD_VALUE)
+            if field_value is not None:
+                self.field_logic, self.field_value = dict_get_first(
+                    field_value, [
+                        STR_CONTAINS, STR_DOES_NOT_CONTAIN, STR_IS, STR_IS_NOT,
+                        STR_IN, STR_NOT_IN, STR_MATCHES])
+
+            self.field_required = field_condition.get(FIELD_REQUIRED, True)
+            if self.field_name is None:
+                raise InvalidCondition(
+                    'Missing "{attr}" attribute for "{cnd}" condition'.format(
+                        attr=FIELD_NAME, cnd=FIELD))
+
+            if not self.field_required and all(x is None for x in [
+                    self.field_value, self.field_value]):
+                raise InvalidCondition(
+                    'Missing "{attr}" attribute for "{cnd}" condition'.format(
+                        attr=FIELD_VALUE, cnd=FIELD))
+
+        # created
+        created_condition = condition.get(CREATED)
+        if created_condition is not None:
+            self.created_before = created_condition.get(DATE_BEFORE)
+            self.created_after = created_condition.get(DATE_AFTER)
+            if all(x is None for x in [
+                    self.created_before, self.created_after]):
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(CREATED))
+
+        # modified
+        modified_condition = condition.get(MODIFIED)
+        if modified_condition is not None:
+            self.modified_before = modified_condition.get(DATE_BEFORE)
+            self.modified_after = modified_condition.get(DATE_AFTER)
+            if all(x is None for x in [
+                    self.modified_before, self.modified_after]):
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(MODIFIED))
+
+        # tags
+        tags_condition = condition.get(TAGS)
+        if tags_condition is not None:
+            self.tags_include = tags_condition.get(TAGS_INCLUDE)
+            self.tags_exclude = tags_condition.get(TAGS_EXCLUDE)
+            if all(x is None for x in [
+                    self.tags_include, self.tags_exclude]):
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(TAGS))
+
+        # upstream items
+        upstream_condition = condition.get(UPSTREAM_ITEMS)
+        if upstream_condition is not None:
+            self.upstream_type = upstream_condition.get(RELS_WITH_TYPE)
+            count = upstream_condition.get(RELS_COUNT)
+            if count is not None:
+                logic, comp_value = dict_get_first(
+                    count, [NUM_IS, NUM_IS_NOT, NUM_IN, NUM_NOT_IN])
+
+                if logic is not None:
+                    self.upstream_count = [(logic, count[logic])]
+
+                else:
+                    self.upstream_count = []
+                    for logic in [
+                            NUM_GREATER_THAN, NUM_GREATER_THAN_EQ,
+                            NUM_LESS_THAN, NUM_LESS_THAN_EQ]:
+                        if logic in count:
+                            self.upstream_count.append((logic, count[logic]))
+
+                    if len(self.upstream_count) == 0:
+                        raise InvalidCondition(
+                            'Missing sub-attribute of attribute "{attr}" for '
+                            '"{cnd}" condition'.format(
+                                attr=RELS_COUNT, cnd=UPSTREAM_ITEMS))
+
+            self.upstream_logic, self.upstream_condition = dict_get_first(
+                upstream_condition,
+                [RELS_ALL_MATCH, RELS_COUNT_MATCH, RELS_NONE_MATCH])
+
+            self.upstream_count_unknowns = upstream_condition.get(
+                RELS_COUNT_UNKNOWNS, False)
+
+            if all(x is None for x in [
+                    self.upstream_count, self.upstream_condition]):
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(
+                        UPSTREAM_ITEMS))
+
+            if self.upstream_count is None:
+                if self.upstream_logic == RELS_COUNT_MATCH:
+                    raise InvalidCondition(
+                        'Attribute "{attr1}" must be used with attribute '
+                        '"{attr2}"'.format(
+                            attr1=RELS_COUNT, attr2=RELS_COUNT_MATCH))
+
+            elif self.upstream_logic not in [None, RELS_COUNT_MATCH]:
+                raise InvalidCondition(
+                    'Attribute "{attr1}" cannot be combined with attribute '
+                    '"{attr2}"'.format(
+                        attr1=RELS_COUNT, attr2=self.upstream_logic))
+
+        # downstream items
+        downstream_condition = condition.get(DOWNSTREAM_ITEMS)
+        if downstream_condition is not None:
+            self.downstream_type = downstream_condition.get(RELS_WITH_TYPE)
+            count = downstream_condition.get(RELS_COUNT)
+            if count is not None:
+                logic, comp_value = dict_get_first(
+                    count, [NUM_IS, NUM_IS_NOT, NUM_IN, NUM_NOT_IN])
+
+                if logic is not None:
+                    self.downstream_count = [(logic, count[logic])]
+
+                else:
+                    self.downstream_count = []
+                    for logic in [
+                            NUM_GREATER_THAN, NUM_GREATER_THAN_EQ,
+                            NUM_LESS_THAN, NUM_LESS_THAN_EQ]:
+                        if logic in count:
+                            self.downstream_count.append((logic, count[logic]))
+
+                    if len(self.downstream_count) == 0:
+                        raise InvalidCondition(
+                            'Missing sub-attribute of attribute "{attr}" for '
+                            '"{cnd}" condition'.format(
+                                attr=RELS_COUNT, cnd=DOWNSTREAM_ITEMS))
+
+            self.downstream_logic, self.downstream_condition = dict_get_first(
+                downstream_condition,
+                [RELS_ALL_MATCH, RELS_COUNT_MATCH, RELS_NONE_MATCH])
+
+            self.downstream_count_unknowns = downstream_condition.get(
+                RELS_COUNT_UNKNOWNS, False)
+
+            if all(x is None for x in [
+                    self.downstream_count, self.downstream_condition]):
+                raise InvalidCondition(
+                    'Missing attribute for "{}" condition'.format(
+                        DOWNSTREAM_ITEMS))
+
+            if self.downstream_count is None:
+                if self.downstream_logic == RELS_COUNT_MATCH:
+                    raise InvalidCondition(
+                        'Attribute "{attr1}" must be used with attribute '
+                        '"{attr2}"'.format(
+                            attr1=RELS_COUNT, attr2=RELS_COUNT_MATCH))
+
+            elif self.downstream_logic not in [None, RELS_COUNT_MATCH]:
+                raise InvalidCondition(
+                    'Attribute "{attr1}" cannot be combined with attribute '
+                    '"{attr2}"'.format(
+                        attr1=RELS_COUNT, attr2=self.downstream_logic))
+
+    def __call__(self, item, item_map, named_conditions):
+        """
+        Determines whether or not a Jama item matches the condition logic.
+
+        :param item: Jama item data
+        :type  item: dict
+        :param item_map: map of project IDs to Jama item data
+        :type  item_map: dict{basestring:dict}
+        :param named_conditions: map of condition names to conditions
+        :type  named_conditions: dict{basestring:Condition}
+        :return: whether the item matches the condition logic
+        :rtype: bool
+        """
+        # location is under
+        if self.location_logic == LOCATION_IS_UNDER:
+            item_path = item['location'] + [item['title']]
+            if len(item_path) < len(self.location_path):
+                return False
+
+            return all(
+                item_path[i] == node
+                for i, node in enumerate(self.location_path))
+
+        # location is not under
+        if self.location_logic == LOCATION_IS_NOT_UNDER:
+            item_path = item['location'] + [item['title']]
+            if len(item_path) < len(self.location_path):
+                return True
+
+            return not all(
+                item_path[i] == node
+                for i, node in enumerate(self.location_path))
+
+        # location every node
+        if self.location_logic == LOCATION_EVERY_NODE:
+            item_path = item['location'] + [item['title']]
+            return all(
+                self._strcomp(value=node,
+                    comp_value=self.location_node_value,
+                    logic=self.location_node_logic)
+                for node in item_path)
+
+        # location no node
+        if self.location_logic == LOCATION_NO_NODE:
+            item_path = item['location'] + [item['title']]
+            return all(
+                not self._strcomp(value=node,
+                    comp_value=self.location_node_value,
+                    logic=self.location_node_logic)
+                for node in item_path)
+
+        # field
+        if self.field_name is not None:
+            value = item['fields'].get(self.field_name)
+            if value is None:
+                return not self.field_required
+
+            if self.field_logic is None:
+                return True
+
+            return self._strcomp(
+                value=value,
+                comp_value=self.field_value,
+                logic=self.field_logic)
+
+        # created after
+        if (self.created_after is not None and
+                item['object_created'] <= self.created_after):
+            return False
+
+        # created before
+        if (self.created_before is not None and
+                item['object_created'] >= self.created_before):
+            return False
+
+        if any(x is not None for x in [
+                self.created_after, self.created_before]):
+            return True
+
+        # modified after
+        if (self.modified_after is not None and
+                item['object_modified'] <= self.modified_after):
+            return False
+
+        # modified before
+        if (self.modified_before is not None and
+                item['object_modified'] >= self.modified_before):
+            return False
+
+        if any(x is not None for x in [
+                self.modified_after, self.modified_before]):
+            return True
+
+        # tags include
+        if self.tags_include is not None:
+            return self.tags_include in item['tags']
+
+        # tags exclude
+        if self.tags_exclude is not None:
+            return self.tags_exclude not in item['tags']
+
+        # upstream items
+        if any(x is not None for x in [
+                self.upstream_logic, self.upstream_count]):
+            condition = None
+            if self.upstream_condition is not None:
+                condition = named_conditions.get(self.upstream_condition)
+                if condition is None:
+                    raise InvalidCondition(
+                        'Missing condition with name "{}"'.format(
+                            self.upstream_condition))
+
+            return self._evaluate_relationships(
+                relationships=item['upstream'],
+                types=self.upstream_type,
+                logic=self.upstream_logic,
+                count_unknowns=self.upstream_count_unknowns,
+                count=self.upstream_count,
+                condition=condition,
+                item_map=item_map,
+                named_conditions=named_conditions)
+
+        # downstream items
+        if any(x is not None for x in [
+                self.downstream_logic, self.downstream_count]):
+            condition = None
+            if self.downstream_condition is not None:
+                condition = named_conditions.get(self.downstream_condition)
+                if condition is None:
+                    raise InvalidCondition(
+                        'Missing condition with name "{}"'.format(
+                            self.downstream_condition))
+
+            return self._evaluate_relationships(
+                relationships=item['downstream'],
+                types=self.downstream_type,
+                logic=self.downstream_logic,
+                count_unknowns=self.downstream_count_unknowns,
+                count=self.downstream_count,
+                condition=condition,
+                item_map=item_map,
+                named_conditions=named_conditions)
+
+        raise InvalidCondition('No condition logic to evaluate')
+
+    def compile(self, resolve):
+        """
+        Compiles the condition logic into a predicate.  The logic is selected
+        once so that evaluating the predicate is equivalent to calling the
+        condition without re-examining its attributes for every item.
+
+        :param resolve: function which returns the compiled predicate of a
+                        named condition
+        :type  resolve: callable
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        # location
+        if self.location_logic in [LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER]:
+            location_path = list(self.location_path)
+            depth = len(location_path)
+            under = self.location_logic == LOCATION_IS_UNDER
+
+            def location_under(item, item_map, memo):
+                item_path = item['location'] + [item['title']]
+                if len(item_path) < depth:
+                    return not under
+
+                return (item_path[:depth] == location_path) == under
+
+            return location_under
+
+        if self.location_logic in [LOCATION_EVERY_NODE, LOCATION_NO_NODE]:
+            node_match = self._compile_strcomp(
+                comp_value=self.location_node_value,
+                logic=self.location_node_logic)
+            every = self.location_logic == LOCATION_EVERY_NODE
+
+            def location_nodes(item, item_map, memo):
+                for node in item['location']:
+                    if node_match(node) != every:
+                        return False
+
+                return node_match(item['title']) == every
+
+            return location_nodes
+
+        # field
+        if self.field_name is not None:
+            field_name = self.field_name
+            field_required = self.field_required
+            if self.field_logic is None:
+                def field_exists(item, item_map, memo):
+                    if item['fields'].get(field_name) is None:
+                        return not field_required
+
+                    return True
+
+                return field_exists
+
+            value_match = self._compile_strcomp(
+                comp_value=self.field_value,
+                logic=self.field_logic)
+
+            def field(item, item_map, memo):
+                value = item['fields'].get(field_name)
+                if value is None:
+                    return not field_required
+
+                return value_match(value)
+
+            return field
+
+        # created and modified
+        for key, after, before in [
+                ('object_created', self.created_after, self.created_before),
+                ('object_modified', self.modified_after, self.modified_before)]:
+            if after is None and before is None:
+                continue
+
+            def date(
+                    item, item_map, memo, key=key, after=after, before=before):
+                value = item[key]
+                if after is not None and value <= after:
+                    return False
+
+                return before is None or value < before
+
+            return date
+
+        # tags
+        if self.tags_include is not None:
+            tags_include = self.tags_include
+            return lambda item, item_map, memo: tags_include in item['tags']
+
+        if self.tags_exclude is not None:
+            tags_exclude = self.tags_exclude
+            return lambda item, item_map, memo: tags_exclude not in item['tags']
+
+        # upstream items
+        if any(x is not None for x in [
+                self.upstream_logic, self.upstream_count]):
+            return self._compile_relationships(
+                key='upstream',
+                types=self.upstream_type,
+                logic=self.upstream_logic,
+                count_unknowns=self.upstream_count_unknowns,
+                count=self.upstream_count,
+                condition=self.upstream_condition,
+                resolve=resolve)
+
+        # downstream items
+        if any(x is not None for x in [
+                self.downstream_logic, self.downstream_count]):
+            return self._compile_relationships(
+                key='downstream',
+                types=self.downstream_type,
+                logic=self.downstream_logic,
+                count_unknowns=self.downstream_count_unknowns,
+                count=self.downstream_count,
+                condition=self.downstream_condition,
+                resolve=resolve)
+
+        raise InvalidCondition('No condition logic to evaluate')
+
+    def _compile_relationships(
+            self, key, types, logic, count_unknowns, count, condition,
+            resolve):
+        """
+        Compiles relationship condition logic into a predicate.  The
+        predicate is equivalent to `_evaluate_relationships`.
+
+        :param key: Jama item key of the relationships to evaluate
+        :type  key: basestring
+        :param types: relationship types to consider
+        :type  types: list[basestring]
+        :param logic: logic to determine how the relationships are evaluated
+                      against the condition
+        :type  logic: basestring
+        :param count_unknowns: whether relationships to items which are not in
+                               the item map are counted
+        :type  count_unknowns: bool
+        :param count: number comparison conditions used to evaluate the
+                      relationship count against
+        :type  count: list[tuple(basestring, int)]
+        :param condition: name of the nested condition to evaluate the
+                          relationships against
+        :type  condition: basestring
+        :param resolve: function which returns the compiled predicate of a
+                        named condition
+        :type  resolve: callable
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        if types is not None:
+            types = frozenset(types)
+
+        def related(item, item_map):
+            known_items = []
+            num_unknowns = 0
+            for relationship in item[key]:
+                if (types is not None and
+                        relationship['type'] not in types):
+                    continue
+
+                related_item = item_map.get(relationship['project_id'])
+                if related_item is None:
+                    num_unknowns += 1
+                    continue
+
+                known_items.append(related_item)
+
+            return known_items, num_unknowns
+
+        if count is not None:
+            count_match = self._compile_numcomps(count)
+
+        if logic is None:
+            # just count
+            def count_related(item, item_map, memo):
+                known_items, num_unknowns = related(item, item_map)
+                if count_unknowns:
+                    return count_match(len(known_items) + num_unknowns)
+
+                return count_match(len(known_items))
+
+            return count_related
+
+        predicate = resolve(condition, related=True)
+
+        if logic == RELS_COUNT_MATCH:
+            def count_matching(item, item_map, memo):
+                known_items, num_unknowns = related(item, item_map)
+                num_items = num_unknowns
+                for u in known_items:
+                    if predicate(u, item_map, memo):
+                        num_items += 1
+
+                return count_match(num_items)
+
+            return count_matching
+
+        if logic not in [RELS_ALL_MATCH, RELS_NONE_MATCH]:
+            raise InvalidCondition(
+                'Invalid relationship comparison logic "{}"'.format(logic))
+
+        expected = logic == RELS_ALL_MATCH
+
+        def all_matching(item, item_map, memo):
+            known_items, num_unknowns = related(item, item_map)
+            if not count_unknowns and num_unknowns > 0:
+                return False
+
+            for u in known_items:
+                if predicate(u, item_map, memo) != expected:
+                    return False
+
+            return True
+
+        return all_matching
+
+    @staticmethod
+    def _compile_strcomp(comp_value, logic):
+        """
+        Compiles a string comparison into a predicate.  The predicate is
+        equivalent to `_strcomp`.
+
+        :param comp_value: value to evaluate against
+        :type  comp_value: basestring, list[basestring], or regex pattern
+        :param logic: method used to compare the values
+        :type  logic: basestring
+        :return: predicate called with the string to evaluate
+        :rtype: callable
+        """
+        if logic == STR_CONTAINS:
+            return lambda value: comp_value in value
+
+        if logic == STR_DOES_NOT_CONTAIN:
+            return lambda value: comp_value not in value
+
+        if logic == STR_IS:
+            return lambda value: value == comp_value
+
+        if logic == STR_IS_NOT:
+            return lambda value: value != comp_value
+
+        if logic == STR_IN:
+            return frozenset(comp_value).__contains__
+
+        if logic == STR_NOT_IN:
+            comp_values = frozenset(comp_value)
+            return lambda value: value not in comp_values
+
+        if logic == STR_MATCHES:
+            match = comp_value.match
+            return lambda value: match(value) is not None
+
+        raise InvalidCondition(
+            'Invalid string comparison logic "{}"'.format(logic))
+
+    @staticmethod
+    def _compile_numcomps(comparisons):
+        """
+        Compiles number comparisons into a single predicate which matches
+        when all of the comparisons match.  The predicate is equivalent to
+        `_numcomp` applied to each comparison.
+
+        :param comparisons: number comparison conditions
+        :type  comparisons: list[tuple(basestring, int)]
+        :return: predicate called with the number to evaluate
+        :rtype: callable
+        """
+        predicates = []
+        for logic, comp_value in comparisons:
+            if logic in [NUM_IN, NUM_NOT_IN]:
+                comp_value = frozenset(comp_value)
+
+            comparison = NUMCOMP_OPERATORS.get(logic)
+            if comparison is None:
+                raise InvalidCondition(
+                    'Invalid number comparison logic "{}"'.format(logic))
+
+            predicates.append(functools.partial(comparison, comp_value))
+
+        if len(predicates) == 1:
+            return predicates[0]
+
+        return lambda value: all(p(value) for p in predicates)
+
+    def mask(self, store):
+        """
+        Evaluates the condition logic against all items of a columnar store at
+        once.  Relationship logic is not evaluated as a vector; it has to be
+        evaluated item by item with the compiled predicate.
+
+        :param store: columnar Jama item data
+        :type  store: JamaItemStore
+        :return: whether each item matches the condition logic, or None if the
+                 condition logic cannot be evaluated as a vector
+        :rtype: numpy.ndarray[bool]
+        """
+        # location
+        if self.location_logic == LOCATION_IS_UNDER:
+            return store.under(self.location_path)
+
+        if self.location_logic == LOCATION_IS_NOT_UNDER:
+            return ~store.under(self.location_path)
+
+        if self.location_logic in [LOCATION_EVERY_NODE, LOCATION_NO_NODE]:
+            node_match = self._compile_strcomp(
+                comp_value=self.location_node_value,
+                logic=self.location_node_logic)
+            if self.location_logic == LOCATION_EVERY_NODE:
+                return store.every_node(node_match)
+
+            return store.every_node(lambda node: not node_match(node))
+
+        # field
+        if self.field_name is not None:
+            value_match = lambda value: True
+            if self.field_logic is not None:
+                value_match = self._compile_strcomp(
+                    comp_value=self.field_value,
+                    logic=self.field_logic)
+
+            return store.field(
+                self.field_name, value_match, not self.field_required)
+
+        # created and modified
+        for key, after, before in [
+                ('object_created', self.created_after, self.created_before),
+                ('object_modified', self.modified_after, self.modified_before)]:
+            if after is None and before is None:
+                continue
+
+            return store.between(key, after, before)
+
+        # tags
+        if self.tags_include is not None:
+            return store.tagged(self.tags_include)
+
+        if self.tags_exclude is not None:
+            return ~store.tagged(self.tags_exclude)
+
+        return None
+
+    def rows(self, index):
+        """
+        Looks up the items which match the condition logic in the indexes of
+        an item index.  Only location (is under), field (is, in), created,
+        modified and tags (include) logic is indexed.
+
+        :param index: indexed Jama item data
+        :type  index: JamaItemIndex
+        :return: sorted rows of the items which match the condition logic, or
+                 None if the condition logic is not indexed
+        :rtype: list[int]
+        """
+        if self.location_logic is not None:
+            if self.location_logic == LOCATION_IS_UNDER:
+                return index.under(self.location_path)
+
+            return None
+
+        if self.field_name is not None:
+            if self.field_required and self.field_logic in [STR_IS, STR_IN]:
+                values = self.field_value
+                if self.field_logic == STR_IS:
+                    values = [values]
+
+                return index.field(self.field_name, values)
+
+            return None
+
+        for key, after, before in [
+                ('object_created', self.created_after, self.created_before),
+                ('object_modified', self.modified_after, self.modified_before)]:
+            if after is not None or before is not None:
+                return index.between(key, after, before)
+
+        if self.tags_include is not None:
+            return index.tagged(self.tags_include)
+
+        return None
+
+    def describe(self):
+        """
+        Describes the condition logic, e.g. for profiles.
+
+        :return: description of the condition logic
+        :rtype: basestring
+        """
+        if self.location_logic in [LOCATION_IS_UNDER, LOCATION_IS_NOT_UNDER]:
+            return '{attr} {logic} "{path}"'.format(
+                attr=LOCATION,
+                logic=self.location_logic,
+                path='/'.join(self.location_path))
+
+        if self.location_logic is not None:
+            return '{attr} {logic} {comp}'.format(
+                attr=LOCATION,
+                logic=self.location_logic,
+                comp=_describe_comp(
+                    self.location_node_logic, self.location_node_value))
+
+        if self.field_name is not None:
+            if self.field_logic is None:
+                comp = 'exists'
+
+            else:
+                comp = _describe_comp(self.field_logic, self.field_value)
+
+            return '{attr} "{name}" {comp}{optional}'.format(
+                attr=FIELD,
+                name=self.field_name,
+                comp=comp,
+                optional='' if self.field_required else ' (if set)')
+
+        for attr, after, before in [
+                (CREATED, self.created_after, self.created_before),
+                (MODIFIED, self.modified_after, self.modified_before)]:
+            if after is None and before is None:
+                continue
+
+            return ' '.join([attr] + [
+                '{} {}'.format(logic, date.isoformat())
+                for logic, date in [(DATE_AFTER, after), (DATE_BEFORE, before)]
+                if date is not None])
+
+        if self.tags_include is not None:
+            return '{} {} "{}"'.format(TAGS, TAGS_INCLUDE, self.tags_include)
+
+        if self.tags_exclude is not None:
+            return '{} {} "{}"'.format(TAGS, TAGS_EXCLUDE, self.tags_exclude)
+
+        for attr, types, logic, condition, count in [
+                (UPSTREAM_ITEMS, self.upstream_type, self.upstream_logic,
+                 self.upstream_condition, self.upstream_count),
+                (DOWNSTREAM_ITEMS, self.downstream_type, self.downstream_logic,
+                 self.downstream_condition, self.downstream_count)]:
+            if logic is None and count is None:
+                continue
+
+            parts = [attr]
+            if types is not None:
+                parts.append('{} {}'.format(RELS_WITH_TYPE, ', '.join(types)))
+
+            if logic is not None:
+                parts.append('{} "{}"'.format(logic, condition))
+
+            for count_logic, count_value in count or []:
+                parts.append('{} {} {}'.format(
+                    RELS_COUNT, count_logic, count_value))
+
+            return ' '.join(parts)
+
+        return 'no condition logic'
+
+    def is_relationship(self):
+        """
+        Determines whether the condition evaluates relationship logic.
+
+        :return: whether the condition evaluates relationship logic
+        :rtype: bool
+        """
+        return any(x is not None for x in [
+            self.upstream_logic, self.upstream_count,
+            self.downstream_logic, self.downstream_count])
+
+    def _evaluate_relationships(
+            self, relationships, types, logic, count_unknowns, count, condition,
+            item_map, named_conditions):
+        """
+        Determines whether or not a Jama item's relationships match the
+        relationship condition logic.
+
+        :param relationships: Jama item relationships to evaluate
+        :type  relationships: list[dict]
+        :param types: relationship types to consider
+        :type  types: list[basestring]
+        :param logic: logic to determine how the relationships are evaluated
+                      against the condition
+        :type  logic: basestring
+        :param count_unknowns:
+        :type  count_unknowns: bool
+        :param count: number comparison conditions used to evaluate the
+                      relationship count against
+        :type  count: dict{basestring: int}
+        :param condition: nested condition to evaluate the relationships against
+        :type  condition: Condition
+        :param item_map: map of project IDs to Jama item data
+        :type  item_map: dict{basestring:dict}
+        :param named_conditions: map of condition names to conditions
+        :type  named_conditions: dict{basestring:Condition}
+        :return: whether the relationships match the condition logic
+        :rtype: bool
+        """
+        # collect known items
+        known_items = []
+        num_unknowns = 0
+        for relationship in relationships:
+            if (types is not None and
+                    relationship['type'] not in types):
+                continue
+
+            related_item = item_map.get(relationship['project_id'])
+            if related_item is None:
+                num_unknowns += 1
+                continue
+
+            known_items.append(related_item)
+
+        if logic is None:
+            # just count
+            num_related_items = len(known_items)
+            if count_unknowns:
+                num_related_items += num_unknowns
+
+            return all(
+                self._numcomp(
+                    value=num_related_items,
+                    comp_value=value,
+                    logic=logic)
+                for logic, value in count)
+
+        else:
+            # invalid unknowns
+            if (not count_unknowns and num_unknowns > 0 and
+                    logic in [RELS_ALL_MATCH, RELS_NONE_MATCH]):
+                return False
+
+            # evaluate condition against related items
+            if logic == RELS_COUNT_MATCH:
+                num_items = (
+                    sum(1 for u in known_items if condition(
+                        u, item_map, named_conditions)) + num_unknowns)
+
+                return all(
+                    self._numcomp(
+                        value=num_items,
+                        comp_value=value,
+                        logic=logic)
+                    for logic, value in count)
+
+            return self._relcomp(
+                related_items=known_items,
+                condition=condition,
+                logic=logic,
+                item_map=item_map,
+                named_conditions=named_conditions)
+
+    @staticmethod
+    def _strcomp(value, comp_value, logic):
+        """
+        Evaluates a string against another value according to the given logic.
+
+        :param value: string to evaluate
+        :type  value: basestring
+        :param comp_value: value to evaluate against
+        :type  comp_value: basestring, list[basestring], or regex pattern
+        :param logic: method used to compare the values
+        :type  logic: basestring
+        :return: whether the string matched the comparison value
+        :rtype: bool
+        """
+        if logic == STR_CONTAINS:
+            return comp_value in value
+
+        if logic == STR_DOES_NOT_CONTAIN:
+            return comp_value not in value
+
+        if logic == STR_IS:
+            return value == comp_value
+
+        if logic == STR_IS_NOT:
+            return value != comp_value
+
+        if logic == STR_IN:
+            return value in comp_value
+
+        if logic == STR_NOT_IN:
+            return value not in comp_value
+
+        if logic == STR_MATCHES:
+            return comp_value.match(value) is not None
+
+        raise InvalidCondition(
+            'Invalid string comparison logic "{}"'.format(logic))
+
+    @staticmethod
+    def _numcomp(value, comp_value, logic):
+        """
+        Evaluates a number against another value according to the given logic.
+
+        :param value: number to evaluate
+        :type  value: int or float
+        :param comp_value: value to evaluate against
+        :type  comp_value: int, float, or list[int or float]
+        :param logic: method used to compare the values
+        :type  logic: basestring
+        :return: whether the number matched the comparison value
+        :rtype: bool
+        """
+        if logic == NUM_IS:
+            return value == comp_value
+
+        if logic == NUM_IS_NOT:
+            return value != comp_value
+
+        if logic == NUM_IN:
+            return value in comp_value
+
+        if logic == NUM_NOT_IN:
+            return value not in comp_value
+
+        if logic == NUM_GREATER_THAN:
+            return value > comp_value
+
+        if logic == NUM_GREATER_THAN_EQ:
+            return value >= comp_value
+
+        if logic == NUM_LESS_THAN:
+            return value < comp_value
+
+        if logic == NUM_LESS_THAN_EQ:
+            return value <= comp_value
+
+        raise InvalidCondition(
+            'Invalid number comparison logic "{}"'.format(logic))
+
+    @staticmethod
+    def _relcomp(related_items, condition, logic, item_map, named_conditions):
+        """
+        Evaluates related items against a condition according to the given
+        logic.
+
+        :param related_items: related items to evaluate
+        :type  related_items: list[dict]
+        :param condition: condition to evaluate against
+        :type  condition: Condition
+        :param logic: method used to combine the condition evaluations for the
+                      whole item group
+        :type  logic: basestring
+        :param item_map: map of project IDs to Jama item data
+        :type  item_map: dict{basestring:dict}
+        :param named_conditions: map of condition names to conditions
+        :type  named_conditions: dict{basestring:Condition}
+        :return: whether the related items matched the condition
+        :rtype: bool
+        """
+        if logic == RELS_ALL_MATCH:
+            return all(
+                condition(u, item_map, named_conditions)
+                for u in related_items)
+
+        if logic == RELS_NONE_MATCH:
+            return all(
+                not condition(u, item_map, named_conditions)
+                for u in related_items)
+
+        raise InvalidCondition(
+            'Invalid relationship comparison logic "{}"'.format(logic))
+
+
+class ConditionGroup(object):
+    """Group of conditions to filter Jama items"""
+    def __init__(self, condition):
+        """
+        Constructor called in instantiation.  Creates a condition group which
+        can be used to determine whether a Jama item should be filtered
+        according to multiple conditions.
+
+        :param condition: condition group logic
+        :type  condition: dict
+        """
+        self.type = condition.get(GROUP_TYPE)
+        self.group_logic, self.conditions = dict_get_first(
+            condition, [GROUP_ALL, GROUP_ANY])
+
+        if self.type is None and len(self.conditions) == 0:
+            raise InvalidCondition(
+                'Condition group must specify a type and/or group of '
+                'conditions')
+
+    def __call__(self, item, item_map, named_conditions):
+        """
+        Determines whether or not a Jama item matches the condition group logic.
+
+        :param item: Jama item data
+        :type  item: dict
+        :param item_map: map of project IDs to Jama item data
+        :type  item_map: dict{basestring:dict}
+        :param named_conditions: map of condition names to conditions
+        :type  named_conditions: dict{basestring:Condition}
+        :return: whether the item matches the condition group logic
+        :rtype: bool
+        """
+        if self.type is not None:
+            if item['object_type'] not in self.type:
+                return False
+
+        if self.conditions is None:
+            return True
+
+        conditions = []
+        for condition in self.conditions:
+            if isinstance(condition, basestring):
+                named_condition = named_conditions.get(condition)
+                if named_condition is None:
+                    raise InvalidCondition(
+                        'Missing condition with name "{}"'.format(condition))
+
+                condition = named_condition
+
+            conditions.append(condition)
+
+        if self.group_logic == GROUP_ALL:
+            return all(
+                condition(item, item_map, named_conditions)
+                for condition in conditions)
+
+        if self.group_logic == GROUP_ANY:
+            return any(
+                condition(item, item_map, named_conditions)
+                for condition in conditions)
+
+        return True
+
+    def describe(self):
+        """
+        Describes the condition group logic, e.g. for profiles.
+
+        :return: description of the condition group logic
+        :rtype: basestring
+        """
+        parts = []
+        if self.type is not None:
+            parts.append('{} {}'.format(GROUP_TYPE, ', '.join(self.type)))
+
+        if self.conditions is not None and self.group_logic is not None:
+            parts.append(self.group_logic)
+
+        return ' '.join(parts)
+
+    def compile(self, resolve, profile=None):
+        """
+        Compiles the condition group logic into a predicate.  Named conditions
+        are resolved once, when the group is compiled.
+
+        :param resolve: function which returns the compiled predicate of a
+                        named condition
+        :type  resolve: callable
+        :param profile: profile which instruments the predicates of the
+                        conditions in the group
+        :type  profile: FilterProfile
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        types = None
+        if self.type is not None:
+            types = frozenset(self.type)
+
+        if self.conditions is None or self.group_logic not in [
+                GROUP_ALL, GROUP_ANY]:
+            if types is None:
+                return lambda item, item_map, memo: True
+
+            return lambda item, item_map, memo: item['object_type'] in types
+
+        predicates = []
+        for i, condition in enumerate(self.conditions):
+            if isinstance(condition, basestring):
+                predicate = resolve(condition)
+
+            elif isinstance(condition, ConditionGroup):
+                predicate = condition.compile(resolve, profile)
+
+            else:
+                predicate = condition.compile(resolve)
+
+            if profile is not None:
+                predicate = profile.wrap((id(self), i), predicate)
+
+            predicates.append(predicate)
+
+        expected = self.group_logic == GROUP_ALL
+
+        def group(item, item_map, memo):
+            if types is not None and item['object_type'] not in types:
+                return False
+
+            for predicate in predicates:
+                if predicate(item, item_map, memo) != expected:
+                    return not expected
+
+            return expected
+
+        return group
+
+
+class JamaFilter(object):
+    """Filter used to filter sets of Jama items"""
+    def __init__(self, conditions):
+        """
+        Constructor called in instantiation.  Creates a filter which can
+        determine what items from a set of Jama items match nested condition
+        logic.
+
+        :param conditions: nested conditions logic
+        :type  conditions: dict
+        """
+        self.main_condition = conditions.pop('main')
+        self.named_conditions = conditions
+        self.predicates = {}
+        self.predicate = self.compile()
+
+    def __call__(self, items):
+        """
+        Filters items according to the conditions.  Items in a columnar store
+        are filtered with NumPy; building the columns costs about as much as
+        filtering the items one by one, so a store pays off when it is
+        filtered more than once.  The same goes for the items of an item index,
+        which are filtered according to a plan.
+
+        :param items: Jama item data
+        :type  items: list[dict], JamaItemStore or JamaItemIndex
+        :return: all Jama items that matched the filter conditions
+        :rtype: list[dict]
+        """
+        if isinstance(items, JamaItemStore):
+            return items.select(self.mask(items))
+
+        if isinstance(items, JamaItemIndex):
+            return items.select(self.rows(items))
+
+        item_map = {item['project_id']: item for item in items}
+        predicate = self.predicate
+        memo = {}
+        return [item for item in items if predicate(item, item_map, memo)]
+
+    def mask(self, store):
+        """
+        Evaluates the conditions against the items of a columnar store.
+        Conditions are evaluated as NumPy vectors, except for relationship
+        logic which is evaluated item by item on the items that are still
+        candidates.
+
+        :param store: columnar Jama item data
+        :type  store: JamaItemStore
+        :return: whether each item matched the filter conditions
+        :rtype: numpy.ndarray[bool]
+        """
+        candidates = np.ones(store.size, dtype=bool)
+        return self._mask(self.main_condition, store, candidates, {})
+
+    def _mask(self, condition, store, candidates, memo):
+        """
+        Evaluates a condition against the candidate items of a columnar store.
+
+        :param condition: condition, condition group or condition name
+        :type  condition: Condition, ConditionGroup or basestring
+        :param store: columnar Jama item data
+        :type  store: JamaItemStore
+        :param candidates: whether each item has to be evaluated
+        :type  candidates: numpy.ndarray[bool]
+        :param memo: memo of the filter run
+        :type  memo: dict
+        :return: whether each candidate item matched the condition (False for
+                 the other items)
+        :rtype: numpy.ndarray[bool]
+        """
+        if isinstance(condition, basestring):
+            condition = self.named_conditions[condition]
+
+        if isinstance(condition, Condition):
+            mask = condition.mask(store)
+            if mask is not None:
+                return mask & candidates
+
+            # item by item
+            predicate = self._predicate(condition)
+            items = store.items
+            item_map = store.item_map
+            rows = np.flatnonzero(candidates)
+            mask = np.zeros(store.size, dtype=bool)
+            mask[rows] = np.fromiter(
+                (predicate(items[i], item_map, memo) for i in rows),
+                dtype=bool, count=len(rows))
+            return mask
+
+        mask = candidates
+        if condition.type is not None:
+            mask = mask & store.typed(condition.type)
+
+        if condition.conditions is None or condition.group_logic not in [
+                GROUP_ALL, GROUP_ANY]:
+            return mask
+
+        # conditions which evaluate as vectors are evaluated first so that
+        # the others are evaluated on as few items as possible
+        masks = []
+        deferred = []
+        for x in condition.conditions:
+            if isinstance(x, Condition):
+                x_mask = x.mask(store)
+                if x_mask is not None:
+                    masks.append(x_mask)
+                    continue
+
+            deferred.append(x)
+
+        if condition.group_logic == GROUP_ALL:
+            for x_mask in masks:
+                mask = mask & x_mask
+
+            for x in deferred:
+                if not mask.any():
+                    break
+
+                mask = self._mask(x, store, mask, memo)
+
+            return mask
+
+        matched = np.zeros(store.size, dtype=bool)
+        for x_mask in masks:
+            matched |= x_mask
+
+        matched &= mask
+        for x in deferred:
+            remaining = mask & ~matched
+            if not remaining.any():
+                break
+
+            matched |= self._mask(x, store, remaining, memo)
+
+        return matched
+
+    def rows(self, index):
+        """
+        Looks up the items of an item index which match the conditions.  Each
+        condition group is planned so that its most selective indexed
+        condition selects the candidate items and the other conditions are
+        only evaluated against the remaining candidates: indexed conditions
+        first (most selective first), relationship logic last.
+
+        :param index: indexed Jama item data
+        :type  index: JamaItemIndex
+        :return: sorted rows of the items which matched the filter conditions
+        :rtype: list[int]
+        """
+        return self._rows(self.main_condition, index, None, {})
+
+    def _rows(self, condition, index, candidates, memo):
+        """
+        Looks up the candidate items of an item index which match a condition.
+
+        :param condition: condition, condition group or condition name
+        :type  condition: Condition, ConditionGroup or basestring
+        :param index: indexed Jama item data
+        :type  index: JamaItemIndex
+        :param candidates: sorted rows of the items which have to be evaluated,
+                           or None for all items
+        :type  candidates: list[int]
+        :param memo: memo of the filter run
+        :type  memo: dict
+        :return: sorted rows of the candidate items which matched the condition
+        :rtype: list[int]
+        """
+        if isinstance(condition, basestring):
+            condition = self.named_conditions[condition]
+
+        if isinstance(condition, Condition):
+            rows = condition.rows(index)
+            if rows is not None and (
+                    candidates is None or len(rows) <= len(candidates)):
+                return self._intersect(rows, candidates)
+
+            # item by item
+            if candidates is None:
+                candidates = xrange(index.size)
+
+            predicate = self._predicate(condition)
+            items = index.items
+            item_map = index.item_map
+            return [
+                i for i in candidates if predicate(items[i], item_map, memo)]
+
+        conditions = []
+        if condition.conditions is not None and condition.group_logic in [
+                GROUP_ALL, GROUP_ANY]:
+            conditions = condition.conditions
+
+        # plan: indexed conditions by number of rows, then the other
+        # conditions and relationship conditions last
+        indexed = []
+        deferred = []
+        related = []
+        for x in conditions:
+            rows = None
+            if isinstance(x, Condition):
+                rows = x.rows(index)
+
+            if rows is not None:
+                indexed.append((len(rows), len(indexed), x))
+
+            elif isinstance(x, Condition) and x.is_relationship():
+                related.append(x)
+
+            else:
+                deferred.append(x)
+
+        indexed.sort()
+        plan = [x for _, _, x in indexed] + deferred + related
+
+        rows = candidates
+        if condition.type is not None:
+            types = frozenset(condition.type)
+            num_typed = index.count_typed(types)
+            if (condition.group_logic != GROUP_ALL or len(indexed) == 0 or
+                    num_typed <= indexed[0][0]):
+                if rows is None or num_typed <= len(rows):
+                    rows = self._intersect(index.typed(types), rows)
+
+                else:
+                    items = index.items
+                    rows = [i for i in rows if items[i]['object_type'] in types]
+
+            else:
+                # checked after the most selective indexed condition
+                plan.insert(1, types)
+
+        if condition.group_logic == GROUP_ALL:
+            for x in plan:
+                if rows is not None and len(rows) == 0:
+                    break
+
+                if isinstance(x, frozenset):
+                    items = index.items
+                    rows = [i for i in rows if items[i]['object_type'] in x]
+                    continue
+
+                rows = self._rows(x, index, rows, memo)
+
+        elif condition.group_logic == GROUP_ANY:
+            matched = set()
+            remaining = rows
+            for x in plan:
+                if remaining is None and x not in plan[:len(indexed)]:
+                    remaining = [
+                        i for i in xrange(index.size) if i not in matched]
+
+                if remaining is not None and len(remaining) == 0:
+                    break
+
+                found = self._rows(x, index, remaining, memo)
+                matched.update(found)
+                if remaining is not None:
+                    found = set(found)
+                    remaining = [i for i in remaining if i not in found]
+
+            rows = sorted(matched)
+
+        if rows is None:
+            return range(index.size)
+
+        return rows
+
+    def _predicate(self, condition):
+        """
+        Gets (or compiles) the predicate of a condition, used to evaluate it
+        item by item.
+
+        :param condition: condition
+        :type  condition: Condition
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        predicate = self.predicates.get(id(condition))
+        if predicate is None:
+            predicate = condition.compile(self.resolve)
+            self.predicates[id(condition)] = predicate
+
+        return predicate
+
+    @staticmethod
+    def _intersect(rows, candidates):
+        """
+        Intersects sorted rows with candidate rows.
+
+        :param rows: sorted rows
+        :type  rows: list[int]
+        :param candidates: sorted candidate rows, or None for all rows
+        :type  candidates: list[int]
+        :return: sorted rows which are candidates
+        :rtype: list[int]
+        """
+        if candidates is None:
+            return rows
+
+        candidates = set(candidates)
+        return [i for i in rows if i in candidates]
+
+    def compile(self, profile=None):
+        """
+        Compiles the main condition into a predicate.  Named conditions are
+        resolved and compiled once, as they are referenced, so conditions
+        which are never referenced are not compiled.
+
+        Named conditions evaluated against related items are memoized for
+        the filter run, keyed by (condition name, item project ID), so each
+        of them is evaluated at most once per item however many items are
+        related to it.  A named condition which depends on its own result for
+        the same item is invalid.
+
+        :param profile: profile which instruments the predicates of all
+                        conditions; the filter keeps using its own predicates
+        :type  profile: FilterProfile
+        :return: predicate called with a Jama item, the map of project IDs to
+                 Jama item data and the memo of the filter run
+        :rtype: callable
+        """
+        self._check_references()
+        compiled = {}
+        memoized = {}
+
+        def named(name):
+            # the compiled condition is registered before it is compiled so
+            # that conditions which reference themselves through relationships
+            # get the same (forward) reference
+            holder = compiled.get(name)
+            if holder is None:
+                condition = self.named_conditions.get(name)
+                if condition is None:
+                    raise InvalidCondition(
+                        'Missing condition with name "{}"'.format(name))
+
+                holder = []
+                compiled[name] = holder
+                if isinstance(condition, ConditionGroup):
+                    predicate = condition.compile(resolve, profile)
+
+                else:
+                    predicate = condition.compile(resolve)
+
+                if profile is not None:
+                    predicate = profile.wrap(('named', name), predicate)
+
+                holder.append(predicate)
+
+            return holder
+
+        def resolve(name, related=False):
+            if related:
+                predicate = memoized.get(name)
+                if predicate is None:
+                    predicate = self._memoize(name, named(name))
+                    if profile is not None:
+                        predicate = profile.related(name, predicate)
+
+                    memoized[name] = predicate
+
+                return predicate
+
+            holder = named(name)
+            if len(holder) > 0:
+                return holder[0]
+
+            return lambda item, item_map, memo: holder[0](item, item_map, memo)
+
+        if profile is not None:
+            if isinstance(self.main_condition, ConditionGroup):
+                predicate = self.main_condition.compile(resolve, profile)
+
+            else:
+                predicate = self.main_condition.compile(resolve)
+
+            return profile.wrap(('main',), predicate)
+
+        self.resolve = resolve
+        return self.main_condition.compile(resolve)
+
+    @staticmethod
+    def _memoize(name, holder, key=None):
+        """
+        Creates a predicate which memoizes the result of a named condition per
+        item in the memo of the filter run.
+
+        :param name: name of the condition
+        :type  name: basestring
+        :param holder: list which holds the compiled condition once compiled
+        :type  holder: list[callable]
+        :param key: key of the condition in the memo (the name by default)
+        :type  key: hashable
+        :return: memoized predicate
+        :rtype: callable
+        """
+        if key is None:
+            key = name
+
+        def memoized(item, item_map, memo):
+            memo_key = (key, item['project_id'])
+            try:
+                result = memo[memo_key]
+
+            except KeyError:
+                # mark the evaluation in progress to detect cycles
+                memo[memo_key] = None
+                try:
+                    result = holder[0](item, item_map, memo)
+
+                except:
+                    del memo[memo_key]
+                    raise
+
+                memo[memo_key] = result
+                return result
+
+            if result is None:
+                raise InvalidCondition(
+                    'Condition "{cnd}" depends on itself for item '
+                    '"{item}"'.format(cnd=name, item=item['project_id']))
+
+            return result
+
+        return memoized
+
+    def _check_references(self):
+        """
+        Verifies that no named condition references itself through condition
+        groups, which would evaluate it against the same item indefinitely.
+        Every named condition is checked, as named conditions can also be
+        reached through relationships.  References through relationships are
+        evaluated against other items and are checked while filtering.
+
+        :raises InvalidCondition: if a named condition references itself
+        """
+        def references(condition):
+            names = []
+            conditions = [condition]
+            while len(conditions) > 0:
+                condition = conditions.pop()
+                if isinstance(condition, basestring):
+                    names.append(condition)
+
+                elif (isinstance(condition, ConditionGroup) and
+                        condition.conditions is not None):
+                    conditions.extend(condition.conditions)
+
+            return names
+
+        checked = set()
+        for name in sorted(self.named_conditions):
+            if name in checked:
+                continue
+
+            # depth-first search for a path back to a condition on the path
+            path = [name]
+            pending = [iter(references(self.named_conditions.get(name)))]
+            while len(pending) > 0:
+                reference = next(pending[-1], None)
+                if reference is None:
+                    checked.add(path.pop())
+                    pending.pop()
+                    continue
+
+                if reference in path:
+                    raise InvalidCondition(
+                        'Condition "{}" references itself'.format(reference))
+
+                if (reference in checked or
+                        reference not in self.named_conditions):
+                    continue
+
+                path.append(reference)
+                pending.append(
+                    iter(references(self.named_conditions[reference])))
+
+    def profile(self, items):
+        """
+        Filters items according to the conditions while profiling the
+        evaluation of each condition.
+
+        :param items: Jama item data
+        :type  items: list[dict], JamaItemStore or JamaItemIndex
+        :return: profile of the filter run, with the matching items
+        :rtype: FilterProfile
+        """
+        # imported here, as jama_profile imports this module
+        from jama_profile import FilterProfile
+
+        if isinstance(items, (JamaItemStore, JamaItemIndex)):
+            items = items.items
+
+        profile = FilterProfile(self)
+        predicate = self.compile(profile)
+        item_map = {item['project_id']: item for item in items}
+        memo = {}
+        start = default_timer()
+        profile.results = [
+            item for item in items if predicate(item, item_map, memo)]
+        profile.time = default_timer() - start
+        profile.size = len(items)
+        return profile
+
+    def stream(self, items):
+        """
+        Filters items according to the conditions as they arrive.  Matching
+        items are yielded right away unless the conditions evaluate
+        relationships, which need all items before any can be evaluated.
+
+        :param items: Jama item data
+        :type  items: iterable[dict]
+        :return: all Jama items that matched the filter conditions
+        :rtype: generator[dict]
+        """
+        if self.is_relationship():
+            for item in self(list(items)):
+                yield item
+
+            return
+
+        predicate = self.predicate
+        item_map = {}
+        memo = {}
+        for item in items:
+            if predicate(item, item_map, memo):
+                yield item
+
+    def is_relationship(self):
+        """
+        Determines whether the main condition, or any condition referenced by
+        it, evaluates relationship logic.
+
+        :return: whether the filter evaluates relationship logic
+        :rtype: bool
+        """
+        names = set()
+        conditions = [self.main_condition]
+        while len(conditions) > 0:
+            condition = conditions.pop()
+            if isinstance(condition, basestring):
+                if condition not in names:
+                    names.add(condition)
+                    conditions.append(self.named_conditions.get(condition))
+
+            elif isinstance(condition, ConditionGroup):
+                conditions.extend(condition.conditions or [])
+
+            elif (isinstance(condition, Condition) and
+                    condition.is_relationship()):
+                return True
+
+        return False
+
+    def relationship_depth(self):
+        """
+        Determines how many relationships away from an item the conditions
+        look, i.e. how far away the items are whose data can affect whether
+        the item matches.
+
+        :return: maximum number of relationships followed, or None if there is
+                 no maximum because named conditions reference themselves
+                 through relationships
+        :rtype: int
+        """
+        depths = {}
+
+        def depth(condition):
+            if isinstance(condition, basestring):
+                if condition not in depths:
+                    # references in progress are cycles through relationships
+                    depths[condition] = float('inf')
+                    depths[condition] = depth(
+                        self.named_conditions.get(condition))
+
+                return depths[condition]
+
+            if isinstance(condition, ConditionGroup):
+                return max([0] + [depth(c) for c in condition.conditions or []])
+
+            if not isinstance(condition, Condition):
+                return 0
+
+            result = 0
+            for logic, name, count in [
+                    (condition.upstream_logic, condition.upstream_condition,
+                     condition.upstream_count),
+                    (condition.downstream_logic,
+                     condition.downstream_condition,
+                     condition.downstream_count)]:
+                if logic is not None:
+                    result = max(result, 1 + depth(name))
+
+                elif count is not None:
+                    result = max(result, 1)
+
+            return result
+
+        result = depth(self.main_condition)
+        if result == float('inf'):
+            return None
+
+        return result
+
+    def incremental(self, items):
+        """
+        Filters items according to the conditions and keeps the results, so
+        they can be updated as the items change.
+
+        :param items: Jama item data
+        :type  items: list[dict]
+        :return: incrementally updated results
+        :rtype: IncrementalJamaFilter
+        """
+        # imported here, as jama_incremental imports this module
+        from jama_incremental import IncrementalJamaFilter
+
+        return IncrementalJamaFilter(self, items)
+
+    def parallel(self, items, processes=None, shards_per_process=4):
+        """
+        Filters items according to the conditions in a pool of processes.  The
+        items are sharded into contiguous ranges which are filtered by the
+        processes, and the matching items are merged in their original order,
+        so the result is identical to filtering them serially.
+
+        Where processes are forked the items and item map are inherited by
+        the processes; otherwise they are serialized once per process.
+
+        :param items: Jama item data
+        :type  items: list[dict]
+        :param processes: number of processes (all CPUs if None)
+        :type  processes: int
+        :param shards_per_process: number of shards per process, to balance
+                                   the load
+        :type  shards_per_process: int
+        :return: all Jama items that matched the filter conditions
+        :rtype: list[dict]
+        """
+        global _PROCESS_STATE
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        num_shards = max(1, min(len(items), processes * shards_per_process))
+        bounds = [len(items) * i // num_shards for i in range(num_shards + 1)]
+        shards = zip(bounds[:-1], bounds[1:])
+
+        if hasattr(os, 'fork'):
+            _PROCESS_STATE = (self, items)
+            initargs = (None, None)
+
+        else:
+            initargs = (self, items)
+
+        pool = multiprocessing.Pool(
+            processes, initializer=_init_process, initargs=initargs)
+        try:
+            rows = pool.map(_filter_shard, shards, chunksize=1)
+            pool.close()
+
+        except:
+            pool.terminate()
+            raise
+
+        finally:
+            pool.join()
+            _PROCESS_STATE = None
+
+        return [items[i] for shard in rows for i in shard]
+
+    def __getstate__(self):
+        # compiled predicates are closures, which cannot be serialized
+        return {
+            'main_condition': self.main_condition,
+            'named_conditions': self.named_conditions}
+
+    def __setstate__(self, state):
+        self.main_condition = state['main_condition']
+        self.named_conditions = state['named_conditions']
+        self.predicates = {}
+        self.predicate = self.compile()
+
+    @classmethod
+    def load(cls, file_handler):
+        """
+        Instantiates a filter based on condition logic from a YAML file.
+
+        :param file_handler: handle to a YAML file which describes Jama filter
+                             conditions
+        :type  file_handler: file
+        :return: a Jama filter based on the conditions in the file
+        :rtype: JamaFilter
+        """
+        logging.debug('Reading filter...')
+        conditions = yaml.safe_load(file_handler)
+
+        logging.debug('Validating filter...')
+        conditions = FILTER_SCHEMA(conditions)
+
+        logging.debug('Parsing filter...')
+        return cls(conditions)
+
+
+# state of a filter process: (filter, items[, item map, memo])
+_PROCESS_STATE = None
+
+
+def _init_process(jama_filter, items):
+    """
+    Initializes a filter process.
+
+    :param jama_filter: Jama filter, or None if inherited
+    :type  jama_filter: JamaFilter
+    :param items: Jama item data, or None if inherited
+    :type  items: list[dict]
+    """
+    global _PROCESS_STATE
+
+    if jama_filter is None:
+        jama_filter, items = _PROCESS_STATE[:2]
+
+    item_map = {item['project_id']: item for item in items}
+    _PROCESS_STATE = (jama_filter, items, item_map, {})
+
+
+def _filter_shard(shard):
+    """
+    Filters a shard of items in a filter process.
+
+    :param shard: (start, stop) rows of the shard
+    :type  shard: tuple(int, int)
+    :return: sorted rows of the items of the shard which matched the filter
+             conditions
+    :rtype: list[int]
+    """
+    jama_filter, items, item_map, memo = _PROCESS_STATE
+    predicate = jama_filter.predicate
+    return [
+        i for i in xrange(*shard) if predicate(items[i], item_map, memo)]
+
+
+def parse_jama_reports(
+        reports_path, validate=True, cache=None, native=None, processes=1):
+    """
+    Parses a trace data report generated from Jama (or a directory of trace data
+    reports) and collects the item data as dictionaries.
+
+    :param reports_path: path to the trace data report(s)
+    :type  reports_path: basestring
+    :param validate: whether to validate the items and coerce their values
+    :type  validate: bool
+    :param cache: cache of parsed item data
+    :type  cache: JamaReportCache
+    :param native: whether to parse the reports in Python instead of with the
+                   converter (by default only where the converter cannot run)
+    :type  native: bool
+    :param processes: number of processes parsing reports in Python (all CPUs
+                      if None)
+    :type  processes: int
+    :return: parsed Jama item data
+    :rtype: list[dict]
+    """
+    return list(iter_jama_reports(
+        reports_path, validate, cache, native, processes))
+
+
+def iter_jama_reports(
+        reports_path, validate=True, cache=None, native=None, processes=1):
+    """
+    Parses a trace data report generated from Jama (or a directory of trace data
+    reports) and yields the item data as dictionaries.  The output of the
+    parser is decoded and validated item by item as it is produced, so only
+    the items which have not been consumed yet are kept in memory.
+
+    Items of a report which is in the cache are loaded from the cache instead;
+    otherwise validated items are cached once they have all been consumed.
+
+    Reports are parsed by the jama_report_to_json converter, or in Python,
+    which is how they are parsed where the converter (a Windows executable)
+    cannot run.
+
+    :param reports_path: path to the trace data report(s)
+    :type  reports_path: basestring
+    :param validate: whether to validate the items and coerce their values;
+                     only data which is known to be valid, eg: from a trusted
+                     cache, should not be validated
+    :type  validate: bool
+    :param cache: cache of parsed item data
+    :type  cache: JamaReportCache
+    :param native: whether to parse the reports in Python instead of with the
+                   converter (by default only where the converter cannot run)
+    :type  native: bool
+    :param processes: number of processes parsing reports in Python (all CPUs
+                      if None)
+    :type  processes: int
+    :return: parsed Jama item data
+    :rtype: generator[dict]
+    """
+    if cache is not None:
+        items = cache.get(reports_path)
+        if items is None and validate:
+            items = cache.put(reports_path, iter_jama_reports(
+                reports_path, validate, native=native, processes=processes))
+
+        if items is not None:
+            for item in items:
+                yield item
+
+            return
+
+    if native is None:
+        native = os.name != 'nt' or not os.path.isfile(JAMA_PARSER_BIN)
+
+    logging.info('Parsing Jama reports in "{}"...'.format(reports_path))
+    if native:
+        items = jama_html.iter_reports(reports_path, processes)
+
+    else:
+        chunks = execute.stream(
+            command='{bin} -p {path}'.format(
+                bin=JAMA_PARSER_BIN,
+                path=reports_path),
+            shell=True)
+
+        items = _decode_items(chunks)
+
+    if not validate:
+        for item in items:
+            yield item
+
+        return
+
+    for i, item in enumerate(items):
+        try:
+            item = validate_item(item)
+
+        except vol.Invalid as e:
+            e.prepend([i])
+            raise
+
+        yield item
+
+
+def _decode_items(chunks):
+    """
+    Decodes the items in a stream of Jama data.
+
+    :param chunks: chunks of a JSON array of items or of JSON lines
+    :type  chunks: iterable[basestring]
+    :return: decoded items
+    :rtype: generator[dict]
+    :raises ValueError: if the data is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    data = ''
+    pos = 0
+    for chunk in chunks:
+        data = data[pos:] + chunk
+        pos = SEPARATOR_RE.match(data).end()
+        while pos < len(data):
+            try:
+                item, end = decoder.raw_decode(data, pos)
+
+            except ValueError:
+                # the item continues in the next chunk
+                break
+
+            yield item
+            pos = SEPARATOR_RE.match(data, end).end()
+
+    data = data[pos:]
+    if len(data) > 0:
+        decoder.raw_decode(data)
+
+
+def filter_jama_data(jama_data, jama_filter, processes=1, cache=None):
+    """
+    Filters Jama items based.
+
+    :param jama_data: Jama item data, columnar Jama item data or path to the
+                      trace data report(s)
+    :type  jama_data: list[dict], JamaItemStore or basestring
+    :param jama_filter: Jama filter, nested condition map, or path to a filter
+                        file
+    :type  jama_filter: JamaFilter, dict{basestring:dict}, basestring
+    :param processes: number of processes filtering a list of items in
+                      parallel (all CPUs if None)
+    :type  processes: int
+    :param cache: cache of item data parsed from trace data reports
+    :type  cache: JamaReportCache
+    :return: filtered Jama items
+    :rtype: list[dict]
+    """
+    jama_filter = _load_filter(jama_filter)
+    if isinstance(jama_data, basestring):
+        if processes == 1:
+            return list(jama_filter.stream(
+                iter_jama_reports(jama_data, cache=cache)))
+
+        jama_data = parse_jama_reports(jama_data, cache=cache)
+
+    if processes != 1 and isinstance(jama_data, list):
+        return jama_filter.parallel(jama_data, processes)
+
+    return jama_filter(jama_data)
+
+
+def filter_jama_data_batch(jama_data, jama_filters, cache=None):
+    """
+    Filters Jama items based on many filters at once.  The items are parsed
+    once and filtered by all of the filters in a single pass, and conditions
+    which the filters have in common are evaluated once per item.
+
+    :param jama_data: Jama item data, columnar Jama item data or path to the
+                      trace data report(s)
+    :type  jama_data: list[dict], JamaItemStore or basestring
+    :param jama_filters: Jama filters, nested condition maps, or paths to
+                         filter files
+    :type  jama_filters: list[JamaFilter, dict{basestring:dict}, basestring]
+    :param cache: cache of item data parsed from trace data reports
+    :type  cache: JamaReportCache
+    :return: filtered Jama items of each filter
+    :rtype: list[list[dict]]
+    """
+    # imported here, as jama_filter_set imports this module
+    from jama_filter_set import JamaFilterSet
+
+    filter_set = JamaFilterSet(_load_filter(f) for f in jama_filters)
+    if isinstance(jama_data, basestring):
+        jama_data = parse_jama_reports(jama_data, cache=cache)
+
+    return filter_set(jama_data)
+
+
+def _load_filter(jama_filter):
+    """
+    Loads a filter.
+
+    :param jama_filter: Jama filter, nested condition map, or path to a filter
+                        file
+    :type  jama_filter: JamaFilter, dict{basestring:dict}, basestring
+    :return: Jama filter
+    :rtype: JamaFilter
+    """
+    if isinstance(jama_filter, basestring):
+        logging.info('Creating filter from "{}"...'.format(jama_filter))
+        with open(jama_filter, 'r') as f:
+            return JamaFilter.load(f)
+
+    if isinstance(jama_filter, dict):
+        return JamaFilter(jama_filter)
+
+    return jama_filter
@@ -0,0 +1,285 @@
+"""
++------------------------------------------------------------------------------+
+|                       Copyright 2017 Rockwell Collins                        |
+|                             All Rights Reserved                              |
+|                           Proprietary Information                            |
++------------------------------------------------------------------------------+
+
+Utility classes for storing Jama item data in columns, which JamaFilter
+filters with NumPy.
+"""
+try:
+    import numpy as np
+
+except ImportError:
+    # Jama items cannot be stored in columns
+    np = None
+
+
+class JamaItemStore(object):
+    """Columnar store of Jama item data which is filtered with NumPy"""
+    def __init__(self, items):
+        """
+        Constructor called in instantiation.  Creates a store of Jama items.
+        The columns are built once, when they are first used.
+
+        :param items: Jama item data
+        :type  items: list[dict]
+        """
+        if np is None:
+            raise ImportError('NumPy is required to store Jama items')
+
+        self.items = items
+        self.item_map = {item['project_id']: item for item in items}
+        self.size = len(items)
+        self.columns = {}
+
+    def __len__(self):
+        return self.size
+
+    def select(self, mask):
+        """
+        Selects the items of the store with a mask.
+
+        :param mask: whether each item is selected
+        :type  mask: numpy.ndarray[bool]
+        :return: selected Jama items
+        :rtype: list[dict]
+        """
+        items = self.items
+        return [items[i] for i in np.flatnonzero(mask)]
+
+    def typed(self, types):
+        """
+        Evaluates whether the items are of one of the given types.
+
+        :param types: Jama item types
+        :type  types: list[basestring]
+        :return: whether each item is of one of the types
+        :rtype: numpy.ndarray[bool]
+        """
+        codes, categories = self._categorical(
+            'object_type', (item['object_type'] for item in self.items))
+        types = frozenset(types)
+        return self._lookup(codes, [x in types for x in categories], False)
+
+    def field(self, name, value_match, missing):
+        """
+        Evaluates a field of the items.
+
+        :param name: name of the field
+        :type  name: basestring
+        :param value_match: predicate called with the value of the field
+        :type  value_match: callable
+        :param missing: result for items which do not have the field
+        :type  missing: bool
+        :return: whether the field of each item matches
+        :rtype: numpy.ndarray[bool]
+        """
+        codes, categories = self._categorical(
+            ('fields', name),
+            (item['fields'].get(name) for item in self.items))
+        return self._lookup(
+            codes, [value_match(x) for x in categories], missing)
+
+    def between(self, key, after, before):
+        """
+        Evaluates whether a date of the items is (exclusively) between two
+        dates.
+
+        :param key: Jama item key of the date
+        :type  key: basestring
+        :param after: date to be after, or None
+        :type  after: datetime.datetime
+        :param before: date to be before, or None
+        :type  before: datetime.datetime
+        :return: whether the date of each item is between the dates, or None if
+                 the dates are not comparable as naive dates
+        :rtype: numpy.ndarray[bool]
+        """
+        dates = self._dates(key)
+        if dates is None or any(
+                x is not None and x.tzinfo is not None
+                for x in [after, before]):
+            return None
+
+        mask = np.ones(self.size, dtype=bool)
+        if after is not None:
+            mask &= dates > np.datetime64(after, 'us')
+
+        if before is not None:
+            mask &= dates < np.datetime64(before, 'us')
+
+        return mask
+
+    def tagged(self, tag):
+        """
+        Evaluates whether the items are tagged with a tag.
+
+        :param tag: tag
+        :type  tag: basestring
+        :return: whether each item has the tag
+        :rtype: numpy.ndarray[bool]
+        """
+        rows, codes, categories = self._tags()
+        mask = np.zeros(self.size, dtype=bool)
+        code = categories.get(tag)
+        if code is not None:
+            mask[rows[codes == code]] = True
+
+        return mask
+
+    def under(self, location_path):
+        """
+        Evaluates whether the items are under a location.
+
+        :param location_path: location nodes
+        :type  location_path: list[basestring]
+        :return: whether each item is under the location
+        :rtype: numpy.ndarray[bool]
+        """
+        paths, lengths, categories = self._paths()
+        depth = len(location_path)
+        if depth > paths.shape[1] or any(
+                node not in categories for node in location_path):
+            return np.zeros(self.size, dtype=bool)
+
+        mask = lengths >= depth
+        for i, node in enumerate(location_path):
+            mask &= paths[:, i] == categories[node]
+
+        return mask
+
+    def every_node(self, node_match):
+        """
+        Evaluates whether every node of the location of the items (including
+        the item itself) matches.
+
+        :param node_match: predicate called with the name of a node
+        :type  node_match: callable
+        :return: whether every node of each item matches
+        :rtype: numpy.ndarray[bool]
+        """
+        paths, lengths, categories = self._paths()
+        nodes = sorted(categories, key=categories.get)
+        return self._lookup(
+            paths, [node_match(x) for x in nodes], True).all(axis=1)
+
+    def _categorical(self, column, values):
+        """
+        Gets (or builds) a categorical column.
+
+        :param column: key of the column
+        :type  column: hashable
+        :param values: values of the column, for each item
+        :type  values: iterable
+        :return: codes (-1 for None values) and the categories by code
+        :rtype: tuple(numpy.ndarray[int], list)
+        """
+        result = self.columns.get(column)
+        if result is None:
+            categories = {None: -1}
+            codes = np.fromiter(
+                (categories.setdefault(x, len(categories) - 1)
+                 for x in values),
+                dtype=np.int32, count=self.size)
+            del categories[None]
+            result = (codes, sorted(categories, key=categories.get))
+            self.columns[column] = result
+
+        return result
+
+    def _dates(self, key):
+        """
+        Gets (or builds) a date column.
+
+        :param key: Jama item key of the date
+        :type  key: basestring
+        :return: dates, or None if some dates are not naive
+        :rtype: numpy.ndarray[datetime64]
+        """
+        if key not in self.columns:
+            dates = np.array([item[key] for item in self.items], dtype=object)
+            if any(x.tzinfo is not None for x in dates):
+                self.columns[key] = None
+            else:
+                self.columns[key] = dates.astype('datetime64[us]')
+
+        return self.columns[key]
+
+    def _tags(self):
+        """
+        Gets (or builds) the tag columns.
+
+        :return: item rows and tag codes of every (item, tag) pair and the
+                 tag codes by tag
+        :rtype: tuple(numpy.ndarray[int], numpy.ndarray[int], dict)
+        """
+        result = self.columns.get('tags')
+        if result is None:
+            categories = {}
+            rows = []
+            codes = []
+            for row, item in enumerate(self.items):
+                for tag in item['tags']:
+                    rows.append(row)
+                    codes.append(categories.setdefault(tag, len(categories)))
+
+            result = (
+                np.array(rows, dtype=np.int32),
+                np.array(codes, dtype=np.int32),
+                categories)
+            self.columns['tags'] = result
+
+        return result
+
+    def _paths(self):
+        """
+        Gets (or builds) the location path columns.  The path of an item is
+        its location followed by its title.
+
+        :return: node codes of the paths (padded with -1), path lengths and
+                 the node codes by node
+        :rtype: tuple(numpy.ndarray[int], numpy.ndarray[int], dict)
+        """
+        result = self.columns.get('paths')
+        if result is None:
+            categories = {}
+            codes = []
+            lengths = []
+            for item in self.items:
+                for node in item['location']:
+                    codes.append(categories.setdefault(node, len(categories)))
+
+                codes.append(
+                    categories.setdefault(item['title'], len(categories)))
+                lengths.append(len(item['location']) + 1)
+
+            lengths = np.array(lengths, dtype=np.int32)
+
+            width = int(lengths.max()) if self.size > 0 else 0
+            paths = np.full((self.size, width), -1, dtype=np.int32)
+            offsets = np.cumsum(lengths) - lengths
+            rows = np.repeat(np.arange(self.size), lengths)
+            columns = np.arange(len(codes)) - np.repeat(offsets, lengths)
+            paths[rows, columns] = codes
+            result = (paths, lengths, categories)
+            self.columns['paths'] = result
+
+        return result
+
+    @staticmethod
+    def _lookup(codes, table, missing):
+        """
+        Looks up the result of each code in a table.
+
+        :param codes: codes (-1 for missing values)
+        :type  codes: numpy.ndarray[int]
+        :param table: result by code
+        :type  table: list[bool]
+        :param missing: result for missing values
+        :type  missing: bool
+        :return: result of each code
+        :rtype: numpy.ndarray[bool]
+        """
+        return np.array(table + [missing], dtype=bool)[codes]
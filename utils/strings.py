@@ -271,6 +271,10 @@ UNICODE_REPLACEMENTS = {
     lookup('FULLWIDTH TILDE'): '~'
 }
 
+# unicode replacements as a translation table
+UNICODE_TRANSLATIONS = {
+    ord(ch): unicode(rep) for ch, rep in UNICODE_REPLACEMENTS.iteritems()}
+
 
 def plainstr(s):
     """
@@ -283,12 +287,11 @@ def plainstr(s):
     """
     if isinstance(s, unicode):
         # convert unicode to ASCII
-        new_str = ''
-        for i, ch in enumerate(s):
-            ch = UNICODE_REPLACEMENTS.get(ch, ch)
-            new_str += ch
+        try:
+            return s.encode('ascii')
 
-        s = new_str
+        except UnicodeEncodeError:
+            s = s.translate(UNICODE_TRANSLATIONS)
 
     try:
         return str(s)